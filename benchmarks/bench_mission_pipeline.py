@@ -0,0 +1,184 @@
+# benchmarks/bench_mission_pipeline.py
+"""
+Latency percentiles, throughput and peak Python memory of each mission pipeline stage (trajectory, screening,
+DDQL optimization with a small fixed budget, visualization and report) on synthetic catalogs of several sizes.
+Run from the repository root:
+    python -m benchmarks.bench_mission_pipeline --objects 1000 10000 50000 --output outputs/benchmarks/mission_pipeline.json
+Compare two result files with --compare:
+    python -m benchmarks.bench_mission_pipeline --compare outputs/benchmarks/before.json outputs/benchmarks/after.json
+"""
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+import numpy as np
+from src.core.trajectory_calculator import TrajectoryCalculator
+from src.core.collision_detector import CollisionDetector
+from src.core.sampled_trajectory import SampledTrajectory
+from src.core.trajectory_visualizer import TrajectoryVisualizer
+from src.core.mission_report import MissionReport
+from src.utils.dummy_tle_generator import generate_scenario
+
+LAUNCH = ("Electron", "Rocket Lab Launch Complex 1", (-39.261, 177.864, 0), 500, "LEO")
+TIMESTAMP = datetime(2024, 6, 5, 6, 0, 0)
+PERCENTILES = (50, 90, 99)
+
+
+def measure(fn, repeats, work=1):
+    """
+    Time fn() `repeats` times, then run it once more under tracemalloc for its peak traced allocation (kept out
+    of the timed runs, which tracing slows down). work: units processed per call, for throughput.
+    Returns (stats dict, result of the last call).
+    """
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    times = np.array(times)
+    stats = {
+        'repeats': repeats,
+        'mean_s': float(times.mean()),
+        'min_s': float(times.min()),
+        **{f'p{q}_s': float(np.percentile(times, q)) for q in PERCENTILES},
+        'throughput_per_s': float(work / np.median(times)),
+        'peak_mb': peak / 1e6
+    }
+    return stats, result
+
+
+def run(objects, repeats, episodes=1, max_steps=2, stages=None, seed=0):
+    # The optimizer and TensorFlow are only imported when the optimization stage runs
+    stages = stages or ['trajectory', 'screening', 'optimization', 'visualization', 'report']
+    rocket_type, launch_site, coordinates, altitude_km, orbit_type = LAUNCH
+    work_dir = tempfile.mkdtemp(prefix="bench_mission_")
+    results = []
+
+    def record(count, stage, stats, unit, **fields):
+        results.append({'objects': count, 'stage': stage, 'unit': unit, **stats, **fields})
+        row = results[-1]
+        print(f"{count:>7} {stage:>13} p50={row['p50_s']:.3f}s p90={row['p90_s']:.3f}s p99={row['p99_s']:.3f}s "
+              f"{row['throughput_per_s']:,.0f} {unit}/s peak={row['peak_mb']:.1f} MB")
+
+    calculator = TrajectoryCalculator()
+    stats, trajectory_data = measure(lambda: calculator.calculate(rocket_type, altitude_km, coordinates), repeats)
+    equations, t_climb, formulas, initial, v_orbit, burn_time = trajectory_data
+    sampled = SampledTrajectory.build(equations, t_climb, burn_time, screening_step_s=CollisionDetector.STEP_S)
+
+    try:
+        for count in objects:
+            if 'trajectory' in stages:
+                record(count, 'trajectory', stats, 'trajectories')
+            catalog_path = os.path.join(work_dir, f"catalog_{count}.txt")
+            scenario = generate_scenario(catalog_path, TIMESTAMP, equations, t_climb, threats=3, near_misses=5,
+                                         background=max(0, count - 8), seed=seed, sampled=sampled,
+                                         screening_step_s=CollisionDetector.STEP_S)
+
+            detector = CollisionDetector(tle_txt_path=catalog_path)
+            steps = len(detector.screening_times(t_climb))
+
+            def screen():
+                return detector.detect_collisions(equations, TIMESTAMP, t_climb, sampled=sampled)
+
+            if 'screening' in stages:
+                stats_screen, collisions = measure(screen, repeats, work=scenario['objects'] * steps)
+                record(count, 'screening', stats_screen, 'object-steps', steps=steps, collisions=len(collisions))
+            else:
+                collisions = screen()  # Later stages use its result
+
+            if 'optimization' in stages:
+                from src.core.ddql_optimizer import DDQLOptimizer
+                # Threat markers stand in for detections so the optimizer always trains (threats whose orbits SGP4
+                # rejects, e.g. below the surface, are not detected)
+                targets = collisions if len(collisions) else \
+                    [(t, sampled.positions_at([t])[0]) for t in scenario['threat_times']]
+
+                def optimize():
+                    optimizer = DDQLOptimizer(equations, t_climb, TIMESTAMP, catalog_path)
+                    optimizer.checkpoint_dir = work_dir  # Keep the repository's checkpoint untouched
+                    optimizer.checkpoint_path = os.path.join(work_dir, "ddql_optimizer_weights.npz")
+                    return optimizer.optimize(targets, episodes=episodes, max_steps=max_steps)
+
+                stats_opt, _ = measure(optimize, repeats, work=episodes)
+                record(count, 'optimization', stats_opt, 'episodes', episodes=episodes, max_steps=max_steps)
+
+            if 'visualization' in stages:
+                def plot():
+                    viz = TrajectoryVisualizer(equations, t_max=t_climb, burn_time=burn_time, samples=sampled.samples,
+                                               screening_step_s=CollisionDetector.STEP_S)
+                    viz.add_debris_context(detector, TIMESTAMP, detector.closest_approach)
+                    return viz.plot(title="Benchmark", collisions=collisions, object_label="Dummy Debris", show=False)
+
+                stats_viz, _ = measure(plot, repeats)
+                record(count, 'visualization', stats_viz, 'figures')
+
+            if 'report' in stages:
+                report = MissionReport(output_dir=os.path.join(work_dir, "reports"))
+                rocket_row = calculator.rocket_data[calculator.rocket_data['Rocket_Type'] == rocket_type]
+                rocket_params = {
+                    'thrust_N': float(rocket_row['Thrust_N'].iloc[0]),
+                    'mass_kg': float(rocket_row['Mass_kg'].iloc[0]),
+                    'burn_time_s': float(rocket_row['Burn_Time_s'].iloc[0])
+                }
+
+                def generate_report():
+                    return report.generate(rocket_type, launch_site, orbit_type, altitude_km, TIMESTAMP,
+                                           trajectory_data, collisions, rocket_params, sampled=sampled,
+                                           closest_approach=detector.closest_approach, object_label="Dummy Debris")
+
+                stats_report, _ = measure(generate_report, repeats)
+                record(count, 'report', stats_report, 'reports')
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return results
+
+
+def compare(before_path, after_path):
+    """Print the p50 change of every (objects, stage) row present in both result files."""
+    with open(before_path) as f:
+        before = {(row['objects'], row['stage']): row for row in json.load(f)}
+    with open(after_path) as f:
+        after = {(row['objects'], row['stage']): row for row in json.load(f)}
+    for key in sorted(before.keys() & after.keys()):
+        old, new = before[key]['p50_s'], after[key]['p50_s']
+        change = (new - old) / old * 100 if old else float('nan')
+        print(f"{key[0]:>7} {key[1]:>13} p50 {old:.3f}s -> {new:.3f}s ({change:+.1f}%) "
+              f"peak {before[key]['peak_mb']:.1f} -> {after[key]['peak_mb']:.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--objects', type=int, nargs='+', default=[1000, 10000, 50000])
+    parser.add_argument('--stages', nargs='+',
+                        choices=['trajectory', 'screening', 'optimization', 'visualization', 'report'])
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--episodes', type=int, default=1, help="DDQL episodes per optimization run")
+    parser.add_argument('--max-steps', type=int, default=2, help="DDQL steps per episode")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="Write results as JSON to this path")
+    parser.add_argument('--compare', nargs=2, metavar=('BEFORE', 'AFTER'), help="Compare two result files and exit")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+    results = run(args.objects, args.repeats, args.episodes, args.max_steps, args.stages, args.seed)
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# benchmarks/bench_tle_parser.py
+"""
+Parse time of the TLE catalog parser on synthetic catalogs in 2-line and 3-line (name) format.
+Run from the repository root:
+    python -m benchmarks.bench_tle_parser --objects 10000 100000 --output outputs/benchmarks/tle_parser.json
+"""
+import argparse
+import io
+import json
+import os
+import time
+import numpy as np
+from src.utils.tle_preprocessor import parse_tle_records, tle_checksum
+
+
+def synthetic_catalog(objects, names=False, seed=0):
+    """TLE text of random LEO-to-GEO element sets with valid checksums."""
+    rng = np.random.default_rng(seed)
+    lines = []
+    for i in range(objects):
+        line1 = (f"1 {10000 + i % 90000:05d}U 24001A   24157.{rng.integers(0, 10 ** 8):08d} "
+                 f" .00000000  00000-0  {rng.integers(10000, 99999)}-4 0  999")
+        line2 = (f"2 {10000 + i % 90000:05d} {rng.uniform(0, 180):8.4f} {rng.uniform(0, 360):8.4f} "
+                 f"{rng.integers(0, 10 ** 7):07d} {rng.uniform(0, 360):8.4f} {rng.uniform(0, 360):8.4f} "
+                 f"{rng.uniform(1, 16):11.8f}{rng.integers(0, 99999):5d}")
+        if names:
+            lines.append(f"0 OBJECT {i}")
+        lines.append(line1 + str(tle_checksum(line1)))
+        lines.append(line2 + str(tle_checksum(line2)))
+    return ("\n".join(lines) + "\n").encode('ascii')
+
+
+def run(objects, repeats):
+    results = []
+    for count in objects:
+        for names in (False, True):
+            text = synthetic_catalog(count, names=names)
+            times = []
+            for _ in range(repeats):
+                start = time.perf_counter()
+                records, skipped = parse_tle_records(io.BytesIO(text))
+                times.append(time.perf_counter() - start)
+            results.append({
+                'objects': count,
+                'format': '3-line' if names else '2-line',
+                'bytes': len(text),
+                'parsed': len(records),
+                'skipped': len(skipped),
+                'parse_s': min(times),
+                'objects_per_s': count / min(times)
+            })
+            row = results[-1]
+            print(f"{count:>7} {row['format']:>6} {len(text) / 1e6:6.1f} MB parsed={row['parsed']:>7} "
+                  f"skipped={row['skipped']} parse={row['parse_s']:.3f}s ({row['objects_per_s'] / 1e3:.0f}k objects/s)")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--objects', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--output', help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    results = run(args.objects, args.repeats)
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+# benchmarks/bench_visualizer.py
+"""
+Figure build time and serialized size of TrajectoryVisualizer.plot per sampling and animation mode,
+next to the binary trajectory payload the client-side viewer loads instead.
+Run from the repository root:
+    python -m benchmarks.bench_visualizer --points 500 1000 2000 --sampling uniform adaptive --output outputs/benchmarks/visualizer.json
+"""
+import argparse
+import json
+import os
+import time
+import numpy as np
+from src.core.trajectory_visualizer import TrajectoryVisualizer
+from src.utils.binary_payload import encode_arrays
+
+
+def synthetic_equations():
+    """Burn/coast/hold trajectory from the TrajectoryVisualizer test block (GEO-like climb)."""
+    x0, y0, z0 = 2202376.0642481693, 1886064.918310194, 5672912.8140265215
+    equations = {
+        'x': lambda t: x0 + 52.94 * t**2 if t <= 214 else x0 + 2424635 + 22660 * (t - 214) if t <= 2366 else x0 + 36918656,
+        'y': lambda t: y0 + 105.33 * t**2 if t <= 214 else y0 + 4823488 + 45079 * (t - 214) if t <= 2366 else y0 + 74379549,
+        'z': lambda t: z0 + 62.12 * t**2 if t <= 214 else z0 + 2844668 + 26586 * (t - 214) if t <= 2366 else 42157000
+    }
+    return equations, 2365.76, 214.0
+
+
+def run(points, modes, max_frames, repeats, samplings=('uniform',)):
+    equations, t_max, burn_time = synthetic_equations()
+    results = []
+    for num_points, sampling in [(num_points, sampling) for num_points in points for sampling in samplings]:
+        start = time.perf_counter()
+        samples = TrajectoryVisualizer(equations, t_max=t_max, burn_time=burn_time, num_points=num_points,
+                                       sampling=sampling).build_samples()
+        sample_s = time.perf_counter() - start
+        start = time.perf_counter()
+        binary = encode_arrays({'trajectory_t': samples['t'],
+                                'trajectory_xyz': np.column_stack((samples['x'], samples['y'], samples['z'])) / 1000})
+        payload_s = time.perf_counter() - start
+        for mode in modes:
+            build_times, serialize_times, size = [], [], 0
+            for _ in range(repeats):
+                viz = TrajectoryVisualizer(equations, t_max=t_max, burn_time=burn_time, num_points=num_points,
+                                           samples=samples, animation=mode, max_frames=max_frames, sampling=sampling)
+                start = time.perf_counter()
+                fig = viz.plot(title="Benchmark", show=False)
+                build_times.append(time.perf_counter() - start)
+                start = time.perf_counter()
+                payload = fig.to_json()
+                serialize_times.append(time.perf_counter() - start)
+                size = len(payload)
+            results.append({
+                'num_points': num_points,
+                'sampling': sampling,
+                'samples': len(samples['t']),
+                'sample_s': sample_s,
+                'animation': mode or 'none',
+                'max_frames': max_frames,
+                'frames': len(fig.frames),
+                'build_s': min(build_times),
+                'serialize_s': min(serialize_times),
+                'json_bytes': size,
+                'payload_s': payload_s,
+                'payload_bytes': len(binary)
+            })
+            row = results[-1]
+            print(f"{num_points:>6} {sampling:>8} samples={row['samples']:>5} {row['animation']:>9} frames={row['frames']:>5} build={row['build_s']:.3f}s "
+                  f"serialize={row['serialize_s']:.3f}s size={size / 1e6:.2f} MB "
+                  f"payload={row['payload_s'] * 1000:.2f}ms/{len(binary) / 1e3:.1f} kB")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--points', type=int, nargs='+', default=[500, 1000, 2000])
+    parser.add_argument('--modes', nargs='+', default=['segments', 'prefix', 'none'])
+    parser.add_argument('--sampling', nargs='+', default=['uniform', 'adaptive'])
+    parser.add_argument('--max-frames', type=int, default=200)
+    parser.add_argument('--repeats', type=int, default=1)
+    parser.add_argument('--output', help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    modes = [None if mode == 'none' else mode for mode in args.modes]
+    results = run(args.points, modes, args.max_frames, args.repeats, args.sampling)
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+# src/config/settings.py
+
+# DDQL anytime optimization budget used by the web endpoints
+DDQL_TIME_BUDGET_S = 60.0  # Wall-clock budget per optimization (s)
+DDQL_MAX_EVALUATIONS = None  # Screening evaluations per optimization (None = unlimited)
+DDQL_PATIENCE_EPISODES = 5  # Stop after this many episodes without improvement
+DDQL_MAX_EPISODES = 50
+DDQL_MAX_STEPS = 100
+
+# Background mission jobs (/jobs)
+JOB_MAX_WORKERS = 2  # Missions running concurrently
+JOB_MAX_PENDING = 16  # Missions waiting for a worker before submissions are rejected
+JOB_MAX_FINISHED = 200  # Finished jobs kept for status polling
+SSE_HEARTBEAT_S = 15  # Keep-alive interval for /jobs/<id>/events streams
+
+# Mission result cache in front of the /process_trajectory pipeline
+RESULT_CACHE_MAX_ENTRIES = 64
+RESULT_CACHE_TTL_S = 3600  # Entries older than this are recomputed (s)
+
+# Server-side mission state (compiled trajectory, samples, screening results) for multi-step workflows
+STATE_STORE_TTL_S = 1800  # Idle missions expire after this long (s)
+STATE_STORE_DIR = None  # Directory for the optional on-disk store, e.g. "<BASE_DIR>/outputs/mission_state"
+
+# Debris context in trajectory figures: tracks of objects screened within the corridor around the climb
+DEBRIS_CORRIDOR_KM = 200.0  # Closest screened approach (km) that selects an object; None disables
+DEBRIS_MAX_TRACKS = 50  # Nearest objects drawn
+
+# Multi-resolution trajectory samples (/missions/<id>/trajectory?detail=...)
+TRAJECTORY_DETAIL_LEVELS = {'coarse': 250, 'medium': 1000, 'fine': 4000}  # Max points per level
+
+# Client-side viewer (/missions/<id>/viewer, /missions/<id>/payload.bin, /assets/*)
+ASSET_MAX_AGE_S = 86400  # Browser cache lifetime of /assets/* (Earth mesh, plotly.js)
+
+# Indexed mission report store (/reports)
+REPORT_DB_PATH = None  # SQLite file; None keeps it in "<BASE_DIR>/outputs/mission_reports/reports.sqlite3"
+REPORT_PAGE_SIZE = 50  # Reports per /reports page by default
+REPORT_MAX_PAGE_SIZE = 500
+
+# Catalog metadata index queries (/catalog/objects)
+CATALOG_PAGE_SIZE = 100  # Objects per /catalog/objects page by default
+CATALOG_MAX_PAGE_SIZE = 5000
+
+# Multi-epoch element history (data/tle_data.history.txt)
+CATALOG_HISTORY_MAX_EPOCHS = 8  # Element sets kept per object; below 2 keeps no history
+
+# On-demand profiling ('profile' in /process_trajectory requests, --profile in the CLI)
+PROFILE_DIR = None  # Call trees and flamegraph files; None keeps them in "<BASE_DIR>/outputs/profiles"
+PROFILE_SAMPLE_INTERVAL_S = 0.005  # Stack sampling interval of the 'sampling' mode
+PROFILE_TOP_FUNCTIONS = 15  # Hot functions returned in the response
+
+# Batch missions (python -m src.main --batch manifest.csv)
+BATCH_MAX_WORKERS = 2  # Missions running concurrently
+BATCH_EPHEMERIS_ENTRIES = 4  # Launch times whose catalog positions are kept for reuse
+
+# Collision probability (Pc) of conjunctions flagged by screening; missions optimize only above the threshold
+PC_METHOD = 'analytic'  # 'analytic' (2-D encounter plane), 'monte_carlo', or None to optimize on every flag
+PC_THRESHOLD = 1e-4
+PC_HARD_BODY_RADIUS_M = 20.0  # Combined rocket and debris radius
+PC_DEBRIS_SIGMA_KM = (0.1, 0.5, 0.1)  # Assumed 1-sigma debris position error: radial, along-track, cross-track
+PC_ROCKET_SIGMA_KM = 0.05  # Assumed 1-sigma rocket position error (isotropic)
+
+# Long-horizon screening of the target orbit after insertion ('horizonRevolutions' / 'horizonDays' in requests)
+ORBIT_SCREENING_REVOLUTIONS = None  # Default horizon of every mission; None screens the climb only
+ORBIT_SCREENING_STEP_S = 10.0  # Fine screening step of objects passing the coarse filter
+ORBIT_SCREENING_MARGIN_KM = 25.0  # Coarse filter tolerance beyond the threshold (J2 drift, short-period terms)
+ORBIT_SCREENING_MAX_REVOLUTIONS = 100  # Longest horizons a request may ask for
+ORBIT_SCREENING_MAX_DAYS = 7.0
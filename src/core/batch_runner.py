@@ -0,0 +1,200 @@
+# src/core/batch_runner.py
+import csv
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from src.core.ephemeris import CatalogEphemeris
+from src.core.mission_pipeline import MissionPipeline
+from src.core.orbit_selector import OrbitSelector
+from src.core.rocket_selector import RocketSelector
+
+TIMESTAMP_FORMATS = ("%Y-%m-%d %H:%M:%S", "%Y/%m/%d %H:%M:%S", "%Y-%m-%dT%H:%M:%S")
+# Manifest column -> accepted spellings
+MANIFEST_ALIASES = {
+    'rocket_type': ('rocket_type', 'rocket', 'rocketType'),
+    'altitude_km': ('altitude_km', 'altitude', 'targetAltitude'),
+    'orbit_type': ('orbit_type', 'orbit', 'orbitType'),
+    'timestamp': ('timestamp', 'launch_timestamp'),
+    'launch_site': ('launch_site', 'launchSite'),
+    'coordinates': ('coordinates', 'launchSiteCoordinates')
+}
+SUMMARY_COLUMNS = ('mission', 'rocket_type', 'altitude_km', 'orbit_type', 'timestamp', 'status', 'collisions',
+                   'optimized', 'elapsed_s', 'report')
+
+
+def _parse_timestamp(value):
+    for fmt in TIMESTAMP_FORMATS:
+        try:
+            return datetime.strptime(value.strip(), fmt)
+        except ValueError:
+            continue
+    raise ValueError(f"Invalid timestamp: {value} (expected YYYY-MM-DD HH:MM:SS)")
+
+
+def load_manifest(path):
+    """
+    Missions of a CSV manifest (header row) or JSON manifest (a list of objects, or {"missions": [...]}) with
+    rocket, altitude (km), orbit type and timestamp, and optionally launch site and "(lat, lon, alt)"
+    coordinates (the rocket's defaults otherwise). Raises ValueError naming the first invalid mission, or for
+    a manifest without missions.
+    """
+    with open(path, 'r', newline='') as f:
+        if path.lower().endswith('.json'):
+            rows = json.load(f)
+            rows = rows.get('missions', []) if isinstance(rows, dict) else rows
+        else:
+            rows = list(csv.DictReader(f))
+
+    rockets = RocketSelector().rockets_df.set_index('Rocket_Type')
+    orbit_ranges = {orbit['type']: orbit['range'] for orbit in OrbitSelector().orbit_types.values()}
+    missions = []
+    for number, row in enumerate(rows, 1):
+        values = {field: next((row[name] for name in names if row.get(name) not in (None, '')), None)
+                  for field, names in MANIFEST_ALIASES.items()}
+        try:
+            missing = [field for field in ('rocket_type', 'altitude_km', 'orbit_type', 'timestamp')
+                       if values[field] is None]
+            if missing:
+                raise ValueError(f"missing {', '.join(missing)}")
+            rocket_type = str(values['rocket_type']).strip()
+            if rocket_type not in rockets.index:
+                raise ValueError(f"unknown rocket {rocket_type}")
+            rocket = rockets.loc[rocket_type]
+            altitude_km = float(values['altitude_km'])
+            orbit_type = str(values['orbit_type']).strip().upper()
+            if orbit_type not in orbit_ranges:
+                raise ValueError(f"unknown orbit type {orbit_type}")
+            low, high = orbit_ranges[orbit_type]
+            if not low <= altitude_km <= high:
+                raise ValueError(f"altitude {altitude_km} km outside {orbit_type} range {low}-{high} km")
+            if altitude_km > rocket['Max_Altitude_km']:
+                raise ValueError(f"{rocket_type} reaches at most {rocket['Max_Altitude_km']} km")
+            coordinates = values['coordinates']
+            if coordinates is None:
+                coordinates = (float(rocket['x0']), float(rocket['y0']), float(rocket['z0']))
+            elif isinstance(coordinates, str):
+                coordinates = tuple(map(float, coordinates.strip("()").split(",")))
+            timestamp = values['timestamp']
+            missions.append({
+                'rocket_type': rocket_type,
+                'launch_site': values['launch_site'] or rocket['Launch_Site'],
+                'coordinates': tuple(coordinates),
+                'target_altitude': altitude_km,
+                'orbit_type': orbit_type,
+                'timestamp': timestamp if isinstance(timestamp, datetime) else _parse_timestamp(str(timestamp))
+            })
+        except (ValueError, TypeError) as e:
+            raise ValueError(f"Mission {number} in {path}: {e}")
+    if not missions:
+        raise ValueError(f"No missions in {path}")
+    return missions
+
+
+class BatchRunner:
+    """
+    Runs the missions of a manifest without prompts, max_workers at a time, against one catalog: parsed element
+    sets (CollisionDetector's per-path cache) and catalog positions per launch time (CatalogEphemeris) are
+    shared between missions. Figures, reports and a summary of every mission are written into output_dir.
+    """
+
+    def __init__(self, tle_data_path, output_dir, max_workers=2, threshold_km=1.0, budget=None, ephemeris=None,
+                 collision_probability=None, orbit_screening=None, horizon=None):
+        self.tle_data_path = tle_data_path
+        self.output_dir = output_dir
+        self.max_workers = max_workers
+        self.threshold_km = threshold_km
+        self.budget = budget  # Keyword arguments for DDQLOptimizer.optimize_anytime
+        self.ephemeris = ephemeris or CatalogEphemeris()
+        self.collision_probability = collision_probability  # Optional CollisionProbability gating optimization
+        self.orbit_screening = orbit_screening  # Optional OrbitScreening settings
+        self.horizon = horizon or {}  # horizon_revolutions / horizon_days of every mission (climb only when empty)
+        self.figures_dir = os.path.join(output_dir, "figures")
+        self.reports_dir = os.path.join(output_dir, "reports")
+        os.makedirs(self.figures_dir, exist_ok=True)
+        os.makedirs(self.reports_dir, exist_ok=True)
+
+    def run(self, missions):
+        """
+        Run every mission; returns one result row per mission in manifest order (failures included). With
+        max_workers=1 the missions run one after another in the calling thread.
+        """
+        start = time.perf_counter()
+        # Missions sharing a launch time run next to each other, so their ephemeris entry is still cached
+        order = sorted(range(len(missions)), key=lambda i: missions[i]['timestamp'])
+        if self.max_workers == 1:
+            # In the calling thread, where a profiler (RequestProfile) sees the missions
+            by_index = {i: self._run_one(i + 1, missions[i]) for i in order}
+            results = [by_index[i] for i in range(len(missions))]
+        else:
+            with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="batch") as pool:
+                futures = {i: pool.submit(self._run_one, i + 1, missions[i]) for i in order}
+                results = [futures[i].result() for i in range(len(missions))]
+        failed = sum(result['status'] != 'ok' for result in results)
+        print(f"Batch of {len(missions)} missions finished in {time.perf_counter() - start:.1f} s "
+              f"({failed} failed); ephemeris: {self.ephemeris.stats()}")
+        return results
+
+    def _run_one(self, number, mission):
+        name = f"mission_{number:03d}"
+        row = {
+            'mission': number,
+            'rocket_type': mission['rocket_type'],
+            'altitude_km': mission['target_altitude'],
+            'orbit_type': mission['orbit_type'],
+            'timestamp': mission['timestamp'].strftime("%Y-%m-%d %H:%M:%S"),
+            'launch_site': mission['launch_site']
+        }
+        start = time.perf_counter()
+        try:
+            pipeline = MissionPipeline(self.tle_data_path, self.figures_dir, threshold_km=self.threshold_km,
+                                       ephemeris=self.ephemeris, report_dir=self.reports_dir,
+                                       collision_probability=self.collision_probability,
+                                       orbit_screening=self.orbit_screening)
+            result = pipeline.run(**mission, **self.horizon, budget=self.budget, viz_filename=f"{name}.html",
+                                  report_filename=f"{name}.txt")
+        except Exception as e:
+            print(f"Mission {number} failed: {e}")
+            return dict(row, status='failed', error=str(e), elapsed_s=time.perf_counter() - start)
+        optimization = result['optimization']
+        return dict(row, status='ok', elapsed_s=time.perf_counter() - start,
+                    initial_collisions=len(result['initial_collisions']), collisions=result['collisions'],
+                    optimized=optimization is not None,
+                    max_pc=max((row['pc'] for row in result['conjunctions'] or []), default=None),
+                    orbit_conjunctions=len(result['orbit_screening']['conjunctions'])
+                    if result['orbit_screening'] else None,
+                    optimization_stop=optimization['stop_reason'] if optimization else None,
+                    t_climb_s=float(result['trajectory_data'][1]),
+                    figure=os.path.join(self.figures_dir, result['viz_filename']), report=result['report_path'])
+
+    @staticmethod
+    def summary_table(results):
+        """Fixed-width text table of the batch results."""
+        rows = []
+        for result in results:
+            collisions = (f"{result['initial_collisions']} -> {result['collisions']}" if result['status'] == 'ok'
+                          else '-')
+            rows.append([str(result['mission']), result['rocket_type'], f"{result['altitude_km']:g}",
+                         result['orbit_type'], result['timestamp'], result['status'], collisions,
+                         'yes' if result.get('optimized') else 'no', f"{result['elapsed_s']:.1f}",
+                         os.path.basename(result['report']) if result.get('report') else result.get('error', '')])
+        widths = [max([len(column), *(len(row[i]) for row in rows)]) for i, column in enumerate(SUMMARY_COLUMNS)]
+        lines = ["  ".join(column.ljust(width) for column, width in zip(SUMMARY_COLUMNS, widths)).rstrip(),
+                 "  ".join('-' * width for width in widths)]
+        lines.extend("  ".join(value.ljust(width) for value, width in zip(row, widths)).rstrip() for row in rows)
+        return "\n".join(lines) + "\n"
+
+    def write_summary(self, results):
+        """Write results.json, summary.csv and summary.txt into output_dir; returns the summary.txt path."""
+        with open(os.path.join(self.output_dir, "results.json"), 'w') as f:
+            json.dump(results, f, indent=2)
+        fields = list(dict.fromkeys(key for result in results for key in result))
+        with open(os.path.join(self.output_dir, "summary.csv"), 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=fields)
+            writer.writeheader()
+            writer.writerows(results)
+        summary_path = os.path.join(self.output_dir, "summary.txt")
+        with open(summary_path, 'w') as f:
+            f.write(self.summary_table(results))
+        return summary_path
@@ -1,46 +1,292 @@
 # src/core/collision_detector.py
+import os
+import threading
 import numpy as np
 from datetime import timedelta
-from sgp4.api import Satrec, jday
+from sgp4.api import Satrec, SatrecArray
+from src.core.conjunction_events import CONJUNCTION_DTYPE, merge_hits, refine_approach
+from src.core.element_history import ElementHistory
+from src.utils.orbit_utils import earth_rotation, launch_jday, teme_to_ecef
+from src.utils.tle_preprocessor import catalog_history_path
 
 class CollisionDetector:
-    def __init__(self, tle_txt_path, threshold_km=1.0):
+    STEP_S = 10.0  # Screening time step (s)
+    # Per catalog path: (line1, line2) -> Satrec of the last load, so reloading a merged catalog only parses
+    # the element sets that changed
+    _satrec_cache = {}
+    _satrec_cache_lock = threading.Lock()
+
+    def __init__(self, tle_txt_path, threshold_km=1.0, progress=None, history_path=None):
         self.tle_txt_path = tle_txt_path
         self.threshold_km = threshold_km
+        self.progress = progress  # Optional callable(stage, percent=None, message='', **fields)
+        # Older element sets of the catalog objects; each object is propagated from its set nearest in time
+        self.history_path = history_path or catalog_history_path(tle_txt_path)
+        self._satellites = None
+        self._satnums = None
+        self._history = None
+        self._selected = None  # (nearest history indices, satellites) of the last _satellites_at
+        # Per catalog object (in load order) after detect_collisions: satnum, closest screened distance and its time
+        self.closest_approach = None
 
     def load_tle_data(self):
         """Load TLE data and create Satrec objects."""
+        satellites = self._read_satellites(self.tle_txt_path)
+        if self.progress is not None:
+            self.progress('tle_load', 100, f"Loaded {len(satellites)} TLE objects", objects=len(satellites))
+        return satellites
+
+    def _read_satellites(self, path):
+        """Satrec objects of a 2-line TLE file, reusing those of unchanged element sets from the last load."""
         satellites = []
-        with open(self.tle_txt_path, 'r') as f:
+        with self._satrec_cache_lock:
+            previous = self._satrec_cache.get(path, {})
+        parsed = {}
+        with open(path, 'r') as f:
             lines = f.readlines()
             for i in range(0, len(lines), 2):
                 line1 = lines[i].strip()
                 line2 = lines[i + 1].strip()
-                try:
-                    sat = Satrec.twoline2rv(line1, line2)
-                    satellites.append(sat)
-                except Exception as e:
-                    print(f"Skipping invalid TLE: {e}")
+                sat = previous.get((line1, line2))
+                if sat is None:
+                    try:
+                        sat = Satrec.twoline2rv(line1, line2)
+                    except Exception as e:
+                        print(f"Skipping invalid TLE: {e}")
+                        continue
+                parsed[(line1, line2)] = sat
+                satellites.append(sat)
+        with self._satrec_cache_lock:
+            self._satrec_cache[path] = parsed
         return satellites
 
-    def detect_collisions(self, trajectory_equations, launch_timestamp, t_climb):
-        """Detect collisions with fewer time steps."""
-        satellites = self.load_tle_data()
-        collisions = []
+    def _cached_satellites(self):
+        """Load the catalog once for repeated per-step queries (e.g. DDQL state building)."""
+        if self._satellites is None:
+            self._use_satellites(self.load_tle_data())
+        return self._satellites
+
+    def _use_satellites(self, satellites):
+        """Make a freshly loaded catalog current, reloading its history with it."""
+        self._satellites = satellites
+        self._satnums = np.array([sat.satnum for sat in satellites], dtype=np.int64)
+        self._history = None
+        self._selected = None
+
+    def _cached_history(self):
+        """ElementHistory of the catalog's history file, or None without one."""
+        if self._history is None:
+            exists = os.path.exists(self.history_path)
+            self._history = ElementHistory(self._read_satellites(self.history_path) if exists else [])
+        return self._history if len(self._history) else None
+
+    def _satellites_at(self, jd, fr):
+        """Catalog objects in load order, each as its element set with the epoch nearest the given time."""
+        satellites = self._cached_satellites()
+        history = self._cached_history()
+        if history is None:
+            return satellites
+        nearest = history.nearest(self._satnums, jd + fr)
+        if self._selected is None or not np.array_equal(nearest, self._selected[0]):
+            self._selected = (nearest, [history.satellites[k] if k >= 0 else sat
+                                        for k, sat in zip(nearest.tolist(), satellites)])
+        return self._selected[1]
+
+    def _rocket_position(self, trajectory_equations, t):
+        """Rocket position (m) at t seconds after launch."""
+        return np.array([trajectory_equations['x'](t),
+                         trajectory_equations['y'](t),
+                         trajectory_equations['z'](t)])
+
+    def _debris_positions(self, launch_timestamp, t):
+        """Earth-fixed positions (m) of every propagatable catalog object at t seconds after launch."""
+        jd, fr = launch_jday(launch_timestamp)
+        fr += t / 86400.0
+        if fr >= 1.0:
+            jd += int(fr)
+            fr = fr % 1.0
+
+        positions = []
+        for sat in self._satellites_at(jd, fr):
+            e, r, v = sat.sgp4(jd, fr)
+            if e == 0:
+                positions.append(r)
+        if not positions:
+            return []
+        return list(teme_to_ecef(np.array(positions) * 1000, earth_rotation(launch_timestamp, [t])))
+
+    def propagate_objects(self, indices, launch_timestamp, t_values):
+        """
+        Earth-fixed positions (m) of the catalog objects at the given load-order indices, t seconds after launch,
+        in the frame of the trajectory equations (SGP4's TEME output rotated by GMST as one block).
+        Returns an array of shape (len(indices), len(t_values), 3), NaN where SGP4 fails. With a history, each
+        object uses its element set nearest in time, batched over runs of times with the same choices.
+        """
+        if len(indices) == 0 or len(t_values) == 0:
+            return np.empty((len(indices), len(t_values), 3))
+        satellites = self._cached_satellites()
+        jd, fr = launch_jday(launch_timestamp)
+        t_values = np.asarray(t_values, dtype=float)
+        fractions = fr + t_values / 86400.0
+        history = self._cached_history()
+        if history is None:
+            runs = [(slice(None), [satellites[i] for i in indices])]
+        else:
+            runs = [(times, [history.satellites[k] if k >= 0 else satellites[i]
+                             for k, i in zip(nearest.tolist(), indices)])
+                    for times, nearest in history.segments(self._satnums[indices], jd + fractions)]
 
-        # Time steps: every 10 seconds (adjustable)
-        step_size = 10.0
-        t_steps = np.arange(0, t_climb, step_size)
+        positions = np.empty((len(indices), len(t_values), 3))
+        for times, run_satellites in runs:
+            e, r, _ = SatrecArray(run_satellites).sgp4(np.full(len(fractions[times]), jd), fractions[times])
+            r[e != 0] = np.nan
+            positions[:, times] = r * 1000
+        return teme_to_ecef(positions, earth_rotation(launch_timestamp, t_values))
+
+    @classmethod
+    def screening_times(cls, t_climb):
+        return np.arange(0, t_climb, cls.STEP_S)
+
+    def screen_objects(self, indices, launch_timestamp, sampled):
+        """
+        Closest screened distance (km) and its time for the catalog objects at the given load-order indices,
+        as detect_collisions computes them against a SampledTrajectory; used to re-screen only the objects
+        changed by a catalog merge. Returns (distance_km, t), inf / NaN for objects that never propagate.
+        """
+        t_steps = self.screening_times(sampled.t_climb)
+        positions = self.propagate_objects(indices, launch_timestamp, t_steps)
+        distances = np.linalg.norm(positions - sampled.positions_at(t_steps), axis=2) / 1000
+        distances[np.isnan(distances)] = np.inf
+        distance_km = distances.min(axis=1, initial=np.inf)
+        t = np.full(len(indices), np.nan)
+        reached = np.isfinite(distance_km)
+        t[reached] = t_steps[distances[reached].argmin(axis=1)]
+        return distance_km, t
+
+    @staticmethod
+    def splice_closest_approach(closest_approach, satnums, indices, distance_km, t):
+        """
+        closest_approach of a merged catalog (satnums in load order; objects updated in place, new ones appended)
+        from the previous catalog's, with the re-screened objects at the given indices replaced. None when the
+        previous catalog order is not a prefix of the merged one.
+        """
+        previous = closest_approach['satnum']
+        if len(previous) > len(satnums) or not np.array_equal(previous, satnums[:len(previous)]):
+            return None
+        spliced = {
+            'satnum': np.asarray(satnums, dtype=np.int32),
+            'distance_km': np.full(len(satnums), np.inf),
+            't': np.full(len(satnums), np.nan)
+        }
+        spliced['distance_km'][:len(previous)] = closest_approach['distance_km']
+        spliced['t'][:len(previous)] = closest_approach['t']
+        spliced['distance_km'][indices] = distance_km
+        spliced['t'][indices] = t
+        return spliced
+
+    def _conjunction_events(self, hits, t_steps, launch_timestamp, trajectory_equations, sampled, dt_s=0.5):
+        """
+        Merged events (CONJUNCTION_DTYPE) of screening hits (object indices, step indices, distances in km,
+        object positions in m). The relative velocity at each event's closest step is a central difference over
+        dt_s, from which the time and distance of closest approach are refined between the neighbouring steps.
+        """
+        objects, steps, distances_km, positions = hits
+        closest, first, last, count = merge_hits(objects, steps, distances_km)
+        events = np.zeros(len(closest), dtype=CONJUNCTION_DTYPE)
+        if len(closest) == 0:
+            return events
+        objects = np.asarray(objects)[closest]
+        t = t_steps[np.asarray(steps)[closest]]
+        events['satnum'] = self._satnums[objects]
+        events['t'] = t
+        events['distance_km'] = np.asarray(distances_km)[closest]
+        events['first_t'] = t_steps[first]
+        events['last_t'] = t_steps[last]
+        events['steps'] = count
+        events['position'] = np.asarray(positions).reshape(-1, 3)[closest]
+
+        if sampled is not None:
+            rocket = np.stack([sampled.positions_at(t + offset) for offset in (-dt_s, 0.0, dt_s)], axis=1)
+        else:
+            rocket = np.array([[self._rocket_position(trajectory_equations, step + offset)
+                                for offset in (-dt_s, 0.0, dt_s)] for step in t]).reshape(-1, 3, 3)
+        debris = np.empty((len(t), 2, 3))
+        for step in np.unique(t):
+            rows = np.flatnonzero(t == step)
+            debris[rows] = self.propagate_objects(objects[rows], launch_timestamp, [step - dt_s, step + dt_s])
+        events['rocket_position'] = rocket[:, 1]
+        relative_velocity = ((debris[:, 1] - debris[:, 0]) - (rocket[:, 2] - rocket[:, 0])) / (2 * dt_s) / 1000
+        relative_velocity[~np.isfinite(relative_velocity)] = 0.0  # Not propagatable around t: no refinement
+        shift, miss_km = refine_approach((events['position'] - rocket[:, 1]) / 1000, relative_velocity, self.STEP_S)
+        events['tca'] = t + shift
+        events['miss_km'] = miss_km
+        events['relative_speed_km_s'] = np.linalg.norm(relative_velocity, axis=1)
+        return events
+
+    def _detect_from_ephemeris(self, trajectory_equations, launch_timestamp, t_climb, sampled, ephemeris):
+        """detect_collisions as array operations over shared catalog positions; same result and order."""
+        t_steps = self.screening_times(t_climb)
+        print(f"Checking {len(t_steps)} time steps against {len(self._satellites)} satellites (shared ephemeris)...")
+        if sampled is not None:
+            rocket_positions = sampled.positions_at(t_steps)
+        else:
+            rocket_positions = np.array([self._rocket_position(trajectory_equations, t)
+                                         for t in t_steps]).reshape(-1, 3)
+        positions = ephemeris.positions(self, launch_timestamp, t_steps)
+        distances = np.linalg.norm(positions - rocket_positions, axis=2) / 1000
+        distances[np.isnan(distances)] = np.inf
+
+        distance_km = distances.min(axis=1, initial=np.inf)
+        t = np.full(len(distance_km), np.nan)
+        reached = np.isfinite(distance_km)
+        t[reached] = t_steps[distances[reached].argmin(axis=1)]
+        self.closest_approach = {
+            'satnum': self._satnums.astype(np.int32),
+            'distance_km': distance_km,
+            't': t
+        }
+        objects, steps = np.nonzero(distances < self.threshold_km)
+        collisions = self._conjunction_events((objects, steps, distances[objects, steps], positions[objects, steps]),
+                                              t_steps, launch_timestamp, trajectory_equations, sampled)
+        if self.progress is not None:
+            self.progress('screening', 100, f"Screening complete: {len(collisions)} collisions",
+                          step=len(t_steps), steps=len(t_steps), collisions=len(collisions))
+        return collisions
+
+    def detect_collisions(self, trajectory_equations, launch_timestamp, t_climb, sampled=None, ephemeris=None):
+        """
+        Detect collisions with fewer time steps.
+        Returns one event per encounter (CONJUNCTION_DTYPE records ordered by time): consecutive screened steps
+        within threshold_km of the same object merge into one event with its closest approach.
+        With a SampledTrajectory sampled at the screening times (screening_step_s=STEP_S), rocket positions are
+        read from it instead of evaluating the trajectory equations. With a CatalogEphemeris, catalog positions
+        are read from it (propagated once per launch time and shared between missions).
+        """
+        self._use_satellites(self.load_tle_data())
+        satellites = self._satellites
+        if ephemeris is not None:
+            return self._detect_from_ephemeris(trajectory_equations, launch_timestamp, t_climb, sampled, ephemeris)
+        hits = ([], [], [], [])  # Object indices, step indices, distances (km), object positions (m)
+        min_distance_km = np.full(len(satellites), np.inf)
+        min_distance_t = np.full(len(satellites), np.nan)
+
+        # Time steps: every STEP_S seconds (adjustable)
+        t_steps = self.screening_times(t_climb)
+        rocket_positions = sampled.positions_at(t_steps) if sampled is not None else None
         print(f"Checking {len(t_steps)} time steps against {len(satellites)} satellites...")
 
-        jd_launch, fr_launch = jday(launch_timestamp.year, launch_timestamp.month, launch_timestamp.day,
-                                   launch_timestamp.hour, launch_timestamp.minute, launch_timestamp.second)
+        jd_launch, fr_launch = launch_jday(launch_timestamp)
+        rotation = earth_rotation(launch_timestamp, t_steps)
 
-        for t in t_steps:
-            x = trajectory_equations['x'](t)
-            y = trajectory_equations['y'](t)
-            z = trajectory_equations['z'](t)
-            rocket_pos = np.array([x, y, z])
+        report_every = max(1, len(t_steps) // 20)  # ~5% granularity
+        for i, t in enumerate(t_steps):
+            if self.progress is not None and i % report_every == 0:
+                self.progress('screening', 100 * i / len(t_steps), f"Screening t={t:.0f}s",
+                              step=i, steps=len(t_steps), collisions=len(hits[0]))
+            if rocket_positions is not None:
+                rocket_pos = rocket_positions[i]
+            else:
+                rocket_pos = self._rocket_position(trajectory_equations, t)
 
             delta_t_days = t / 86400.0
             jd = jd_launch
@@ -49,22 +295,39 @@ class CollisionDetector:
                 jd += int(fr)
                 fr = fr % 1.0
 
-            for sat in satellites:
+            debris_positions = np.full((len(satellites), 3), np.nan)
+            for j, sat in enumerate(self._satellites_at(jd, fr)):
                 try:
                     e, r, v = sat.sgp4(jd, fr)
-                    if e != 0:
-                        continue
-                    debris_pos = np.array(r) * 1000  # km to meters
-                    distance = np.linalg.norm(rocket_pos - debris_pos) / 1000  # to km
-                    if distance < self.threshold_km:
-                        collisions.append((t, tuple(debris_pos)))
+                    if e == 0:
+                        debris_positions[j] = r
                 except Exception:
                     continue
+            # TEME km -> Earth-fixed m, the whole step at once
+            debris_positions = teme_to_ecef(debris_positions * 1000, rotation[i:i + 1])
+            distances = np.linalg.norm(debris_positions - rocket_pos, axis=1) / 1000  # to km
+            distances[np.isnan(distances)] = np.inf
+            closer = distances < min_distance_km
+            min_distance_km[closer] = distances[closer]
+            min_distance_t[closer] = t
+            for j in np.flatnonzero(distances < self.threshold_km).tolist():
+                for column, value in zip(hits, (j, i, distances[j], debris_positions[j])):
+                    column.append(value)
 
+        self.closest_approach = {
+            'satnum': np.array([sat.satnum for sat in satellites], dtype=np.int32),
+            'distance_km': min_distance_km,
+            't': min_distance_t
+        }
+        collisions = self._conjunction_events(hits, t_steps, launch_timestamp, trajectory_equations, sampled)
+        if self.progress is not None:
+            self.progress('screening', 100, f"Screening complete: {len(collisions)} collisions",
+                          step=len(t_steps), steps=len(t_steps), collisions=len(collisions))
         return collisions
 
 if __name__ == "__main__":
     from datetime import datetime
+    from src.core.conjunction_events import describe
     traj = {
         'x': lambda t: 5.0e6,
         'y': lambda t: 0.0,
@@ -72,4 +335,5 @@ if __name__ == "__main__":
     }
     detector = CollisionDetector("/Users/thrishankkuntimaddi/Documents/Projects/SDARC-Enhanced/data/tle_data.txt")
     collisions = detector.detect_collisions(traj, datetime(2024, 6, 6, 5, 11, 42), 500.0)
-    print(f"Collisions: {collisions}")
\ No newline at end of file
+    for event in collisions:
+        print(describe(event))
\ No newline at end of file
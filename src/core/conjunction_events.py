@@ -0,0 +1,60 @@
+# src/core/conjunction_events.py
+import numpy as np
+
+# One record per encounter: consecutive screening hits on the same object merge into one event
+CONJUNCTION_DTYPE = np.dtype([
+    ('satnum', np.int32),
+    ('t', np.float64),                    # Screened step nearest the object (s after launch)
+    ('distance_km', np.float64),          # Screened distance at t
+    ('tca', np.float64),                  # Time of closest approach under linear relative motion around t
+    ('miss_km', np.float64),              # Distance at tca
+    ('relative_speed_km_s', np.float64),
+    ('first_t', np.float64),              # First and last screened steps within the threshold
+    ('last_t', np.float64),
+    ('steps', np.int32),                  # Screened steps within the threshold
+    ('position', np.float64, (3,)),       # Object position at t (m)
+    ('rocket_position', np.float64, (3,))
+])
+
+
+def merge_hits(objects, steps, distances_km):
+    """
+    Group screening hits (object index, step index, distance) into encounters: runs of consecutive steps on the
+    same object. Returns (index of each encounter's closest hit, first step, last step, hit count), encounters
+    ordered by the time of their closest hit, then by object.
+    """
+    objects = np.asarray(objects, dtype=np.int64)
+    steps = np.asarray(steps, dtype=np.int64)
+    distances_km = np.asarray(distances_km, dtype=float)
+    if len(objects) == 0:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, empty, empty
+    order = np.lexsort((steps, objects))
+    objects, steps = objects[order], steps[order]
+    boundary = np.r_[True, (np.diff(objects) != 0) | (np.diff(steps) != 1)]
+    starts = np.flatnonzero(boundary)
+    encounter = np.cumsum(boundary) - 1
+    ends = np.r_[starts[1:], len(objects)] - 1
+    # First hit of each encounter after sorting by (encounter, distance) is its closest one
+    closest = np.lexsort((distances_km[order], encounter))[starts]
+    chronological = np.lexsort((objects[closest], steps[closest]))
+    return (order[closest][chronological], steps[starts][chronological], steps[ends][chronological],
+            (ends - starts + 1)[chronological])
+
+
+def refine_approach(relative_position_km, relative_velocity_km_s, max_shift_s):
+    """
+    Time offset and distance of the closest approach under linear relative motion from states (n, 3) at the
+    screened steps, the offset limited to +-max_shift_s (the neighbouring steps were screened farther away).
+    """
+    speed_sq = np.sum(relative_velocity_km_s ** 2, axis=1)
+    shift = -np.sum(relative_position_km * relative_velocity_km_s, axis=1) / np.where(speed_sq > 0, speed_sq, 1.0)
+    shift = np.clip(np.nan_to_num(shift), -max_shift_s, max_shift_s)
+    miss_km = np.linalg.norm(relative_position_km + relative_velocity_km_s * shift[:, None], axis=1)
+    return shift, miss_km
+
+
+def describe(event, label="Unknown Object"):
+    """One-line summary of an event."""
+    return (f"{label} NORAD {event['satnum']}: miss {event['miss_km'] * 1000:.0f} m at TCA {event['tca']:.1f} s, "
+            f"{event['relative_speed_km_s']:.2f} km/s, screened steps within threshold: {event['steps']}")
@@ -2,21 +2,129 @@
 import numpy as np
 from datetime import datetime
 import random
+import json
+import threading
+import time
 from collections import deque
+from contextlib import contextmanager
 import tensorflow as tf
 from tensorflow.keras import layers, optimizers
 from src.core.collision_detector import CollisionDetector
 import os
 
+# Optimizers running concurrently (batch missions, web jobs) share one checkpoint file
+_checkpoint_lock = threading.Lock()
+
+
+class EpisodeTelemetry:
+    """Wall time per training phase and work counters for a single DDQL episode."""
+    PHASES = ('state', 'action_selection', 'screening', 'replay_predict', 'replay_fit', 'target_update', 'evaluation')
+
+    def __init__(self, episode):
+        self.episode = episode
+        self.phase_times = {phase: 0.0 for phase in self.PHASES}
+        self.screening_calls = 0
+        self.replay_batches = 0
+        self.steps = 0
+        self._start = time.perf_counter()
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phase_times[name] += time.perf_counter() - start
+
+    def summary(self, epsilon, total_reward, collisions):
+        wall_time = time.perf_counter() - self._start
+        return {
+            'episode': self.episode,
+            'steps': self.steps,
+            'wall_time_s': wall_time,
+            'phase_times_s': dict(self.phase_times),
+            'screening_calls': self.screening_calls,
+            'replay_batches': self.replay_batches,
+            'steps_per_sec': self.steps / wall_time if wall_time > 0 else 0.0,
+            'epsilon': epsilon,
+            'total_reward': total_reward,
+            'collisions': collisions
+        }
+
+
+class OptimizationBudget:
+    """Wall-clock / screening-evaluation budget and stopping rules for anytime optimization."""
+
+    def __init__(self, time_budget_s=None, max_evaluations=None, patience=None):
+        self.time_budget_s = time_budget_s
+        self.max_evaluations = max_evaluations
+        self.patience = patience
+        self.evaluations = 0
+        self.episodes = 0
+        self.stop_reason = None
+        self._episodes_since_improvement = 0
+        self._improved = False
+        self._start = None
+
+    def start(self):
+        self._start = time.perf_counter()
+
+    def elapsed(self):
+        return time.perf_counter() - self._start if self._start is not None else 0.0
+
+    def check(self):
+        """Return True (and record why) once the time or evaluation budget is spent."""
+        if self.stop_reason:
+            return True
+        if self.time_budget_s is not None and self.elapsed() >= self.time_budget_s:
+            self.stop_reason = 'time_budget'
+        elif self.max_evaluations is not None and self.evaluations >= self.max_evaluations:
+            self.stop_reason = 'evaluation_budget'
+        return self.stop_reason is not None
+
+    def improved(self):
+        self._improved = True
+
+    def end_episode(self):
+        if self._improved:
+            self._episodes_since_improvement = 0
+        else:
+            self._episodes_since_improvement += 1
+        self._improved = False
+        if not self.stop_reason and self.patience is not None and self._episodes_since_improvement >= self.patience:
+            self.stop_reason = 'no_improvement'
+        self.check()
+
+    def result(self, equations, collisions, initial_collisions, episodes, stop_reason):
+        return {
+            'equations': equations,
+            'collisions': collisions,
+            'initial_collisions': initial_collisions,
+            'stop_reason': stop_reason,
+            'budget': {
+                'time_budget_s': self.time_budget_s,
+                'max_evaluations': self.max_evaluations,
+                'patience': self.patience
+            },
+            'budget_consumed': {
+                'elapsed_s': self.elapsed(),
+                'evaluations': self.evaluations,
+                'episodes': episodes
+            }
+        }
+
+
 class DDQLOptimizer:
     def __init__(self, equations, t_max, timestamp, tle_data_path, threshold_km=1.0, learning_rate=0.001,
-                 discount_factor=0.95, exploration_rate=1.0, exploration_decay=0.995):
+                 discount_factor=0.95, exploration_rate=1.0, exploration_decay=0.995,
+                 metrics_callback=None, metrics_log_path=None, progress=None, ephemeris=None):
         self.equations = equations.copy()
         self.t_max = t_max
         self.timestamp = timestamp
         self.tle_data_path = tle_data_path
         self.threshold_km = threshold_km
         self.detector = CollisionDetector(tle_txt_path=tle_data_path, threshold_km=threshold_km)
+        self.ephemeris = ephemeris  # Optional CatalogEphemeris: screenings read shared catalog positions
         self.learning_rate = learning_rate
         self.discount_factor = discount_factor
         self.exploration_rate = exploration_rate
@@ -24,6 +132,14 @@ class DDQLOptimizer:
         self.state_size = 6  # [rocket_x, y, z, nearest_debris_x, y, z]
         self.action_size = 5  # Actions: [no change, +x vel, -x vel, +y vel, -y vel]
         self.memory = deque(maxlen=10000)
+        # Per-episode telemetry: callback(metrics_dict) and/or a JSON-lines log for offline analysis
+        self.metrics_callback = metrics_callback
+        self.metrics_log_path = metrics_log_path
+        self.episode_metrics = []
+        self._telemetry = None
+        self.progress = progress  # Optional callable(stage, percent=None, message='', **fields)
+        self._episodes_planned = None
+        self._target_satnums = None  # Objects whose conjunctions count in screenings (None = all)
         self.model = self._build_model()
         self.target_model = self._build_model()
         self.update_target_model()
@@ -66,42 +182,144 @@ class DDQLOptimizer:
         state = np.concatenate([rocket_pos, nearest_debris])
         return state
 
+    @staticmethod
+    def _scale_velocity(equation, coefficient, factor):
+        """Scale an axis' velocity: string equations patch the literal, callables scale displacement from launch."""
+        if isinstance(equation, str):
+            return equation.replace(coefficient, str(float(coefficient) * factor))
+        origin = equation(0)
+        return lambda t: origin + factor * (equation(t) - origin)
+
     def _apply_action(self, action):
         new_equations = self.equations.copy()
         if action == 1:  # +x vel
-            new_equations['x'] = new_equations['x'].replace('5649.37', str(5649.37 * 1.1))
+            new_equations['x'] = self._scale_velocity(new_equations['x'], '5649.37', 1.1)
         elif action == 2:  # -x vel
-            new_equations['x'] = new_equations['x'].replace('5649.37', str(5649.37 * 0.9))
+            new_equations['x'] = self._scale_velocity(new_equations['x'], '5649.37', 0.9)
         elif action == 3:  # +y vel
-            new_equations['y'] = new_equations['y'].replace('5258.77', str(5258.77 * 1.1))
+            new_equations['y'] = self._scale_velocity(new_equations['y'], '5258.77', 1.1)
         elif action == 4:  # -y vel
-            new_equations['y'] = new_equations['y'].replace('5258.77', str(5258.77 * 0.9))
+            new_equations['y'] = self._scale_velocity(new_equations['y'], '5258.77', 0.9)
         return new_equations
 
+    @contextmanager
+    def _phase(self, name):
+        """Time a training phase against the current episode's telemetry (no-op outside optimize)."""
+        if self._telemetry is None:
+            yield
+        else:
+            with self._telemetry.phase(name):
+                yield
+
+    def _screen(self, equations, phase='screening'):
+        with self._phase(phase):
+            if self._telemetry is not None:
+                self._telemetry.screening_calls += 1
+            collisions = self.detector.detect_collisions(equations, self.timestamp, self.t_max,
+                                                         ephemeris=self.ephemeris)
+            if self._target_satnums is not None:
+                collisions = collisions[np.isin(collisions['satnum'], self._target_satnums)]
+            return collisions
+
+    def _record_episode(self, metrics):
+        self.episode_metrics.append(metrics)
+        if self.progress is not None:
+            self.progress('optimization', 100 * metrics['episode'] / self._episodes_planned,
+                          f"Episode {metrics['episode']}/{self._episodes_planned}, reward {metrics['total_reward']}",
+                          episode=metrics['episode'], episodes=self._episodes_planned,
+                          reward=metrics['total_reward'], collisions=metrics['collisions'], epsilon=metrics['epsilon'])
+        if self.metrics_callback is not None:
+            try:
+                self.metrics_callback(metrics)
+            except Exception as e:
+                print(f"Metrics callback failed: {e}")
+        if self.metrics_log_path:
+            log_dir = os.path.dirname(self.metrics_log_path)
+            if log_dir:
+                os.makedirs(log_dir, exist_ok=True)
+            with open(self.metrics_log_path, 'a') as f:
+                f.write(json.dumps(metrics) + "\n")
+
     def optimize(self, collisions, episodes=50, max_steps=100):
-        if not collisions:
+        if not len(collisions):
             print("No collisions to optimize.")
             return self.equations
 
         print(f"Optimizing trajectory to avoid {len(collisions)} collisions...")
+        current_equations, _ = self._train(collisions, episodes, max_steps)
+        self._save_weights()
+
+        final_collisions = self.detector.detect_collisions(current_equations, self.timestamp, self.t_max,
+                                                           ephemeris=self.ephemeris)
+        print(f"Optimization complete. Final collisions: {len(final_collisions)}")
+        return current_equations
+
+    def optimize_anytime(self, collisions, time_budget_s=None, max_evaluations=None, patience=None,
+                         max_episodes=50, max_steps=100, target_satnums=None):
+        """
+        Train under a wall-clock and/or screening-evaluation budget and return the best trajectory found so far.
+        Stops early once a collision-free trajectory is found or the best result has not improved for
+        `patience` episodes. Returns a dict with the best equations, its collision count and the budget consumed.
+        With target_satnums, only conjunctions with those objects count (e.g. the ones above a Pc threshold).
+        """
+        self._target_satnums = np.asarray(target_satnums) if target_satnums is not None else None
+        budget = OptimizationBudget(time_budget_s=time_budget_s, max_evaluations=max_evaluations, patience=patience)
+        if not len(collisions):
+            print("No collisions to optimize.")
+            budget.start()
+            return budget.result(self.equations, 0, 0, episodes=0, stop_reason='no_collisions')
+
+        print(f"Optimizing trajectory to avoid {len(collisions)} collisions "
+              f"(time budget: {time_budget_s} s, evaluation budget: {max_evaluations})...")
+        _, best = self._train(collisions, max_episodes, max_steps, budget=budget)
+        self._save_weights()
+
+        result = budget.result(best['equations'], best['collisions'], len(collisions),
+                               episodes=budget.episodes, stop_reason=budget.stop_reason or 'episodes')
+        print(f"Optimization stopped ({result['stop_reason']}) after {result['budget_consumed']['elapsed_s']:.1f} s, "
+              f"{result['budget_consumed']['evaluations']} evaluations. Best collisions: {result['collisions']}")
+        return result
+
+    def _train(self, collisions, episodes, max_steps, budget=None):
+        """Run the DDQL training loop; returns (last episode's equations, best-so-far record)."""
+        best = {'equations': self.equations.copy(), 'collisions': len(collisions)}
+        current_equations = self.equations.copy()
+        self._episodes_planned = episodes
+        if budget is not None:
+            budget.start()
+
         for episode in range(episodes):
-            state = self._get_state(0)
+            self._telemetry = EpisodeTelemetry(episode + 1)
+            with self._phase('state'):
+                state = self._get_state(0)
             total_reward = 0
             current_equations = self.equations.copy()
+            current_collisions = len(collisions)
 
             for step in range(max_steps):
+                if budget is not None and budget.check():
+                    break
+                self._telemetry.steps += 1
                 t = step * (self.t_max / max_steps)
-                if random.uniform(0, 1) < self.exploration_rate:
-                    action = random.randrange(self.action_size)
-                else:
-                    q_values = self.model.predict(state[np.newaxis, :], verbose=0)
-                    action = np.argmax(q_values[0])
-
-                new_equations = self._apply_action(action)
-                new_collisions = self.detector.detect_collisions(new_equations, self.timestamp, self.t_max)
-                reward = -100 * len(new_collisions) + 10 if not new_collisions else -100 * len(new_collisions)
-                done = step == max_steps - 1 or not new_collisions
-                next_state = self._get_state(t)
+                with self._phase('action_selection'):
+                    if random.uniform(0, 1) < self.exploration_rate:
+                        action = random.randrange(self.action_size)
+                    else:
+                        q_values = self.model.predict(state[np.newaxis, :], verbose=0)
+                        action = np.argmax(q_values[0])
+
+                    new_equations = self._apply_action(action)
+                new_collisions = self._screen(new_equations)
+                if budget is not None:
+                    budget.evaluations += 1
+                if len(new_collisions) < best['collisions']:
+                    best = {'equations': new_equations, 'collisions': len(new_collisions)}
+                    if budget is not None:
+                        budget.improved()
+                reward = -100 * len(new_collisions) + 10 if not len(new_collisions) else -100 * len(new_collisions)
+                done = step == max_steps - 1 or not len(new_collisions)
+                with self._phase('state'):
+                    next_state = self._get_state(t)
 
                 self.memory.append((state, action, reward, next_state, done))
                 if len(self.memory) > 32:
@@ -109,16 +327,38 @@ class DDQLOptimizer:
 
                 state = next_state
                 total_reward += reward
-                current_equations = new_equations if len(new_collisions) < len(collisions) else current_equations
+                if len(new_collisions) < len(collisions):
+                    current_equations, current_collisions = new_equations, len(new_collisions)
 
                 if done:
                     break
 
             self.exploration_rate = max(0.1, self.exploration_rate * self.exploration_decay)
             if episode % 10 == 0:
-                self.update_target_model()
-            print(f"Episode {episode + 1}/{episodes}, Reward: {total_reward}, Collisions: {len(self.detector.detect_collisions(current_equations, self.timestamp, self.t_max))}")
+                with self._phase('target_update'):
+                    self.update_target_model()
+            if budget is not None and budget.check():
+                # Budget spent: no evaluation screening, the episode's trajectory was screened when it was chosen
+                episode_collisions = current_collisions
+            else:
+                episode_collisions = len(self._screen(current_equations, phase='evaluation'))
+                if budget is not None:
+                    budget.evaluations += 1
+            self._record_episode(self._telemetry.summary(self.exploration_rate, total_reward, episode_collisions))
+            self._telemetry = None
+            print(f"Episode {episode + 1}/{episodes}, Reward: {total_reward}, Collisions: {episode_collisions}")
+
+            if budget is not None:
+                budget.episodes += 1
+                if best['collisions'] == 0:
+                    budget.stop_reason = 'clean_trajectory'
+                budget.end_episode()
+                if budget.stop_reason:
+                    break
+
+        return current_equations, best
 
+    def _save_weights(self):
         # Save weights as .npz
         os.makedirs(self.checkpoint_dir, exist_ok=True)
         try:
@@ -127,15 +367,16 @@ class DDQLOptimizer:
             for i, w in enumerate(weights):
                 if w.size == 0:
                     print(f"Warning: Weight {i} has size 0: {w.shape}")
-            np.savez(self.checkpoint_path, *weights)
+            # Written to a temporary file and swapped in, so concurrent loads never read a partial checkpoint
+            with _checkpoint_lock:
+                tmp_path = f"{self.checkpoint_path}.{os.getpid()}.tmp"
+                with open(tmp_path, 'wb') as f:
+                    np.savez(f, *weights)
+                os.replace(tmp_path, self.checkpoint_path)
             print(f"Saved model weights to {self.checkpoint_path}")
         except Exception as e:
             print(f"Failed to save weights: {e}")
 
-        final_collisions = self.detector.detect_collisions(current_equations, self.timestamp, self.t_max)
-        print(f"Optimization complete. Final collisions: {len(final_collisions)}")
-        return current_equations
-
     def _replay(self, batch_size):
         minibatch = random.sample(self.memory, batch_size)
         states = np.array([m[0] for m in minibatch])
@@ -144,11 +385,15 @@ class DDQLOptimizer:
         next_states = np.array([m[3] for m in minibatch])
         dones = np.array([m[4] for m in minibatch])
 
-        targets = self.model.predict(states, verbose=0)
-        next_q_values = self.target_model.predict(next_states, verbose=0)
+        with self._phase('replay_predict'):
+            targets = self.model.predict(states, verbose=0)
+            next_q_values = self.target_model.predict(next_states, verbose=0)
         for i in range(batch_size):
             targets[i][actions[i]] = rewards[i] + self.discount_factor * np.max(next_q_values[i]) * (1 - dones[i])
-        self.model.fit(states, targets, epochs=1, verbose=0)
+        with self._phase('replay_fit'):
+            self.model.fit(states, targets, epochs=1, verbose=0)
+        if self._telemetry is not None:
+            self._telemetry.replay_batches += 1
 
 if __name__ == "__main__":
     test_equations = {
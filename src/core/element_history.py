@@ -0,0 +1,70 @@
+# src/core/element_history.py
+import numpy as np
+
+
+class ElementHistory:
+    """
+    Several element sets (Satrec) per catalog object, sorted by satellite number then epoch, so each object can
+    be propagated from the element set whose epoch is nearest the propagation time (SGP4 error grows quickly
+    with the distance from epoch). Lookups are binary searches over one key per element set.
+    """
+
+    def __init__(self, satellites):
+        epochs = np.array([sat.jdsatepoch + sat.jdsatepochF for sat in satellites], dtype=float)
+        satnums = np.array([sat.satnum for sat in satellites], dtype=np.int64)
+        order = np.lexsort((epochs, satnums))
+        self.satellites = [satellites[i] for i in order]
+        self.satnums = satnums[order]
+        self.epochs = epochs[order]  # Julian dates
+
+        self.starts = np.flatnonzero(np.diff(self.satnums, prepend=-1) != 0)
+        self.ends = np.append(self.starts[1:], len(self.satnums))
+        self.object_satnums = self.satnums[self.starts]
+        # Key of each set: object rank * span + epoch offset, increasing over the whole sorted array
+        self._origin = self.epochs.min() if len(self.epochs) else 0.0
+        self._span = self.epochs.max() - self._origin + 1.0 if len(self.epochs) else 1.0
+        ranks = np.repeat(np.arange(len(self.starts)), self.ends - self.starts)
+        self._keys = ranks * self._span + (self.epochs - self._origin)
+
+    def __len__(self):
+        return len(self.satellites)
+
+    def nearest(self, satnums, jd):
+        """
+        Index into satellites of each object's element set with the epoch nearest jd (one Julian date, or one
+        per object); -1 for objects without history.
+        """
+        satnums = np.asarray(satnums)
+        chosen = np.full(len(satnums), -1, dtype=np.int64)
+        if not len(self.satellites) or not len(satnums):
+            return chosen
+        ranks = np.minimum(np.searchsorted(self.object_satnums, satnums), len(self.object_satnums) - 1)
+        present = self.object_satnums[ranks] == satnums
+        ranks = ranks[present]
+        jd = np.broadcast_to(np.asarray(jd, dtype=float), satnums.shape)[present]
+
+        offsets = np.clip(jd - self._origin, 0.0, self._span - 1.0)
+        after = np.minimum(np.searchsorted(self._keys, ranks * self._span + offsets), self.ends[ranks] - 1)
+        before = np.maximum(after - 1, self.starts[ranks])
+        closer_before = jd - self.epochs[before] < self.epochs[after] - jd
+        chosen[present] = np.where(closer_before, before, after)
+        return chosen
+
+    def segments(self, satnums, jd_values):
+        """
+        Split propagation times (Julian dates) into runs over which every object's nearest element set stays the
+        same, so each run propagates as one batch. Yields (slice of jd_values, nearest indices as from nearest()).
+        """
+        jd_values = np.asarray(jd_values, dtype=float)
+        first = self.nearest(satnums, jd_values.min())
+        # The nearest set only moves forward in time: objects with the same set at both ends never switch
+        switching = np.flatnonzero(first != self.nearest(satnums, jd_values.max()))
+        if not len(switching):
+            yield slice(0, len(jd_values)), first
+            return
+        per_time = np.array([self.nearest(np.asarray(satnums)[switching], jd) for jd in jd_values])
+        bounds = [0, *(np.flatnonzero((per_time[1:] != per_time[:-1]).any(axis=1)) + 1), len(jd_values)]
+        for start, end in zip(bounds[:-1], bounds[1:]):
+            chosen = first.copy()
+            chosen[switching] = per_time[start]
+            yield slice(start, end), chosen
@@ -0,0 +1,59 @@
+# src/core/ephemeris.py
+import threading
+from collections import OrderedDict
+import numpy as np
+from src.utils.result_cache import catalog_fingerprint
+
+
+class CatalogEphemeris:
+    """
+    Catalog positions on the screening time grid, shared between missions with the same launch time.
+    Debris positions do not depend on the trajectory, so missions launched at the same time (a batch of rockets
+    or altitudes) propagate the catalog once. Entries are keyed by catalog content and launch time and hold the
+    longest grid requested so far (extended as longer climbs need it); the max_entries most recently used are
+    kept.
+    """
+
+    def __init__(self, max_entries=4):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # (catalog, launch time, step) -> positions (objects, steps, 3)
+        self._key_locks = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def positions(self, detector, launch_timestamp, t_steps):
+        """
+        Positions (m) of every catalog object of the detector at the screening times t_steps (a prefix of the
+        detector's screening grid), shape (objects, len(t_steps), 3), NaN where SGP4 fails.
+        """
+        key = (catalog_fingerprint(detector.tle_txt_path), launch_timestamp.isoformat(), detector.STEP_S)
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        # Concurrent missions with the same key wait for one propagation instead of repeating it
+        with key_lock:
+            with self._lock:
+                cached = self._entries.get(key)
+                if cached is not None and cached.shape[1] >= len(t_steps):
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return cached[:, :len(t_steps)]
+                self.misses += 1
+            # A longer climb only propagates the steps past the cached grid
+            done = cached.shape[1] if cached is not None else 0
+            satellites = detector._cached_satellites()
+            positions = detector.propagate_objects(np.arange(len(satellites)), launch_timestamp, t_steps[done:])
+            if cached is not None:
+                positions = np.concatenate((cached, positions), axis=1)
+            with self._lock:
+                self._entries[key] = positions
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    evicted, _ = self._entries.popitem(last=False)
+                    self._key_locks.pop(evicted, None)
+            return positions
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses,
+                    'mb': sum(positions.nbytes for positions in self._entries.values()) / 1e6}
@@ -0,0 +1,220 @@
+# src/core/mission_pipeline.py
+import os
+from contextlib import nullcontext
+import numpy as np
+from src.core.trajectory_calculator import TrajectoryCalculator
+from src.core.dummy_tle_trajectory import DummyTleTrajectory
+from src.core.collision_detector import CollisionDetector
+from src.core.collision_probability import CollisionProbability
+from src.core.ddql_optimizer import DDQLOptimizer
+from src.core.orbit_screening import OrbitScreening
+from src.core.trajectory_visualizer import TrajectoryVisualizer
+from src.core.sampled_trajectory import SampledTrajectory
+from src.core.mission_report import MissionReport
+
+
+class MissionPipeline:
+    """Trajectory -> screening -> DDQL optimization -> visualization -> report for one mission."""
+
+    def __init__(self, tle_data_path, static_dir, threshold_km=1.0, dummy=False, debris_corridor_km=None,
+                 max_debris_tracks=50, report_store=None, metrics=None, ephemeris=None, report_dir=None,
+                 collision_probability=None, orbit_screening=None):
+        self.tle_data_path = tle_data_path
+        self.static_dir = static_dir
+        self.threshold_km = threshold_km
+        self.dummy = dummy
+        self.debris_corridor_km = debris_corridor_km  # Draw tracks of objects screened within this distance (km)
+        self.max_debris_tracks = max_debris_tracks
+        self.report_store = report_store  # Optional ReportStore; reports are written as text files otherwise
+        self.metrics = metrics  # Optional MetricsRegistry timing each stage
+        self.ephemeris = ephemeris  # Optional CatalogEphemeris shared with other missions
+        self.report_dir = report_dir  # Directory of report files (MissionReport's default when None)
+        # Optional CollisionProbability: optimize only when a flagged conjunction's Pc reaches its threshold
+        self.collision_probability = collision_probability
+        self.orbit_screening = orbit_screening  # OrbitScreening settings of long-horizon runs (defaults when None)
+        self.object_label = "Dummy Debris" if dummy else "Unknown Object"
+
+    def run(self, rocket_type, launch_site, coordinates, target_altitude, orbit_type, timestamp,
+            budget=None, viz_filename=None, progress=None, trajectory_data=None, samples=None, collisions=None,
+            closest_approach=None, report_filename=None, horizon_revolutions=None, horizon_days=None):
+        """
+        Run the full mission pipeline.
+        Args:
+            coordinates: (lat, lon, alt) of the launch site.
+            budget: keyword arguments for DDQLOptimizer.optimize_anytime.
+            viz_filename: file name of the HTML figure written into static_dir.
+            progress: optional callable(stage, percent=None, message='', **fields) receiving stage progress
+                from the pipeline and from the detector, optimizer and report it drives.
+            trajectory_data, samples, collisions, closest_approach: previously computed trajectory tuple, sampled
+                arrays, initial screening result and its per-object closest approaches to reuse instead of recomputing.
+            report_filename: file name of the report written into report_dir (without a report_store).
+            horizon_revolutions / horizon_days: also screen the target orbit over this long after insertion.
+        Returns:
+            dict with viz_filename, report_id (when storing into report_store, else None), report_path (when
+            writing a file, else None), report_content, collisions, conjunctions (Pc of the flagged conjunctions
+            with a collision_probability, else None), orbit_screening (OrbitScreening.summary with a horizon,
+            else None), optimization and steps, plus the
+            trajectory_data, samples, initial_collisions and closest_approach used so callers can keep them for
+            later requests, and the displayed (possibly optimized) trajectory's display_equations, display_samples,
+            display_closest_approach, the display_collisions remaining on it and the debris_tracks drawn around it.
+        """
+        def report_progress(stage, percent=None, message='', **fields):
+            if progress is not None:
+                progress(stage, percent, message, **fields)
+
+        def timed(stage):
+            return self.metrics.stage(stage) if self.metrics is not None else nullcontext()
+
+        name = "Dummy Trajectory" if self.dummy else "Trajectory"
+        if viz_filename is None:
+            viz_filename = "dummy_trajectory.html" if self.dummy else "trajectory.html"
+
+        traj_calc = DummyTleTrajectory() if self.dummy else TrajectoryCalculator()
+        step_s = CollisionDetector.STEP_S
+        with timed('trajectory'):
+            if trajectory_data is None:
+                report_progress('trajectory', 0, f"Calculating initial {name.lower()}")
+                trajectory_data = traj_calc.calculate(rocket_type, target_altitude, coordinates)
+                samples = None
+            equations, t_climb, formulas, initial, v_orbit, burn_time = trajectory_data
+            # Sampled once, including the screening times, and shared by the detector, visualizer and report
+            sampled = SampledTrajectory.build(equations, t_climb, burn_time, samples=samples, screening_step_s=step_s)
+        samples = sampled.samples
+        report_progress('trajectory', 100, f"Time to climb: {t_climb:.0f} s", t_climb=float(t_climb))
+
+        detector = CollisionDetector(tle_txt_path=self.tle_data_path, threshold_km=self.threshold_km, progress=progress)
+        if collisions is None:
+            report_progress('tle_load', 0, "Loading TLE catalog")
+            with timed('screening'):
+                collisions = detector.detect_collisions(equations, timestamp, t_climb, sampled=sampled,
+                                                        ephemeris=self.ephemeris)
+            closest_approach = detector.closest_approach
+        else:
+            report_progress('screening', 100, f"Reusing screening result: {len(collisions)} collisions")
+        initial_collisions = collisions
+
+        assessment = None
+        if len(collisions) and self.collision_probability is not None and closest_approach is not None:
+            with timed('collision_probability'):
+                assessment = self.collision_probability.assess(detector, timestamp, sampled, closest_approach)
+            above = int(np.count_nonzero(assessment['pc'] >= assessment['threshold']))
+            report_progress('collision_probability', 100,
+                            f"{above} of {len(assessment['pc'])} conjunctions with Pc >= {assessment['threshold']:g}",
+                            conjunctions=len(assessment['pc']), above_threshold=above,
+                            max_pc=float(assessment['pc'].max(initial=0.0)))
+        conjunctions = CollisionProbability.to_rows(assessment) if assessment is not None else None
+
+        optimized_trajectory_data = None
+        optimization = None
+        # With a Pc assessment, only conjunctions at or above the threshold are optimized against
+        target_satnums = None
+        if assessment is not None:
+            target_satnums = assessment['satnum'][assessment['pc'] >= assessment['threshold']]
+        targets = collisions if target_satnums is None else collisions[np.isin(collisions['satnum'], target_satnums)]
+        if len(targets):
+            report_progress('optimization', 0, f"Optimizing trajectory around {len(targets)} collisions")
+            with timed('optimization'):
+                optimizer = DDQLOptimizer(equations, t_climb, timestamp, self.tle_data_path,
+                                          threshold_km=self.threshold_km, progress=progress, ephemeris=self.ephemeris)
+                optimization = optimizer.optimize_anytime(targets, **(budget or {}), target_satnums=target_satnums)
+            optimized_equations = optimization['equations']
+            optimized_trajectory_data = (optimized_equations, t_climb, formulas, initial, v_orbit, burn_time)
+            final_sampled = SampledTrajectory.build(optimized_equations, t_climb, burn_time, screening_step_s=step_s)
+            with timed('screening'):
+                collisions = detector.detect_collisions(optimized_equations, timestamp, t_climb, sampled=final_sampled,
+                                                        ephemeris=self.ephemeris)
+            final_equations = optimized_equations
+            display_closest_approach = detector.closest_approach
+        else:
+            final_equations = equations
+            final_sampled = sampled
+            display_closest_approach = closest_approach
+
+        orbit_screening = None
+        if horizon_revolutions is not None or horizon_days is not None:
+            report_progress('orbit_screening', 0, "Screening the target orbit after insertion")
+            with timed('orbit_screening'):
+                screening = (self.orbit_screening or OrbitScreening()).screen(
+                    detector, final_equations, t_climb, timestamp, revolutions=horizon_revolutions, days=horizon_days)
+            orbit_screening = OrbitScreening.summary(screening)
+            report_progress('orbit_screening', 100,
+                            f"{len(screening['events'])} conjunctions over {screening['revolutions']:.1f} revolutions",
+                            conjunctions=len(screening['events']), candidates=screening['candidates'])
+
+        report_progress('visualization', 0, "Building trajectory visualization")
+        with timed('visualization'):
+            viz = TrajectoryVisualizer(final_equations, t_max=t_climb, burn_time=burn_time,
+                                       samples=final_sampled.samples, screening_step_s=step_s,
+                                       debris_corridor_km=self.debris_corridor_km,
+                                       max_debris_tracks=self.max_debris_tracks)
+            viz.add_debris_context(detector, timestamp, display_closest_approach)
+            fig = viz.plot(title=f"{name} to {target_altitude} km", collisions=collisions,
+                           object_label=self.object_label, show=False)
+            if fig is None:
+                raise ValueError("Visualization failed to generate figure")
+            fig.write_html(os.path.join(self.static_dir, viz_filename))
+        report_progress('visualization', 100, "Visualization written", viz_filename=viz_filename,
+                        debris_tracks=len(viz.debris_tracks))
+
+        rocket_row = traj_calc.rocket_data[traj_calc.rocket_data['Rocket_Type'] == rocket_type]
+        rocket_params = {
+            'thrust_N': float(rocket_row['Thrust_N'].iloc[0]),
+            'mass_kg': float(rocket_row['Mass_kg'].iloc[0]),
+            'burn_time_s': float(rocket_row['Burn_Time_s'].iloc[0])
+        }
+        with timed('report'):
+            report = MissionReport(progress=progress) if self.report_dir is None else \
+                MissionReport(output_dir=self.report_dir, progress=progress)
+            report_content = report.render(
+                rocket_type=rocket_type,
+                launch_site=launch_site,
+                orbit_type=orbit_type,
+                altitude_km=target_altitude,
+                timestamp=timestamp,
+                trajectory_data=trajectory_data,
+                collisions=collisions,
+                object_label=self.object_label,
+                orbit_screening=orbit_screening,
+                rocket_params=rocket_params,
+                optimized_trajectory_data=optimized_trajectory_data,
+                sampled=sampled,
+                optimized_sampled=final_sampled if optimization else None,
+                closest_approach=closest_approach,
+                conjunctions=conjunctions
+            )
+            report_id = report_path = None
+            if self.report_store is not None:
+                report_id = self.report_store.add(report_content, rocket_type, launch_site, orbit_type,
+                                                  target_altitude, timestamp, len(collisions),
+                                                  optimized=optimization is not None)
+                report_progress('report', 100, "Mission report stored", report_id=report_id)
+            else:
+                report_path = report.write(report_content, rocket_type, timestamp, filename=report_filename)
+
+        debris = " with dummy debris" if self.dummy else ""
+        report_progress('done', 100, "Mission complete")
+        return {
+            'viz_filename': viz_filename,
+            'report_id': report_id,
+            'report_path': report_path,
+            'report_content': report_content,
+            'collisions': len(collisions),
+            'conjunctions': conjunctions,
+            'orbit_screening': orbit_screening,
+            'optimization': optimization,
+            'trajectory_data': trajectory_data,
+            'samples': samples,
+            'initial_collisions': initial_collisions,
+            'closest_approach': closest_approach,
+            'display_closest_approach': display_closest_approach,
+            'display_equations': final_equations,
+            'display_samples': viz.samples,
+            'display_collisions': collisions,
+            'debris_tracks': viz.debris_tracks,
+            'steps': [
+                f"Calculated initial {name.lower()}",
+                f"Detected {len(initial_collisions)} collisions{debris}",
+                "Optimized trajectory" if optimization else "No optimization needed" if not len(initial_collisions) else
+                f"Optimization skipped: no conjunction with Pc >= {assessment['threshold']:g}"
+            ]
+        }
@@ -2,17 +2,61 @@
 import os
 from datetime import datetime
 import numpy as np
+from src.core.conjunction_events import CONJUNCTION_DTYPE
+from src.core.sampled_trajectory import SampledTrajectory
 
 
 class MissionReport:
     def __init__(self,
-                 output_dir="/Users/thrishankkuntimaddi/Documents/Projects/SDARC-Enhanced/outputs/mission_reports"):
+                 output_dir="/Users/thrishankkuntimaddi/Documents/Projects/SDARC-Enhanced/outputs/mission_reports",
+                 progress=None):
         self.output_dir = output_dir
+        self.progress = progress  # Optional callable(stage, percent=None, message='', **fields)
         if not os.path.exists(output_dir):
             os.makedirs(output_dir)
 
     def generate(self, rocket_type, launch_site, orbit_type, altitude_km, timestamp,
-                 trajectory_data, collisions, rocket_params, optimized_trajectory_data=None, filename=None):
+                 trajectory_data, collisions, rocket_params, optimized_trajectory_data=None, filename=None,
+                 sampled=None, optimized_sampled=None, closest_approach=None, conjunctions=None,
+                 object_label="Unknown Object", orbit_screening=None):
+        """Write the mission report and return its path (see render for the arguments)."""
+        content = self.render(rocket_type, launch_site, orbit_type, altitude_km, timestamp, trajectory_data,
+                              collisions, rocket_params, optimized_trajectory_data=optimized_trajectory_data,
+                              sampled=sampled, optimized_sampled=optimized_sampled, closest_approach=closest_approach,
+                              conjunctions=conjunctions, object_label=object_label,
+                              orbit_screening=orbit_screening)
+        return self.write(content, rocket_type, timestamp, filename=filename)
+
+    def write(self, content, rocket_type, timestamp, filename=None):
+        """Write report text into output_dir and return its path."""
+        if filename is None:
+            timestamp_str = timestamp.strftime("%Y%m%d_%H%M%S")
+            filename = f"mission_report_{rocket_type}_{timestamp_str}.txt"
+        filepath = os.path.join(self.output_dir, filename)
+        with open(filepath, 'w') as f:
+            f.write(content)
+
+        print(f"Mission report saved to: {filepath}")
+        if self.progress is not None:
+            self.progress('report', 100, "Mission report saved", path=filepath)
+        return filepath
+
+    def render(self, rocket_type, launch_site, orbit_type, altitude_km, timestamp,
+               trajectory_data, collisions, rocket_params, optimized_trajectory_data=None,
+               sampled=None, optimized_sampled=None, closest_approach=None, conjunctions=None,
+               object_label="Unknown Object", orbit_screening=None):
+        """
+        Build the mission report text.
+        collisions: conjunction events of the final trajectory (CONJUNCTION_DTYPE, as from detect_collisions),
+        listed as object_label.
+        sampled / optimized_sampled: SampledTrajectory of the initial / optimized trajectory, shared with the
+        detector and visualizer; sampled here when not given.
+        closest_approach: the screening's per-object closest approaches (CollisionDetector.closest_approach).
+        conjunctions: collision probability rows of the flagged conjunctions (CollisionProbability.to_rows).
+        orbit_screening: long-horizon screening of the target orbit after insertion (OrbitScreening.summary).
+        """
+        if self.progress is not None:
+            self.progress('report', 0, "Computing mission statistics")
         # Unpack trajectory data (pre-optimization)
         equations, t_climb, formulas, initial, v_orbit, burn_time = trajectory_data
         x0, y0, z0 = initial['x0'], initial['y0'], initial['z0']
@@ -23,37 +67,22 @@ class MissionReport:
         burn_time_param = rocket_params.get('burn_time_s', burn_time)
 
         # Calculate pre-optimization stats
-        x_final = equations['x'](t_climb)
-        y_final = equations['y'](t_climb)
-        z_final = equations['z'](t_climb)
-        distance_traveled = sum(
-            ((equations['x'](t2) - equations['x'](t1)) ** 2 +
-             (equations['y'](t2) - equations['y'](t1)) ** 2 +
-             (equations['z'](t2) - equations['z'](t1)) ** 2) ** 0.5
-            for t1, t2 in zip(np.linspace(0, t_climb, 1000)[:-1], np.linspace(0, t_climb, 1000)[1:])
-        ) / 1000  # km
+        if sampled is None:
+            sampled = SampledTrajectory.build(equations, t_climb, burn_time)
+        x_final, y_final, z_final = sampled.final_position()
+        distance_traveled = sampled.path_length_km()
+        phase_durations = sampled.phase_durations()
         total_journey_time = t_climb  # Total time to target
 
         # Optimized trajectory (if provided)
         if optimized_trajectory_data:
-            opt_equations, opt_t_climb, opt_formulas, opt_initial, opt_v_orbit, _ = optimized_trajectory_data
-            opt_x_final = opt_equations['x'](opt_t_climb)
-            opt_y_final = opt_equations['y'](opt_t_climb)
-            opt_z_final = opt_equations['z'](opt_t_climb)
-            opt_distance = sum(
-                ((opt_equations['x'](t2) - opt_equations['x'](t1)) ** 2 +
-                 (opt_equations['y'](t2) - opt_equations['y'](t1)) ** 2 +
-                 (opt_equations['z'](t2) - opt_equations['z'](t1)) ** 2) ** 0.5
-                for t1, t2 in zip(np.linspace(0, opt_t_climb, 1000)[:-1], np.linspace(0, opt_t_climb, 1000)[1:])
-            ) / 1000  # km
+            opt_equations, opt_t_climb, opt_formulas, opt_initial, opt_v_orbit, opt_burn_time = optimized_trajectory_data
+            if optimized_sampled is None:
+                optimized_sampled = SampledTrajectory.build(opt_equations, opt_t_climb, opt_burn_time)
+            opt_x_final, opt_y_final, opt_z_final = optimized_sampled.final_position()
+            opt_distance = optimized_sampled.path_length_km()
             total_journey_time = opt_t_climb
 
-        # Filename
-        if filename is None:
-            timestamp_str = timestamp.strftime("%Y%m%d_%H%M%S")
-            filename = f"mission_report_{rocket_type}_{timestamp_str}.txt"
-        filepath = os.path.join(self.output_dir, filename)
-
         # Report content
         report = []
         report.append("=== SDARC-Enhanced Mission Report ===")
@@ -83,6 +112,7 @@ class MissionReport:
         report.append(f"  Burn Time: {burn_time:.2f} s")
         report.append(f"  Time to Climb: {t_climb:.2f} s")
         report.append(f"  Distance Traveled: {distance_traveled:.0f} km")
+        report.append(f"  Phase Durations: burn {phase_durations['burn']:.2f} s, coast {phase_durations['coast']:.2f} s")
         report.append(f"  Orbital Velocity: {v_orbit / 1000:.2f} km/s")
         report.append("")
 
@@ -92,16 +122,51 @@ class MissionReport:
         report.append("")
 
         report.append("Collision Detection (Pre-Optimization)")
-        if not collisions:
+        if not len(collisions):
             report.append("  Collisions Detected: 0")
             report.append("  Status: No collisions detected")
         else:
             report.append(f"  Collisions Detected: {len(collisions)}")
-            for i, (t, pos, obj_type) in enumerate(collisions, 1):
-                obj_str = obj_type if obj_type else "Unknown Object"
+            report.append(f"  Minimum Miss Distance: {collisions['miss_km'].min():.3f} km")
+            for i, event in enumerate(collisions, 1):
+                pos = event['position']
                 report.append(
-                    f"    Collision {i}: Time = {t:.2f} s, Position = ({pos[0] / 1000:.2f}, {pos[1] / 1000:.2f}, {pos[2] / 1000:.2f}) km")
-                report.append(f"      Object: {obj_str}")
+                    f"    Collision {i}: TCA = {event['tca']:.2f} s, Miss = {event['miss_km'] * 1000:.0f} m, "
+                    f"Relative Speed = {event['relative_speed_km_s']:.2f} km/s")
+                report.append(f"      Object: {object_label} (NORAD {event['satnum']})")
+                report.append(f"      Screened Steps Within Threshold: {event['steps']} "
+                              f"(t = {event['first_t']:.0f}-{event['last_t']:.0f} s)")
+                report.append(f"      Position: ({pos[0] / 1000:.2f}, {pos[1] / 1000:.2f}, {pos[2] / 1000:.2f}) km")
+        if closest_approach is not None and np.isfinite(closest_approach['distance_km']).any():
+            nearest = int(np.argmin(closest_approach['distance_km']))
+            report.append(f"  Closest Catalog Approach: {closest_approach['distance_km'][nearest]:.2f} km "
+                          f"(NORAD {closest_approach['satnum'][nearest]} at t = {closest_approach['t'][nearest]:.0f} s)")
+
+        if conjunctions:
+            report.append("")
+            report.append("Collision Probability (Flagged Conjunctions)")
+            above = sum(row['above_threshold'] for row in conjunctions)
+            report.append(f"  Conjunctions Above Pc Threshold: {above} of {len(conjunctions)}")
+            for row in conjunctions:
+                report.append(f"    NORAD {row['satnum']}: Pc = {row['pc']:.2e}, Miss = {row['miss_km'] * 1000:.1f} m, "
+                              f"Time = {row['t']:.0f} s{' (above threshold)' if row['above_threshold'] else ''}")
+
+        if orbit_screening:
+            report.append("")
+            report.append("Post-Insertion Screening (Target Orbit)")
+            report.append(f"  Horizon: {orbit_screening['revolutions']:.1f} revolutions "
+                          f"({orbit_screening['horizon_s'] / 3600:.1f} h) "
+                          f"at {orbit_screening['radius_km']:.0f} km radius")
+            report.append(f"  Coarse Filter: {orbit_screening['candidates']} of "
+                          f"{orbit_screening['objects'] * orbit_screening['windows']} object-revolutions screened "
+                          f"finely ({orbit_screening['object_steps']:,} of "
+                          f"{orbit_screening['full_object_steps']:,} object-steps)")
+            report.append(f"  Conjunctions Detected: {len(orbit_screening['conjunctions'])}")
+            for row in orbit_screening['conjunctions']:
+                report.append(f"    NORAD {row['satnum']}: TCA = {row['tca']:.0f} s "
+                              f"({(row['tca'] - orbit_screening['t_insertion']) / 3600:.2f} h after insertion), "
+                              f"Miss = {row['miss_km'] * 1000:.0f} m, "
+                              f"Relative Speed = {row['relative_speed_km_s']:.2f} km/s")
 
         if optimized_trajectory_data:
             report.append("")
@@ -121,18 +186,13 @@ class MissionReport:
             report.append("  Status: Clear trajectory")
 
         # Success Rate (simple heuristic: 100% if no collisions post-optimization, else scale by collision count)
-        success_rate = 80.0 if not collisions or optimized_trajectory_data else max(0, 100 - 10 * len(collisions))
+        success_rate = 80.0 if not len(collisions) or optimized_trajectory_data else max(0, 100 - 10 * len(collisions))
         report.append("")
         report.append(f"Mission Success Rate: {success_rate:.1f}%")
         report.append(
             f"Status: {'Success' if success_rate > 90 else 'Partial Success' if success_rate > 50 else 'Failure'}")
 
-        # Write to file
-        with open(filepath, 'w') as f:
-            f.write("\n".join(report))
-
-        print(f"Mission report saved to: {filepath}")
-        return filepath
+        return "\n".join(report)
 
 
 # Test it
@@ -169,7 +229,13 @@ if __name__ == "__main__":
 
     timestamp = datetime.strptime("2024-06-06 05:11:42", "%Y-%m-%d %H:%M:%S")
     rocket_params = {'thrust_N': 3700000, 'mass_kg': 17000, 'burn_time_s': 214.0}
-    collisions = [(500, (1e6, 2e6, 3e6), "Debris"), (1000, (2e6, 3e6, 4e6), "Satellite")]
+    collisions = np.zeros(2, dtype=CONJUNCTION_DTYPE)
+    collisions['satnum'] = [25544, 43013]
+    collisions['t'] = collisions['tca'] = collisions['first_t'] = collisions['last_t'] = [500, 1000]
+    collisions['distance_km'] = collisions['miss_km'] = [0.4, 0.8]
+    collisions['relative_speed_km_s'] = [7.5, 3.2]
+    collisions['steps'] = 1
+    collisions['position'] = [(1e6, 2e6, 3e6), (2e6, 3e6, 4e6)]
 
     report = MissionReport()
     report.generate(
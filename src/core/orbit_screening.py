@@ -0,0 +1,173 @@
+# src/core/orbit_screening.py
+import time
+import numpy as np
+from src.core.conjunction_events import CONJUNCTION_DTYPE, merge_hits, refine_approach
+from src.core.constants import GM
+from src.utils.orbit_utils import earth_rotation, ecef_to_teme, teme_to_ecef
+
+
+class TargetOrbit:
+    """
+    Circular orbit entered at insertion (t_climb): radius and plane from the trajectory's insertion position and
+    direction of motion, both taken to the inertial (TEME) frame.
+    """
+
+    def __init__(self, equations, t_climb, launch_timestamp, dt_s=1.0):
+        t = np.array([t_climb, t_climb + dt_s])
+        earth_fixed = np.array([[equations[axis](step) for axis in ('x', 'y', 'z')] for step in t], dtype=float)
+        inertial = ecef_to_teme(earth_fixed, earth_rotation(launch_timestamp, t))
+        position, velocity = inertial[0], (inertial[1] - inertial[0]) / dt_s
+        normal = np.cross(position, velocity)
+        if not np.linalg.norm(normal) > 0:
+            raise ValueError("Insertion velocity is radial: the target orbit plane is undefined")
+        self.launch_timestamp = launch_timestamp
+        self.t_insertion = float(t_climb)
+        self.radius_m = float(np.linalg.norm(position))
+        self.normal = normal / np.linalg.norm(normal)
+        self.e1 = position / self.radius_m
+        self.e2 = np.cross(self.normal, self.e1)
+        self.mean_motion = np.sqrt(GM / self.radius_m ** 3)  # rad/s
+        self.period_s = 2 * np.pi / self.mean_motion
+
+    def positions(self, t_values):
+        """Earth-fixed positions (m) at t_values seconds after launch (all after insertion), shape (n, 3)."""
+        t_values = np.asarray(t_values, dtype=float)
+        angle = self.mean_motion * (t_values - self.t_insertion)
+        inertial = self.radius_m * (np.cos(angle)[:, None] * self.e1 + np.sin(angle)[:, None] * self.e2)
+        return teme_to_ecef(inertial, earth_rotation(self.launch_timestamp, t_values))
+
+
+class OrbitScreening:
+    """
+    Long-horizon screening of the target orbit after insertion. The horizon is split into windows of one
+    revolution; at the start of each, a coarse filter on the catalog's osculating orbits keeps only objects whose
+    perigee-apogee band reaches the target radius and that cross the target plane (mutual nodes) near it, within
+    margin_km beyond the threshold. Only those objects are propagated over the window at step_s, at most
+    block_object_steps at a time, and approaches between steps are found under linear relative motion.
+    """
+
+    def __init__(self, step_s=10.0, margin_km=25.0, block_object_steps=2_000_000):
+        self.step_s = step_s
+        self.margin_km = margin_km  # J2 drift within a window and short-period terms of the osculating orbits
+        self.block_object_steps = block_object_steps
+
+    def coarse_filter(self, detector, orbit, t):
+        """Boolean mask over the catalog (load order) of objects that can meet the target orbit around time t."""
+        satellites = detector._cached_satellites()
+        t_values = np.array([t - 0.5, t, t + 0.5])
+        states = ecef_to_teme(detector.propagate_objects(np.arange(len(satellites)), orbit.launch_timestamp,
+                                                         t_values), earth_rotation(orbit.launch_timestamp, t_values))
+        position = states[:, 1]
+        velocity = states[:, 2] - states[:, 0]  # Central difference over 1 s
+        pad = (detector.threshold_km + self.margin_km) * 1000
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            momentum = np.cross(position, velocity)
+            h = np.linalg.norm(momentum, axis=1)
+            semi_latus = h ** 2 / GM
+            eccentricity = np.cross(velocity, momentum) / GM - position / np.linalg.norm(position, axis=1)[:, None]
+            e = np.linalg.norm(eccentricity, axis=1)
+            perigee = semi_latus / (1 + e)
+            apogee = np.where(e < 1, semi_latus / (1 - e), np.inf)
+            band = (perigee - pad <= orbit.radius_m) & (orbit.radius_m <= apogee + pad)
+
+            # Radius of the object's orbit where it crosses the target plane, at both mutual nodes
+            node_line = np.cross(orbit.normal, momentum / h[:, None])
+            sin_inclination = np.linalg.norm(node_line, axis=1)
+            node = node_line / sin_inclination[:, None]
+            projection = np.sum(eccentricity * node, axis=1)
+            node_radii = semi_latus[:, None] / (1 + np.stack((projection, -projection), axis=1))
+            crossing = (np.abs(node_radii - orbit.radius_m) <= pad).any(axis=1)
+            coplanar = sin_inclination * orbit.radius_m <= pad  # Planes within the pad everywhere
+        return band & (crossing | coplanar)
+
+    def screen(self, detector, equations, t_climb, launch_timestamp, revolutions=None, days=None):
+        """
+        Conjunctions of the target orbit with the catalog over revolutions (or days) after insertion.
+        Returns a dict with the merged events (CONJUNCTION_DTYPE, tca in s after launch), the horizon and
+        filter statistics: windows, objects, candidates (object-windows passing the filter) and the object-steps
+        propagated at step_s against a full screening.
+        """
+        if revolutions is None and days is None:
+            raise ValueError("Long-horizon screening needs revolutions or days")
+        start = time.perf_counter()
+        orbit = TargetOrbit(equations, t_climb, launch_timestamp)
+        horizon_s = revolutions * orbit.period_s if revolutions is not None else days * 86400.0
+        t_grid = t_climb + np.arange(0.0, horizon_s, self.step_s)
+        window = max(1, int(np.ceil(orbit.period_s / self.step_s)))
+        objects = len(detector._cached_satellites())
+        hits = ([], [], [], [], [], [], [], [])  # Object, step, miss, shift, distance, speed, position, target
+        candidates = propagated = 0
+
+        for first in range(0, len(t_grid), window):
+            steps = np.arange(first, min(first + window, len(t_grid)))
+            selected = np.flatnonzero(self.coarse_filter(detector, orbit, t_grid[first]))
+            candidates += len(selected)
+            propagated += len(selected) * len(steps)
+            target = orbit.positions(t_grid[steps])
+            block = max(1, self.block_object_steps // len(steps))
+            for indices in np.array_split(selected, np.arange(block, len(selected), block)):
+                if len(indices) == 0:
+                    continue
+                positions = detector.propagate_objects(indices, launch_timestamp, t_grid[steps])
+                relative = (positions - target) / 1000  # km
+                velocity = np.gradient(relative, self.step_s, axis=1) if len(steps) > 1 else np.zeros_like(relative)
+                distance = np.linalg.norm(relative, axis=2)
+                shift, miss = refine_approach(relative.reshape(-1, 3), velocity.reshape(-1, 3), self.step_s / 2)
+                shift, miss = shift.reshape(distance.shape), miss.reshape(distance.shape)
+                rows, columns = np.nonzero(np.nan_to_num(miss, nan=np.inf) < detector.threshold_km)
+                for column, values in zip(hits, (indices[rows], steps[columns], miss[rows, columns],
+                                                 shift[rows, columns], distance[rows, columns],
+                                                 np.linalg.norm(velocity[rows, columns], axis=1),
+                                                 positions[rows, columns], target[columns])):
+                    column.append(values)
+
+        hits = [np.concatenate(column) if column else np.zeros(0) for column in hits]
+        closest, first_step, last_step, count = merge_hits(hits[0], hits[1], hits[2])
+        events = np.zeros(len(closest), dtype=CONJUNCTION_DTYPE)
+        if len(closest):
+            t = t_grid[hits[1][closest].astype(int)]
+            events['satnum'] = detector._satnums[hits[0][closest].astype(int)]
+            events['t'] = t
+            events['distance_km'] = hits[4][closest]
+            events['tca'] = t + hits[3][closest]
+            events['miss_km'] = hits[2][closest]
+            events['relative_speed_km_s'] = hits[5][closest]
+            events['first_t'] = t_grid[first_step]
+            events['last_t'] = t_grid[last_step]
+            events['steps'] = count
+            events['position'] = hits[6].reshape(-1, 3)[closest]
+            events['rocket_position'] = hits[7].reshape(-1, 3)[closest]
+
+        windows = int(np.ceil(len(t_grid) / window))
+        result = {
+            'events': events,
+            't_insertion': float(t_climb),
+            'horizon_s': float(horizon_s),
+            'revolutions': float(horizon_s / orbit.period_s),
+            'period_s': float(orbit.period_s),
+            'radius_km': orbit.radius_m / 1000,
+            'windows': windows,
+            'objects': objects,
+            'candidates': candidates,
+            'object_steps': propagated,
+            'full_object_steps': objects * len(t_grid),
+            'elapsed_s': time.perf_counter() - start
+        }
+        print(f"Orbit screening over {result['revolutions']:.1f} revolutions: {len(events)} conjunctions, "
+              f"{candidates} of {objects * windows} object-windows passed the coarse filter "
+              f"({propagated:,} of {result['full_object_steps']:,} object-steps propagated) "
+              f"in {result['elapsed_s']:.2f} s")
+        return result
+
+    @staticmethod
+    def summary(result):
+        """JSON-friendly view of a screen() result: statistics and conjunction rows, earliest first."""
+        summary = {key: value for key, value in result.items() if key != 'events'}
+        summary['conjunctions'] = [{
+            'satnum': int(event['satnum']),
+            'tca': float(event['tca']),
+            'miss_km': float(event['miss_km']),
+            'relative_speed_km_s': float(event['relative_speed_km_s'])
+        } for event in result['events']]
+        return summary
@@ -0,0 +1,50 @@
+# src/core/sampled_trajectory.py
+import numpy as np
+from src.core.trajectory_visualizer import TrajectoryVisualizer
+
+
+class SampledTrajectory:
+    """
+    A trajectory evaluated once and shared by the collision detector, visualizer and mission report.
+    Wraps a TrajectoryVisualizer samples dict (positions in meters); positions between samples are interpolated
+    linearly, and all statistics are computed with array operations on the samples.
+    """
+
+    def __init__(self, samples, t_climb, burn_time):
+        self.samples = samples
+        self.t_climb = t_climb
+        self.burn_time = burn_time
+        self.t = samples['t']
+        self.positions = np.column_stack((samples['x'], samples['y'], samples['z']))
+
+    @classmethod
+    def build(cls, equations, t_climb, burn_time, samples=None, screening_step_s=None, **visualizer_options):
+        """
+        Sample the trajectory as the visualizer would (reusing samples built with the same settings), including
+        the collision detector's screening times when screening_step_s is given.
+        """
+        viz = TrajectoryVisualizer(equations, t_max=t_climb, burn_time=burn_time, samples=samples,
+                                   screening_step_s=screening_step_s, **visualizer_options)
+        return cls(viz.build_samples(), t_climb, burn_time)
+
+    def positions_at(self, t_values):
+        """Positions (m), shape (len(t_values), 3); exact at sampled times."""
+        t_values = np.asarray(t_values, dtype=float)
+        return np.column_stack([np.interp(t_values, self.t, self.positions[:, axis]) for axis in range(3)])
+
+    def climb(self):
+        """Times and positions up to t_climb (samples of a following orbit phase excluded)."""
+        end = np.searchsorted(self.t, self.t_climb, side='right')
+        return self.t[:end], self.positions[:end]
+
+    def final_position(self):
+        return self.positions_at([self.t_climb])[0]
+
+    def path_length_km(self):
+        _, positions = self.climb()
+        return float(np.linalg.norm(np.diff(positions, axis=0), axis=1).sum()) / 1000
+
+    def phase_durations(self):
+        """Seconds spent in each phase: powered burn, then unpowered coast up to t_climb."""
+        burn = min(self.burn_time, self.t_climb)
+        return {'burn': float(burn), 'coast': float(self.t_climb - burn)}
@@ -1,45 +1,36 @@
-from datetime import datetime, timedelta
 import os
+from datetime import datetime, timedelta
+from src.utils.tle_preprocessor import catalog_history_path, load_catalog_index
 
 class TimestampSelector:
     def __init__(self, tle_data_path="/Users/thrishankkuntimaddi/Documents/Projects/SDARC-Enhanced/data/tle_data.txt"):
         self.default_timestamp = datetime.now().replace(microsecond=0)
         self.tle_data_path = tle_data_path
         self.epoch_start = self._get_tle_epoch_start()
-        self.epoch_end = self.epoch_start + timedelta(days=7)
+        if os.path.exists(catalog_history_path(tle_data_path)):
+            # Objects propagate from their element set nearest in time: launches up to 7 days past the newest epoch
+            self.epoch_end = self._get_tle_epoch_end() + timedelta(days=7)
+        else:
+            self.epoch_end = self.epoch_start + timedelta(days=7)
         print(f"TLE epoch start: {self.epoch_start}")
         print(f"Valid timestamp range: {self.epoch_start} to {self.epoch_end}")
 
     def _get_tle_epoch_start(self):
-        """Extract the earliest epoch from TLE text data and convert to datetime."""
-        if not os.path.exists(self.tle_data_path):
-            raise FileNotFoundError(f"TLE data file not found at {self.tle_data_path}")
-
-        earliest_epoch = None
-        with open(self.tle_data_path, 'r') as file:
-            lines = file.readlines()
-            for i in range(0, len(lines) - 1, 2):  # Step by 2 for Line 1, Line 2 pairs
-                line1 = lines[i].strip()
-                try:
-                    # Extract epoch from Line 1, cols 18-32 (e.g., '25057.47232210')
-                    epoch_str = line1[18:32].strip()
-                    epoch_float = float(epoch_str)
-                    year = int(f"20{str(int(epoch_float))[:2]}")  # e.g., '25' → 2025
-                    day_fraction = epoch_float % 1000  # e.g., 57.47232210
-                    base_date = datetime(year, 1, 1)
-                    epoch_date = base_date + timedelta(days=day_fraction - 1)
-                    if earliest_epoch is None or epoch_date < earliest_epoch:
-                        earliest_epoch = epoch_date
-                except (ValueError, IndexError) as e:
-                    print(f"Warning: Skipping invalid epoch in TLE pair {line1[:20]}...: {e}")
-                    continue
+        """Earliest epoch of the TLE catalog, read from its metadata index."""
+        epochs = load_catalog_index(self.tle_data_path).epoch_range()
+        if epochs is None:
+            raise ValueError("No valid epochs found in TLE data")
+        return epochs[0].replace(microsecond=0)
 
-        if earliest_epoch is None:
+    def _get_tle_epoch_end(self):
+        """Latest epoch of the TLE catalog, read from its metadata index."""
+        epochs = load_catalog_index(self.tle_data_path).epoch_range()
+        if epochs is None:
             raise ValueError("No valid epochs found in TLE data")
-        return earliest_epoch.replace(microsecond=0)
+        return epochs[1].replace(microsecond=0)
 
     def get_timestamp(self):
-        """Prompt user for a timestamp within TLE's 7-day validity window."""
+        """Prompt user for a timestamp within the catalog's validity window."""
         while True:
             print(f"Enter launch timestamp (YYYY-MM-DD HH:MM:SS) between {self.epoch_start} and {self.epoch_end}")
             print("Or press Enter for default (TLE epoch start)")
@@ -1,24 +1,371 @@
 # src/core/trajectory_visualizer.py
+import heapq
+import itertools
+from functools import lru_cache
 import numpy as np
 import plotly.graph_objects as go
+from src.core.conjunction_events import describe
 
 class TrajectoryVisualizer:
-    def __init__(self, equations, t_max, burn_time, num_points=2000):  # More points for smoothness
+    ANIMATION_MODES = ('segments', 'prefix', None)
+    SAMPLING_MODES = ('adaptive', 'uniform')
+    PHASES = ('burn', 'coast', 'orbit')  # Index in this tuple is the phase code stored in samples['phase']
+    PHASE_SHARES = {'burn': 0.35, 'coast': 0.5, 'orbit': 0.15}  # Default split of num_points between phases
+
+    def __init__(self, equations, t_max, burn_time, num_points=2000, samples=None,
+                 animation='segments', max_frames=200, sampling='adaptive', phase_budgets=None,
+                 orbit_time=0.0, tolerance=1e-5, debris_corridor_km=None, max_debris_tracks=50,
+                 debris_track_window_s=300.0, debris_track_points=20, screening_step_s=None):  # More points for smoothness
+        if animation not in self.ANIMATION_MODES:
+            raise ValueError(f"Unknown animation mode {animation!r}; expected one of {self.ANIMATION_MODES}")
+        if sampling not in self.SAMPLING_MODES:
+            raise ValueError(f"Unknown sampling mode {sampling!r}; expected one of {self.SAMPLING_MODES}")
         self.equations = equations
         self.t_max = t_max
         self.burn_time = burn_time
         self.num_points = num_points
+        self.samples = samples  # Optional precomputed samples from build_samples()/sample()/sample_adaptive()
+        # 'segments': each keyframe appends only its new segment (size grows linearly with num_points)
+        # 'prefix': legacy mode, every frame redraws the whole path so far (O(n^2) points)
+        # None: static figure without frames
+        self.animation = animation
+        self.max_frames = max_frames
+        # 'adaptive': refine where the path bends, up to a point budget per phase; 'uniform': num_points evenly in time
+        self.sampling = sampling
+        self.phase_budgets = phase_budgets  # Optional {'burn': n, 'coast': n, 'orbit': n}, overrides PHASE_SHARES
+        self.orbit_time = orbit_time  # Seconds of orbit after t_max to include as the 'orbit' phase
+        self.tolerance = tolerance  # Refinement stops below this deviation, as a fraction of the trajectory extent
+        # Also sample every screening_step_s seconds (the collision detector's grid) so screening reads its
+        # rocket positions from the shared samples instead of re-evaluating the equations
+        self.screening_step_s = screening_step_s
+        # Debris context (see add_debris_context): objects screened within the corridor, nearest first
+        self.debris_corridor_km = debris_corridor_km
+        self.max_debris_tracks = max_debris_tracks
+        self.debris_track_window_s = debris_track_window_s  # Track span around each object's closest approach (s)
+        self.debris_track_points = debris_track_points  # Max points per decimated track
+        self.debris_tracks = []
         self.R = 6371e3
         self.GM = 3.986e14
 
-    def plot(self, title="Rocket Trajectory", collisions=None):
-        t_values = np.linspace(0, self.t_max, self.num_points)
-        x = np.array([self.equations['x'](t) for t in t_values])
-        y = np.array([self.equations['y'](t) for t in t_values])
-        z = np.array([self.equations['z'](t) for t in t_values])
-        x_km = x / 1000
-        y_km = y / 1000
-        z_km = z / 1000
+    def phase_plan(self):
+        """[(phase, t_start, t_end, point_budget)] for every phase with a non-empty time span."""
+        burn_end = min(self.burn_time, self.t_max)
+        bounds = {
+            'burn': (0.0, burn_end),
+            'coast': (burn_end, self.t_max),
+            'orbit': (self.t_max, self.t_max + self.orbit_time)
+        }
+        present = [phase for phase in self.PHASES if bounds[phase][1] > bounds[phase][0]]
+        share = sum(self.PHASE_SHARES[phase] for phase in present)
+        budgets = self.phase_budgets or {}
+        return [(phase, float(bounds[phase][0]), float(bounds[phase][1]),
+                 int(budgets.get(phase, round(self.num_points * self.PHASE_SHARES[phase] / share))))
+                for phase in present]
+
+    def sampling_spec(self):
+        """Parameters that determine the samples; precomputed samples are reused only when their spec matches."""
+        if self.sampling == 'uniform':
+            spec = {'sampling': 'uniform', 't_max': float(self.t_max), 'num_points': self.num_points}
+        else:
+            spec = {'sampling': 'adaptive', 'plan': self.phase_plan(), 'tolerance': self.tolerance}
+        if self.screening_step_s:
+            spec['screening_step_s'] = self.screening_step_s
+        return spec
+
+    def build_samples(self):
+        """Samples for this visualizer's settings, reusing self.samples when they were built with the same spec."""
+        spec = self.sampling_spec()
+        if self.samples is None or self.samples.get('spec') != spec:
+            if self.sampling == 'uniform':
+                self.samples = self.sample(self.equations, self.t_max, self.num_points)
+            else:
+                self.samples = self.sample_adaptive(self.equations, spec['plan'], self.tolerance)
+            if self.screening_step_s:
+                self.samples = self.merge_times(self.samples, self.equations,
+                                                np.arange(0, self.t_max, self.screening_step_s), self.burn_time)
+            self.samples['spec'] = spec
+        return self.samples
+
+    @staticmethod
+    def merge_times(samples, equations, t_values, burn_time):
+        """
+        Add samples at t_values that are not sampled yet. Added points get significance 0, so decimate() drops
+        them before any point the adaptive refinement chose.
+        """
+        t_new = np.setdiff1d(np.asarray(t_values, dtype=float), samples['t'])
+        if len(t_new) == 0:
+            return samples
+        merged = {
+            't': np.concatenate((samples['t'], t_new)),
+            'x': np.concatenate((samples['x'], [equations['x'](t) for t in t_new])),
+            'y': np.concatenate((samples['y'], [equations['y'](t) for t in t_new])),
+            'z': np.concatenate((samples['z'], [equations['z'](t) for t in t_new]))
+        }
+        if 'phase' in samples:
+            codes = np.where(t_new <= burn_time, 0, 1).astype(np.int8)  # Screening times lie within the climb
+            merged['phase'] = np.concatenate((samples['phase'], codes))
+            merged['significance'] = np.concatenate((samples['significance'], np.zeros(len(t_new))))
+        order = np.argsort(merged['t'], kind='stable')
+        return dict({key: values[order] for key, values in merged.items()}, spec=samples.get('spec'))
+
+    @staticmethod
+    def sample(equations, t_max, num_points=2000):
+        """Evaluate the trajectory equations on a uniform time grid; positions in meters."""
+        t_values = np.linspace(0, t_max, num_points)
+        return {
+            't': t_values,
+            'x': np.array([equations['x'](t) for t in t_values]),
+            'y': np.array([equations['y'](t) for t in t_values]),
+            'z': np.array([equations['z'](t) for t in t_values]),
+            'spec': {'sampling': 'uniform', 't_max': float(t_max), 'num_points': num_points}
+        }
+
+    @staticmethod
+    def _interpolation_error(times, points):
+        """Distance of the middle point from the linear-in-time interpolation of its neighbours (m)."""
+        s = (times[1] - times[0]) / (times[2] - times[0])
+        return float(np.linalg.norm(points[1] - (points[0] + s * (points[2] - points[0]))))
+
+    @classmethod
+    def sample_adaptive(cls, equations, plan, tolerance=1e-5, seeds=16):
+        """
+        Error-driven sampling per phase; positions in meters.
+        Each phase starts from a few evenly spaced seed times and repeatedly splits the interval whose midpoint is
+        farthest from the linear interpolation of its endpoints, until the phase's point budget is used or every
+        error is below tolerance * trajectory extent. Stretches flown at constant velocity stay sparse while bends
+        and strong acceleration get the points, and the path stays accurate in time as well as in shape.
+        Each sample's 'significance' is the deviation that caused its insertion (phase boundaries are inf), so the
+        highest-significance subset is a good coarser approximation; see decimate().
+        """
+        def position(t):
+            return np.array([equations['x'](t), equations['y'](t), equations['z'](t)], dtype=float)
+
+        seed_times = [np.linspace(t_start, t_end, max(2, min(seeds, budget))) for _, t_start, t_end, budget in plan]
+        seed_points = [np.array([position(t) for t in times]) for times in seed_times]
+        stacked = np.vstack(seed_points)
+        threshold = tolerance * float(np.linalg.norm(stacked.max(axis=0) - stacked.min(axis=0)))
+
+        t_all, p_all, phase_all, significance_all = [], [], [], []
+        for (phase, _, _, budget), times, points in zip(plan, seed_times, seed_points):
+            code = cls.PHASES.index(phase)
+            significance = [np.inf] + [cls._interpolation_error(times[i - 1:i + 2], points[i - 1:i + 2])
+                                       for i in range(1, len(times) - 1)] + [np.inf]
+            t_phase, p_phase = list(times), list(points)
+
+            heap, counter = [], itertools.count()
+            def push(t_a, p_a, t_b, p_b):
+                t_mid = 0.5 * (t_a + t_b)
+                p_mid = position(t_mid)
+                error = float(np.linalg.norm(p_mid - 0.5 * (p_a + p_b)))
+                heapq.heappush(heap, (-error, t_mid, next(counter), p_mid, t_a, p_a, t_b, p_b))
+
+            for i in range(len(times) - 1):
+                push(times[i], points[i], times[i + 1], points[i + 1])
+            while heap and len(t_phase) < budget:
+                neg_error, t_mid, _, p_mid, t_a, p_a, t_b, p_b = heapq.heappop(heap)
+                if -neg_error <= threshold:
+                    break
+                t_phase.append(t_mid)
+                p_phase.append(p_mid)
+                significance.append(-neg_error)
+                push(t_a, p_a, t_mid, p_mid)
+                push(t_mid, p_mid, t_b, p_b)
+
+            t_all.extend(t_phase)
+            p_all.extend(p_phase)
+            phase_all.extend([code] * len(t_phase))
+            significance_all.extend(significance)
+
+        # Sort by time; a boundary shared by two phases is kept once, in the earlier phase
+        t_all = np.array(t_all)
+        order = np.lexsort((np.array(phase_all), t_all))
+        t_sorted = t_all[order]
+        keep = order[np.concatenate(([True], np.diff(t_sorted) > 0))]
+        positions = np.array(p_all)[keep]
+        return {
+            't': t_all[keep],
+            'x': positions[:, 0],
+            'y': positions[:, 1],
+            'z': positions[:, 2],
+            'phase': np.array(phase_all, dtype=np.int8)[keep],
+            'significance': np.array(significance_all)[keep],
+            'spec': {'sampling': 'adaptive', 'plan': plan, 'tolerance': tolerance}
+        }
+
+    @staticmethod
+    def window_plan(plan, t_start, t_end, max_points):
+        """Restrict a phase plan to [t_start, t_end], sharing max_points between phases by their overlap."""
+        window = []
+        for phase, start, end, budget in plan:
+            lo, hi = max(start, t_start), min(end, t_end)
+            if hi > lo:
+                window.append((phase, lo, hi, budget * (hi - lo) / (end - start)))
+        total = sum(weight for _, _, _, weight in window)
+        return [(phase, lo, hi, max(2, int(round(max_points * weight / total)))) for phase, lo, hi, weight in window]
+
+    @classmethod
+    def decimate(cls, samples, max_points, t_range=None):
+        """
+        Multi-resolution view of samples: at most about max_points of them, optionally only within
+        t_range=(t_start, t_end) (plus one neighbour each side so the path reaches the window edges).
+        Adaptive samples keep the most significant points of each phase in proportion to the phase's share;
+        uniform samples are strided evenly.
+        """
+        t_values = samples['t']
+        indices = np.arange(len(t_values))
+        if t_range is not None:
+            lo = max(0, np.searchsorted(t_values, t_range[0], side='left') - 1)
+            hi = min(len(t_values), np.searchsorted(t_values, t_range[1], side='right') + 1)
+            indices = indices[lo:hi]
+        if len(indices) > max_points:
+            if 'significance' in samples:
+                chosen = []
+                phases = samples['phase'][indices]
+                for code in np.unique(phases):
+                    members = indices[phases == code]
+                    count = max(2, int(round(max_points * len(members) / len(indices))))
+                    ranked = members[np.argsort(-samples['significance'][members], kind='stable')]
+                    chosen.extend([ranked[:count], members[[0, -1]]])
+                indices = np.unique(np.concatenate(chosen))
+            else:
+                indices = indices[np.unique(np.linspace(0, len(indices) - 1, max_points).round().astype(int))]
+        return {key: samples[key][indices] for key in ('t', 'x', 'y', 'z', 'phase', 'significance') if key in samples}
+
+    @classmethod
+    def level_of_detail(cls, samples, max_points, t_range=None, equations=None):
+        """
+        Samples for a client-requested detail level. Zooming into t_range with the trajectory equations at hand
+        re-samples that window adaptively with the full max_points budget (the tolerance is relative to the
+        window's extent, so detail keeps increasing as the window shrinks); otherwise the stored samples are decimated.
+        """
+        spec = samples.get('spec', {})
+        if t_range is not None and equations is not None and spec.get('sampling') == 'adaptive':
+            plan = cls.window_plan(spec['plan'], t_range[0], t_range[1], max_points)
+            if plan:
+                return cls.sample_adaptive(equations, plan, spec['tolerance'])
+        return cls.decimate(samples, max_points, t_range)
+
+    @staticmethod
+    def select_debris(closest_approach, corridor_km, max_tracks):
+        """Catalog indices of the objects screened within corridor_km of the trajectory, nearest first."""
+        distances = closest_approach['distance_km']
+        candidates = np.flatnonzero(distances <= corridor_km)
+        return candidates[np.argsort(distances[candidates], kind='stable')][:max_tracks]
+
+    @staticmethod
+    def decimate_track(t_values, positions, max_points, tolerance_m):
+        """
+        Indices of at most max_points track samples: the endpoints, then repeatedly the sample farthest from the
+        linear-in-time interpolation of the kept samples around it, while that error exceeds tolerance_m.
+        """
+        count = len(t_values)
+        if count <= 2:
+            return np.arange(count)
+        heap, keep = [], [0, count - 1]
+
+        def push(a, b):
+            if b - a < 2:
+                return
+            s = (t_values[a + 1:b] - t_values[a]) / (t_values[b] - t_values[a])
+            errors = np.linalg.norm(positions[a + 1:b] - (positions[a] + s[:, None] * (positions[b] - positions[a])), axis=1)
+            i = int(np.argmax(errors))
+            heapq.heappush(heap, (-errors[i], a, b, a + 1 + i))
+
+        push(0, count - 1)
+        while heap and len(keep) < max_points:
+            neg_error, a, b, i = heapq.heappop(heap)
+            if -neg_error <= tolerance_m:
+                break
+            keep.append(i)
+            push(a, i)
+            push(i, b)
+        return np.sort(keep)
+
+    def add_debris_context(self, detector, launch_timestamp, closest_approach=None, step_s=10.0):
+        """
+        Propagate and decimate the tracks of the catalog objects whose screened closest approach
+        (detector.closest_approach unless given) lies within debris_corridor_km; plot() draws them.
+        Each track spans debris_track_window_s around the object's closest approach, clipped to the climb.
+        """
+        closest_approach = closest_approach if closest_approach is not None else detector.closest_approach
+        self.debris_tracks = []
+        if self.debris_corridor_km is None or closest_approach is None:
+            return self.debris_tracks
+        indices = self.select_debris(closest_approach, self.debris_corridor_km, self.max_debris_tracks)
+        t_grid = np.arange(0, self.t_max + step_s, step_s)
+        positions = detector.propagate_objects(indices, launch_timestamp, t_grid)
+        samples = self.build_samples()
+        path = np.column_stack((samples['x'], samples['y'], samples['z']))
+        tolerance_m = self.tolerance * np.linalg.norm(path.max(axis=0) - path.min(axis=0))  # As for the trajectory
+        half_window = self.debris_track_window_s / 2
+        for index, track in zip(indices, positions):
+            t_min = closest_approach['t'][index]
+            window = (t_grid >= t_min - half_window) & (t_grid <= t_min + half_window) & ~np.isnan(track[:, 0])
+            t_track, xyz = t_grid[window], track[window]
+            keep = self.decimate_track(t_track, xyz, self.debris_track_points, tolerance_m)
+            self.debris_tracks.append({
+                'satnum': int(closest_approach['satnum'][index]),
+                'distance_km': float(closest_approach['distance_km'][index]),
+                't_min': float(t_min),
+                't': t_track[keep],
+                'xyz': xyz[keep]
+            })
+        return self.debris_tracks
+
+    @staticmethod
+    @lru_cache(maxsize=4)
+    def earth_mesh(resolution=50, radius_km=6371):
+        """Sphere surface grid (km) for the Earth trace; computed once per resolution and shared by all figures."""
+        u, v = np.linspace(0, 2 * np.pi, resolution), np.linspace(0, np.pi, resolution)
+        x_earth = radius_km * np.outer(np.cos(u), np.sin(v))
+        y_earth = radius_km * np.outer(np.sin(u), np.sin(v))
+        z_earth = radius_km * np.outer(np.ones(np.size(u)), np.cos(v))
+        for grid in (x_earth, y_earth, z_earth):
+            grid.flags.writeable = False
+        return x_earth, y_earth, z_earth
+
+    @staticmethod
+    def keyframe_indices(t_values, max_frames):
+        """Indices of the samples at up to max_frames evenly spaced times (always the first and last sample)."""
+        num_samples = len(t_values)
+        if num_samples <= 1:
+            return np.zeros(num_samples, dtype=int)
+        ticks = np.linspace(t_values[0], t_values[-1], min(num_samples, max(2, max_frames)))
+        return np.unique(np.searchsorted(t_values, ticks).clip(0, num_samples - 1))
+
+    def _segment_frames(self, fig, t_values, x_km, y_km, z_km, burn_idx):
+        """
+        Append-only animation: one initially empty trace per keyframe, and frame j fills only trace j with the
+        samples between keyframes j-1 and j. Earlier segments keep their data, so the figure holds each sample
+        about once instead of once per later frame.
+        """
+        keyframes = self.keyframe_indices(t_values, self.max_frames)
+        first_trace = len(fig.data)
+        traces, frames = [], []
+        for j, k in enumerate(keyframes):
+            start = keyframes[j - 1] if j > 0 else 0
+            line = dict(color='orange' if k < burn_idx else 'green', width=8)
+            traces.append(dict(type='scatter3d', x=[], y=[], z=[], mode='lines', showlegend=False,
+                               hoverinfo='skip', line=line))
+            frames.append(dict(name=str(j), traces=[first_trace + j], data=[
+                dict(type='scatter3d', x=x_km[start:k + 1], y=y_km[start:k + 1], z=z_km[start:k + 1],
+                     mode='lines', line=line)]))
+        fig.add_traces(traces)
+        return frames
+
+    def _prefix_frames(self, x_km, y_km, z_km, burn_idx):
+        return [go.Frame(data=[
+            go.Scatter3d(x=x_km[:k + 1], y=y_km[:k + 1], z=z_km[:k + 1], mode='lines',
+                         line=dict(color='orange' if k < burn_idx else 'green', width=8))]) for k in range(len(x_km))]
+
+    def plot(self, title="Rocket Trajectory", collisions=None, show=True, object_label="Unknown Object"):
+        samples = self.build_samples()
+        t_values, x, y, z = samples['t'], samples['x'], samples['y'], samples['z']
+        orbit = samples['phase'] == self.PHASES.index('orbit') if 'phase' in samples else np.zeros(len(t_values), dtype=bool)
+        t_values = t_values[~orbit]
+        x_km = x[~orbit] / 1000
+        y_km = y[~orbit] / 1000
+        z_km = z[~orbit] / 1000
 
         # Cap at climb
         target_z_km = z_km[-1]
@@ -40,15 +387,16 @@ class TrajectoryVisualizer:
         fig = go.Figure()
 
         # Earth
-        u, v = np.linspace(0, 2 * np.pi, 50), np.linspace(0, np.pi, 50)
-        x_earth = 6371 * np.outer(np.cos(u), np.sin(v))
-        y_earth = 6371 * np.outer(np.sin(u), np.sin(v))
-        z_earth = 6371 * np.outer(np.ones(np.size(u)), np.cos(v))
+        x_earth, y_earth, z_earth = self.earth_mesh()
         fig.add_trace(go.Surface(x=x_earth, y=y_earth, z=z_earth, colorscale='Blues', opacity=0.8, showscale=False))
 
         # Trajectory
         fig.add_trace(go.Scatter3d(x=x_burn, y=y_burn, z=z_burn, mode='lines', name='Burn', line=dict(color='orange', width=8)))
         fig.add_trace(go.Scatter3d(x=x_coast, y=y_coast, z=z_coast, mode='lines', name='Coast', line=dict(color='green', width=6)))
+        if orbit.any():
+            fig.add_trace(go.Scatter3d(x=np.append(x_climb_km[-1], x[orbit] / 1000), y=np.append(y_climb_km[-1], y[orbit] / 1000),
+                                       z=np.append(z_climb_km[-1], z[orbit] / 1000), mode='lines', name='Orbit',
+                                       line=dict(color='magenta', width=6)))
 
         # Start/End
         fig.add_trace(go.Scatter3d(x=[x_climb_km[0]], y=[y_climb_km[0]], z=[z_climb_km[0]], mode='markers+text', name='Launch', marker=dict(size=15, color='lime'), text=['START'], textposition='top center'))
@@ -62,13 +410,24 @@ class TrajectoryVisualizer:
         z_ring = np.full_like(theta, r_target_km)
         fig.add_trace(go.Scatter3d(x=x_ring, y=y_ring, z=z_ring, mode='lines', name='Target Altitude', line=dict(color='cyan', width=6, dash='dash')))
 
+        # Debris passing within the corridor, one trace with gaps between objects
+        if self.debris_tracks:
+            xs, ys, zs, labels = [], [], [], []
+            for track in self.debris_tracks:
+                label = f"NORAD {track['satnum']}: closest {track['distance_km']:.1f} km at t={track['t_min']:.0f} s"
+                xs.extend(list(track['xyz'][:, 0] / 1000) + [None])
+                ys.extend(list(track['xyz'][:, 1] / 1000) + [None])
+                zs.extend(list(track['xyz'][:, 2] / 1000) + [None])
+                labels.extend([label] * len(track['t']) + [None])
+            fig.add_trace(go.Scatter3d(x=xs, y=ys, z=zs, mode='lines', name=f"Nearby Debris ({len(self.debris_tracks)})",
+                                       text=labels, hoverinfo='text', line=dict(color='yellow', width=3)))
+
         # Collisions
-        if collisions:
-            t_coll, pos_coll = zip(*collisions)
-            x_coll = [p[0] / 1000 for p in pos_coll]
-            y_coll = [p[1] / 1000 for p in pos_coll]
-            z_coll = [p[2] / 1000 for p in pos_coll]
-            fig.add_trace(go.Scatter3d(x=x_coll, y=y_coll, z=z_coll, mode='markers', name='Collisions', marker=dict(size=10, color='red', symbol='x')))
+        if collisions is not None and len(collisions):
+            pos_coll = collisions['position'] / 1000  # Conjunction events (CONJUNCTION_DTYPE), one per encounter
+            labels = [describe(event, object_label) for event in collisions]
+            fig.add_trace(go.Scatter3d(x=pos_coll[:, 0], y=pos_coll[:, 1], z=pos_coll[:, 2], mode='markers',
+                                       name='Collisions', text=labels, hoverinfo='text', marker=dict(size=10, color='red', symbol='x')))
 
         # Stats
         max_altitude = z_climb_km.max() - 6371
@@ -79,7 +438,13 @@ class TrajectoryVisualizer:
             dict(text=f"Burn Time: {self.burn_time:.0f} s", x=0.95, y=0.85, xref="paper", yref="paper", showarrow=False)
         ]
 
-        frame_duration = max(20, int(self.t_max * 1000 / len(t_values)))
+        if self.animation == 'segments':
+            frames = self._segment_frames(fig, t_climb_values, x_climb_km, y_climb_km, z_climb_km, burn_idx)
+        elif self.animation == 'prefix':
+            frames = self._prefix_frames(x_climb_km, y_climb_km, z_climb_km, burn_idx)
+        else:
+            frames = []
+        frame_duration = max(20, int(self.t_max * 1000 / max(1, len(frames))))
         fig.update_layout(
             title=dict(text=title, font_size=20, x=0.5, xanchor='center'),
             scene=dict(
@@ -99,12 +464,10 @@ class TrajectoryVisualizer:
             )]
         )
 
-        frames = [go.Frame(data=[
-            go.Scatter3d(x=x_climb_km[:k + 1], y=y_climb_km[:k + 1], z=z_climb_km[:k + 1], mode='lines',
-                         line=dict(color='orange' if k < burn_idx else 'green', width=8))]) for k in range(len(x_climb_km))]
         fig.frames = frames
 
-        fig.show()
+        if show:
+            fig.show()
         return fig  # For Flask, no show()
 
 # Test tweak
@@ -1,18 +1,36 @@
-from flask import Flask, render_template, request, jsonify, redirect, g, session
+from flask import Flask, render_template, request, jsonify, redirect, session, Response, stream_with_context, g
 from werkzeug.utils import secure_filename
 import os
-from datetime import datetime, timedelta
-from src.utils.tle_preprocessor import preprocess_and_save_tle
+import gzip
+import json
+import queue
+import threading
+import time
+from datetime import datetime
+from functools import lru_cache
+import numpy as np
+import plotly.offline
+from src.utils.tle_preprocessor import preprocess_and_save_tle, merge_tle_file, load_catalog_index
 from src.core.timestamp_selector import TimestampSelector
 from src.core.orbit_selector import OrbitSelector
 from src.core.rocket_selector import RocketSelector
-from src.core.trajectory_calculator import TrajectoryCalculator
 from src.core.dummy_tle_trajectory import DummyTleTrajectory
+from src.core.mission_pipeline import MissionPipeline
 from src.core.collision_detector import CollisionDetector
-from src.core.ddql_optimizer import DDQLOptimizer
+from src.core.collision_probability import CollisionProbability
+from src.core.orbit_screening import OrbitScreening
+from src.core.sampled_trajectory import SampledTrajectory
 from src.core.trajectory_visualizer import TrajectoryVisualizer
-from src.core.mission_report import MissionReport
+from src.utils.binary_payload import encode_arrays
 from src.utils.dummy_tle_generator import generate_dummy_tle
+from src.utils.job_queue import JobQueue, JobQueueFullError
+from src.utils.metrics import MetricsRegistry
+from src.utils.profiling import RequestProfile, PROFILE_MODES
+from src.utils.progress import ProgressBus
+from src.utils.report_store import ReportStore
+from src.utils.result_cache import MissionResultCache, catalog_fingerprint
+from src.utils.state_store import MissionStateStore
+from src.config import settings
 from flask_cors import CORS
 
 app = Flask(__name__, template_folder='templates', static_folder='static')
@@ -23,14 +41,428 @@ BASE_DIR = "/Users/thrishankkuntimaddi/Documents/Projects/SDARC-Enhanced"
 OUTPUT_TLE = os.path.join(BASE_DIR, "data", "tle_data.txt")
 REPORTS_DIR = os.path.join(BASE_DIR, "outputs", "mission_reports")
 STATIC_DIR = os.path.join(BASE_DIR, "src", "interface", "static")
+PROFILE_DIR = settings.PROFILE_DIR or os.path.join(BASE_DIR, "outputs", "profiles")
 ALLOWED_EXTENSIONS = {'txt'}
 
 os.makedirs(REPORTS_DIR, exist_ok=True)
 os.makedirs(STATIC_DIR, exist_ok=True)
 
+STATE_STORE = MissionStateStore(ttl_s=settings.STATE_STORE_TTL_S, disk_dir=settings.STATE_STORE_DIR)
+RESULT_CACHE = MissionResultCache(max_entries=settings.RESULT_CACHE_MAX_ENTRIES, ttl_s=settings.RESULT_CACHE_TTL_S,
+                                  on_evict=lambda key, response: remove_cached_visualization(key, response))
+# Cache key -> what a cached result depends on in the catalog (see catalog_dependency), for carrying results
+# over a catalog merge that does not affect them
+CATALOG_DEPENDENTS = {}
+CATALOG_DEPENDENTS_LOCK = threading.RLock()  # Guards CATALOG_DEPENDENTS (re-entered by the eviction hook)
+CATALOG_LOCK = threading.Lock()  # Serializes catalog uploads
+REPORT_STORE = ReportStore(settings.REPORT_DB_PATH or os.path.join(REPORTS_DIR, "reports.sqlite3"))
+PROGRESS_BUS = ProgressBus(max_channels=settings.JOB_MAX_FINISHED)  # Replay for every finished job kept
+COLLISION_PROBABILITY = CollisionProbability(
+    settings.PC_METHOD, threshold=settings.PC_THRESHOLD, hard_body_radius_m=settings.PC_HARD_BODY_RADIUS_M,
+    debris_sigma_km=settings.PC_DEBRIS_SIGMA_KM, rocket_sigma_km=settings.PC_ROCKET_SIGMA_KM
+) if settings.PC_METHOD else None
+ORBIT_SCREENING = OrbitScreening(step_s=settings.ORBIT_SCREENING_STEP_S, margin_km=settings.ORBIT_SCREENING_MARGIN_KM)
+JOB_QUEUE = JobQueue(max_workers=settings.JOB_MAX_WORKERS, max_pending=settings.JOB_MAX_PENDING,
+                     max_finished=settings.JOB_MAX_FINISHED, progress_bus=PROGRESS_BUS)
+# Stage latencies, request and mission counters for /metrics
+METRICS = MetricsRegistry()
+HTTP_REQUESTS = METRICS.counter('http_requests_total', "HTTP requests by route, method and status",
+                                ('endpoint', 'method', 'status'))
+HTTP_LATENCY = METRICS.histogram('http_request_duration_seconds', "HTTP request handling time by route", ('endpoint',))
+MISSIONS = METRICS.counter('missions_total', "Mission requests by kind and result cache status", ('kind', 'cache'))
+
+
+def runtime_metrics():
+    """Result cache and job queue statistics, read when /metrics is scraped."""
+    cache = RESULT_CACHE.stats()
+    jobs = JOB_QUEUE.stats()
+    return [
+        ('result_cache_lookups_total', 'counter', "Mission result cache lookups by outcome",
+         [({'outcome': 'hit'}, cache['hits']), ({'outcome': 'miss'}, cache['misses']),
+          ({'outcome': 'coalesced'}, cache['coalesced'])]),
+        ('result_cache_entries', 'gauge', "Mission results currently cached", [({}, cache['entries'])]),
+        ('jobs', 'gauge', "Background mission jobs by status",
+         [({'status': status}, jobs[status]) for status in ('queued', 'running', 'succeeded', 'failed')]),
+        ('mission_states', 'gauge', "Missions held in the state store", [({}, len(STATE_STORE))])
+    ]
+
+
+METRICS.register_collector(runtime_metrics)
+
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+
+@app.after_request
+def record_request_metrics(response):
+    # Route patterns rather than paths keep the label set bounded
+    endpoint = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+    start = g.pop('request_start', None)
+    if start is not None:
+        HTTP_LATENCY.observe(time.perf_counter() - start, endpoint=endpoint)
+    HTTP_REQUESTS.inc(endpoint=endpoint, method=request.method, status=response.status_code)
+    return response
+
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+def optimization_budget(data):
+    """Anytime DDQL budget for a request: optional 'timeBudget' (s) / 'maxEvaluations' override the settings."""
+    time_budget = data.get('timeBudget', settings.DDQL_TIME_BUDGET_S)
+    max_evaluations = data.get('maxEvaluations', settings.DDQL_MAX_EVALUATIONS)
+    return {
+        'time_budget_s': float(time_budget) if time_budget is not None else None,
+        'max_evaluations': int(max_evaluations) if max_evaluations is not None else None,
+        'patience': settings.DDQL_PATIENCE_EPISODES,
+        'max_episodes': settings.DDQL_MAX_EPISODES,
+        'max_steps': settings.DDQL_MAX_STEPS
+    }
+
+def screening_horizon(data):
+    """
+    Post-insertion screening horizon of a request: optional 'horizonRevolutions' (at most
+    ORBIT_SCREENING_MAX_REVOLUTIONS) or 'horizonDays' (at most ORBIT_SCREENING_MAX_DAYS), else the settings
+    default. Raises ValueError for invalid values.
+    """
+    revolutions = data.get('horizonRevolutions')
+    days = data.get('horizonDays')
+    if revolutions is None and days is None:
+        revolutions = settings.ORBIT_SCREENING_REVOLUTIONS
+    horizon = {
+        'horizon_revolutions': float(revolutions) if revolutions is not None else None,
+        'horizon_days': float(days) if days is not None and revolutions is None else None
+    }
+    if any(value is not None and not value > 0 for value in horizon.values()):
+        raise ValueError("horizonRevolutions and horizonDays must be positive")
+    if horizon['horizon_revolutions'] is not None and \
+            horizon['horizon_revolutions'] > settings.ORBIT_SCREENING_MAX_REVOLUTIONS:
+        raise ValueError(f"horizonRevolutions exceeds {settings.ORBIT_SCREENING_MAX_REVOLUTIONS:g}")
+    if horizon['horizon_days'] is not None and horizon['horizon_days'] > settings.ORBIT_SCREENING_MAX_DAYS:
+        raise ValueError(f"horizonDays exceeds {settings.ORBIT_SCREENING_MAX_DAYS:g}")
+    return horizon
+
+def optimization_summary(result):
+    """JSON-safe view of an optimize_anytime result (without the equations)."""
+    if result is None:
+        return None
+    return {key: value for key, value in result.items() if key != 'equations'}
+
+def parse_mission_request(data):
+    """MissionPipeline.run arguments from a /process_trajectory style JSON payload."""
+    lat, lon, alt = map(float, data['launchSiteCoordinates'].strip("()").split(","))
+    return {
+        'rocket_type': data['rocketType'],
+        'launch_site': data.get('launchSite', 'Unknown'),  # Default if missing
+        'coordinates': (lat, lon, alt),
+        'target_altitude': float(data['targetAltitude']),
+        'orbit_type': data['orbitType'],
+        'timestamp': datetime.strptime(data['timestamp'], "%Y/%m/%d %H:%M:%S")
+    }
+
+def run_mission(data, dummy=False, progress=None, mission_id=None, refresh=False):
+    """
+    Run the mission pipeline for a request payload and build the JSON response body.
+    Results are cached by a hash of every input, including the TLE catalog content; identical
+    concurrent requests share one computation. With a mission_id, the stored trajectory, samples and
+    screening result of that mission are reused and the new screening result is stored back.
+    The displayed trajectory is kept in the state store for multi-resolution requests (trajectory_url),
+    compact binary payloads (payload_url) and the client-side viewer (viewer_url); the report is kept in the
+    report store (report_id, report_url). refresh=True recomputes a cached result.
+    """
+    mission = parse_mission_request(data)
+    budget = optimization_budget(data)
+    horizon = screening_horizon(data)
+    catalog = catalog_fingerprint(OUTPUT_TLE)
+    inputs = dict(dummy=dummy, threshold_km=1.0, budget=budget, debris_corridor_km=settings.DEBRIS_CORRIDOR_KM,
+                  **mission, **horizon)
+    key = RESULT_CACHE.make_key(catalog=catalog, **inputs)
+    viz_filename = f"{'dummy_trajectory' if dummy else 'trajectory'}_{key[:16]}.html"
+
+    def compute():
+        state = STATE_STORE.get(mission_id) or {}
+        screening_key = f"{catalog}:{mission['timestamp'].isoformat()}:1.0"
+        screening = state.get('screening', {}).get(screening_key, {})
+        pipeline = MissionPipeline(OUTPUT_TLE, STATIC_DIR, threshold_km=1.0, dummy=dummy,
+                                   debris_corridor_km=settings.DEBRIS_CORRIDOR_KM,
+                                   max_debris_tracks=settings.DEBRIS_MAX_TRACKS, report_store=REPORT_STORE,
+                                   metrics=METRICS, collision_probability=COLLISION_PROBABILITY,
+                                   orbit_screening=ORBIT_SCREENING)
+        result = pipeline.run(**mission, **horizon, budget=budget, viz_filename=viz_filename, progress=progress,
+                              trajectory_data=state.get('trajectory_data'), samples=state.get('samples'),
+                              collisions=screening.get('collisions'), closest_approach=screening.get('closest_approach'))
+        if state:
+            samples = result['samples'] if result['samples'] is not None else state.get('samples')
+            STATE_STORE.update(mission_id, samples=samples, screening={screening_key: {
+                'collisions': result['initial_collisions'],
+                'closest_approach': result['closest_approach']
+            }})
+        display_state = {
+            'display_samples': result['display_samples'],
+            'display_equations': result['display_equations'],
+            'display_collisions': result['display_collisions'],
+            'initial_collisions': result['initial_collisions'],
+            'debris_tracks': result['debris_tracks'],
+            't_climb': float(result['trajectory_data'][1]),
+            'burn_time': float(result['trajectory_data'][5])
+        }
+        if result['closest_approach'] is not None and result['display_closest_approach'] is not None:
+            dependency = catalog_dependency(catalog, inputs, mission['timestamp'], result)
+            with CATALOG_DEPENDENTS_LOCK:
+                CATALOG_DEPENDENTS[key] = dependency
+        return dict(display_urls(STATE_STORE.create(**display_state)), **{
+            '_display_state': display_state,  # Restored if it expires before the cached result
+            'viz_url': f"/static/{result['viz_filename']}",
+            'report_id': result['report_id'],
+            'report_url': f"/report?id={result['report_id']}",
+            'report_content': result['report_content'],
+            'collisions': result['collisions'],
+            'conjunctions': result['conjunctions'],
+            'orbit_screening': result['orbit_screening'],
+            'optimization': optimization_summary(result['optimization']),
+            'steps': result['steps']
+        })
+
+    if refresh:
+        RESULT_CACHE.invalidate(key)
+    if progress is not None:
+        progress('cache', None, "Checking mission result cache")
+    response, cache_status = RESULT_CACHE.get_or_compute(key, compute)
+    response = dict(response, cache=cache_status)
+    display_state = response.pop('_display_state')
+    # Looking the display state up keeps it alive; if it idled out while the result stayed cached, restore it
+    display_id = response['trajectory_url'].split('/')[2]
+    if cache_status != 'miss' and STATE_STORE.get(display_id) is None:
+        STATE_STORE.restore(display_id, **display_state)
+    MISSIONS.inc(kind='dummy' if dummy else 'mission', cache=cache_status)
+    if progress is not None and cache_status != 'miss':
+        progress('done', 100, "Served from mission result cache", cache=cache_status)
+    return response
+
+def display_urls(display_id):
+    """URLs of the displayed trajectory kept in the state store under display_id."""
+    return {
+        'trajectory_url': f"/missions/{display_id}/trajectory",
+        'payload_url': f"/missions/{display_id}/payload.bin",
+        'viewer_url': f"/missions/{display_id}/viewer"
+    }
+
+def catalog_dependency_radius(closest_approach):
+    """
+    Distance (km) within which a changed catalog object can alter a mission result: the screening threshold,
+    the debris track corridor, or the closest approach quoted in the report, whichever is largest.
+    """
+    distances = closest_approach['distance_km']
+    distances = distances[np.isfinite(distances)]
+    nearest = float(distances.min()) if len(distances) else 0.0
+    return max(1.0, settings.DEBRIS_CORRIDOR_KM or 0.0, nearest)
+
+
+def catalog_dependency(catalog, inputs, timestamp, result):
+    """What a cached mission result depends on in the catalog: the objects screened within the dependency radius
+    of either trajectory, plus the sampled trajectories to screen changed objects against."""
+    radius_km = catalog_dependency_radius(result['closest_approach'])
+    nearby = set()
+    for closest_approach in (result['closest_approach'], result['display_closest_approach']):
+        nearby.update(closest_approach['satnum'][closest_approach['distance_km'] <= radius_km].tolist())
+    return {
+        'catalog': catalog,
+        'inputs': inputs,
+        'timestamp': timestamp,
+        'samples': result['samples'],
+        'display_samples': result['display_samples'],
+        't_climb': float(result['trajectory_data'][1]),
+        'burn_time': float(result['trajectory_data'][5]),
+        'radius_km': radius_km,
+        'nearby': nearby
+    }
+
+
+def refresh_catalog_dependents(changes, old_catalog, new_catalog):
+    """
+    Carry mission results cached and screening results stored against old_catalog over to new_catalog after a
+    merge (see merge_tle_file), unless a changed object was or now comes within their dependency radius; those
+    are invalidated, as are results with post-insertion screening (any change may reach the target orbit).
+    Only the changed objects are propagated. Returns counts of kept and invalidated entries.
+    """
+    detector = CollisionDetector(OUTPUT_TLE)
+    satnums = np.array([sat.satnum for sat in detector._cached_satellites()], dtype=np.int32)
+    changed = np.flatnonzero(np.isin(satnums, changes.changed))
+    changed_satnums = set(changes.changed.tolist())
+    counts = {'results_kept': 0, 'results_invalidated': 0, 'screenings_kept': 0, 'screenings_dropped': 0}
+
+    # Held throughout, so results finishing meanwhile register after their old-catalog entries are settled
+    with CATALOG_DEPENDENTS_LOCK:
+        for key, dependent in list(CATALOG_DEPENDENTS.items()):
+            if dependent['catalog'] != old_catalog:
+                continue
+            # Post-insertion screening covers the target orbit, far beyond the climb the samples describe
+            inputs = dependent['inputs']
+            affected = inputs.get('horizon_revolutions') is not None or inputs.get('horizon_days') is not None or \
+                not dependent['nearby'].isdisjoint(changed_satnums)
+            for samples in (dependent['samples'], dependent['display_samples']):
+                if affected:
+                    break
+                sampled = SampledTrajectory(samples, dependent['t_climb'], dependent['burn_time'])
+                distance_km, _ = detector.screen_objects(changed, dependent['timestamp'], sampled)
+                affected = bool((distance_km <= dependent['radius_km']).any())
+            new_key = RESULT_CACHE.make_key(catalog=new_catalog, **dependent['inputs'])
+            if not affected and RESULT_CACHE.rekey(key, new_key):
+                CATALOG_DEPENDENTS[new_key] = dict(CATALOG_DEPENDENTS.pop(key), catalog=new_catalog)
+                counts['results_kept'] += 1
+            else:
+                RESULT_CACHE.invalidate(key)
+                CATALOG_DEPENDENTS.pop(key, None)
+                counts['results_invalidated'] += 1
+
+    for mission_id, state in STATE_STORE.items():
+        screening = state.get('screening') or {}
+        stale = [screening_key for screening_key in screening if screening_key.partition(':')[0] == old_catalog]
+        if not stale:
+            continue
+        refreshed = {screening_key: entry for screening_key, entry in screening.items() if screening_key not in stale}
+        for screening_key in stale:
+            entry, rest = screening[screening_key], screening_key.partition(':')[2]
+            spliced = None
+            closest_approach = entry.get('closest_approach')
+            if closest_approach is not None and state.get('samples') is not None and state.get('trajectory_data'):
+                radius_km = catalog_dependency_radius(closest_approach)
+                was_near = np.isin(closest_approach['satnum'], changes.changed) & \
+                    (closest_approach['distance_km'] <= radius_km)
+                if not was_near.any():
+                    timestamp = datetime.fromisoformat(rest.rsplit(':', 1)[0])
+                    trajectory_data = state['trajectory_data']
+                    sampled = SampledTrajectory(state['samples'], trajectory_data[1], trajectory_data[5])
+                    distance_km, t = detector.screen_objects(changed, timestamp, sampled)
+                    if not (distance_km <= radius_km).any():
+                        spliced = detector.splice_closest_approach(closest_approach, satnums, changed, distance_km, t)
+            if spliced is None:
+                counts['screenings_dropped'] += 1
+                continue
+            refreshed[f"{new_catalog}:{rest}"] = {'collisions': entry['collisions'], 'closest_approach': spliced}
+            counts['screenings_kept'] += 1
+        STATE_STORE.update(mission_id, screening=refreshed)
+    print(f"Catalog merge: kept {counts['results_kept']} cached results ({counts['results_invalidated']} invalidated), "
+          f"{counts['screenings_kept']} screenings ({counts['screenings_dropped']} dropped)")
+    return counts
+
+
+def ingest_catalog(raw_tle_path, mode):
+    """
+    Replace the catalog with a raw TLE file ('replace'), or merge it in by satellite number ('merge'), keeping
+    the cached and stored results the changed objects cannot affect. Returns the merge summary (empty when
+    replacing).
+    """
+    with CATALOG_LOCK, METRICS.stage('preprocess'):
+        if mode != 'merge' or not os.path.exists(OUTPUT_TLE):
+            preprocess_and_save_tle(raw_tle_path, OUTPUT_TLE, history_max_epochs=settings.CATALOG_HISTORY_MAX_EPOCHS)
+            return {}
+        old_catalog = catalog_fingerprint(OUTPUT_TLE)
+        changes = merge_tle_file(raw_tle_path, OUTPUT_TLE, history_max_epochs=settings.CATALOG_HISTORY_MAX_EPOCHS)
+        refresh = refresh_catalog_dependents(changes, old_catalog, catalog_fingerprint(OUTPUT_TLE)) if changes else {}
+        return {'changes': changes.to_dict(), 'refresh': refresh}
+
+
+def dummy_mission_state(data):
+    """
+    Fetch the server-side dummy trajectory state of the request's mission ('missionId' or the session's),
+    compiling and storing the trajectory only when the rocket, altitude or launch site changed.
+    Returns (mission_id, state).
+    """
+    mission = parse_mission_request(data)
+    params = {
+        'rocket_type': mission['rocket_type'],
+        'target_altitude': mission['target_altitude'],
+        'coordinates': list(mission['coordinates'])
+    }
+    mission_id = data.get('missionId') or session.get('mission_id')
+    state = STATE_STORE.get(mission_id)
+    if state is None or state.get('params') != params:
+        trajectory_data = DummyTleTrajectory().calculate(params['rocket_type'], params['target_altitude'],
+                                                         mission['coordinates'])
+        mission_id = STATE_STORE.create(params=params, trajectory_data=trajectory_data)
+        state = STATE_STORE.get(mission_id)
+    elif 'trajectory_data' not in state:
+        # Loaded from the on-disk store: the compiled equations are rebuilt, samples/screening are kept
+        trajectory_data = DummyTleTrajectory().calculate(params['rocket_type'], params['target_altitude'],
+                                                         mission['coordinates'])
+        state = STATE_STORE.update(mission_id, trajectory_data=trajectory_data)
+    session['mission_id'] = mission_id
+    return mission_id, state
+
+def trajectory_payload(mission_id, state, detail):
+    """
+    Binary payload (src/utils/binary_payload.py) of a mission's displayed trajectory at a detail level, the
+    conjunction events found before optimization ('debris') and left on the displayed trajectory ('collision'),
+    each with its screened time, TCA, object number and miss distance, and the nearby debris tracks
+    (concatenated, split by track_lengths). Times in s, positions in km.
+    """
+    view = TrajectoryVisualizer.decimate(state['display_samples'], settings.TRAJECTORY_DETAIL_LEVELS[detail])
+    arrays = {
+        'trajectory_t': view['t'],
+        'trajectory_xyz': np.column_stack((view['x'], view['y'], view['z'])) / 1000
+    }
+    if 'phase' in view:
+        arrays['trajectory_phase'] = view['phase'].astype(np.uint8)
+    for name, events in (('debris', state['initial_collisions']), ('collision', state['display_collisions'])):
+        arrays[f'{name}_t'] = events['t']
+        arrays[f'{name}_tca'] = events['tca']
+        arrays[f'{name}_xyz'] = events['position'] / 1000
+        arrays[f'{name}_satnum'] = events['satnum']
+        arrays[f'{name}_miss_km'] = events['miss_km']
+    tracks = state.get('debris_tracks', [])
+    arrays['track_lengths'] = np.array([len(track['t']) for track in tracks], dtype=np.int32)
+    arrays['track_satnum'] = np.array([track['satnum'] for track in tracks], dtype=np.int32)
+    arrays['track_distance_km'] = np.array([track['distance_km'] for track in tracks], dtype=float)
+    arrays['track_t'] = np.concatenate([track['t'] for track in tracks]) if tracks else np.empty(0)
+    arrays['track_xyz'] = np.concatenate([track['xyz'] for track in tracks]) / 1000 if tracks else np.empty((0, 3))
+    meta = {
+        'missionId': mission_id,
+        'detail': detail,
+        'phases': list(TrajectoryVisualizer.PHASES),
+        'burnTime': state['burn_time'],
+        'tClimb': state['t_climb']
+    }
+    return encode_arrays(arrays, meta)
+
+@lru_cache(maxsize=None)
+def generated_asset(name):
+    """(body, gzipped body) of an asset generated once per server process."""
+    if name == 'earth_mesh.bin':
+        x_earth, y_earth, z_earth = TrajectoryVisualizer.earth_mesh()
+        body = encode_arrays({'x': x_earth, 'y': y_earth, 'z': z_earth}, meta={'radiusKm': 6371})
+    else:  # plotly.min.js, so the viewer works without a CDN
+        body = plotly.offline.get_plotlyjs().encode('utf-8')
+    return body, gzip.compress(body)
+
+GENERATED_ASSETS = {'earth_mesh.bin': 'application/octet-stream', 'plotly.min.js': 'application/javascript'}
+
+def binary_response(body, mimetype, cache_control, gzipped=None):
+    """
+    Response with an ETag (answering If-None-Match with 304) and gzip encoding when the client accepts it
+    (disabled by ?compress=0); the gzip representation's ETag carries a -gzip suffix.
+    """
+    use_gzip = request.args.get('compress', '1') != '0' and 'gzip' in request.headers.get('Accept-Encoding', '')
+    response = Response(body, mimetype=mimetype)
+    response.headers['Cache-Control'] = cache_control
+    response.headers['Vary'] = 'Accept-Encoding'
+    response.add_etag()
+    if use_gzip:
+        # Each representation gets its own strong validator
+        response.set_etag(f"{response.get_etag()[0]}-gzip")
+    response.make_conditional(request)
+    if response.status_code == 200 and use_gzip:
+        response.set_data(gzipped if gzipped is not None else gzip.compress(body, compresslevel=6))
+        response.headers['Content-Encoding'] = 'gzip'
+    return response
+
+def remove_cached_visualization(key, response):
+    """Delete the figure of an evicted cache entry."""
+    viz_path = os.path.join(STATIC_DIR, os.path.basename(response['viz_url']))
+    if os.path.exists(viz_path):
+        os.remove(viz_path)
+    with CATALOG_DEPENDENTS_LOCK:
+        CATALOG_DEPENDENTS.pop(key, None)
+
 @app.route('/')
 def index():
     return render_template('index.html')
@@ -47,27 +479,8 @@ def dummy_tle_testing():
 def dummy_initial_trajectory():
     try:
         data = request.get_json()
-        rocket_type = data['rocketType']
-        launch_site = data['launchSite']
-        coords = data['launchSiteCoordinates']
-        target_altitude = float(data['targetAltitude'])
-        orbit_type = data['orbitType']
-        timestamp = datetime.strptime(data['timestamp'], "%Y/%m/%d %H:%M:%S")
-        lat, lon, alt = map(float, coords.strip("()").split(","))
-
-        traj_calc = DummyTleTrajectory()
-        equations, t_climb, formulas, initial, v_orbit, burn_time = traj_calc.calculate(rocket_type, target_altitude, (lat, lon, alt))
-
-        session['dummy_trajectory'] = {
-            't_climb': float(t_climb),
-            'formulas': dict(formulas),
-            'initial': {k: float(v) for k, v in initial.items()},
-            'v_orbit': float(v_orbit),
-            'burn_time': float(burn_time)
-        }
-        g.dummy_equations = equations
-
-        return jsonify({'message': 'Initial dummy trajectory calculated'})
+        mission_id, state = dummy_mission_state(data)
+        return jsonify({'message': 'Initial dummy trajectory calculated', 'missionId': mission_id})
     except Exception as e:
         return jsonify({'error': f"Error: {str(e)}"}), 500
 
@@ -78,32 +491,20 @@ def generate_dummy_tles():
         debris_count = data['count']
         timestamp = datetime.strptime(data['timestamp'], "%Y/%m/%d %H:%M:%S")
         target_altitude = float(data['targetAltitude'])
-        orbit_type = data['orbitType']
-        rocket_type = data['rocketType']
         lat, lon, alt = map(float, data['launchSiteCoordinates'].strip("()").split(","))
 
-        if 'dummy_trajectory' not in session or not hasattr(g, 'dummy_equations'):
-            traj_calc = DummyTleTrajectory()
-            equations, t_climb, formulas, initial, v_orbit, burn_time = traj_calc.calculate(rocket_type, target_altitude, (lat, lon, alt))
-            session['dummy_trajectory'] = {
-                't_climb': float(t_climb),
-                'formulas': dict(formulas),
-                'initial': {k: float(v) for k, v in initial.items()},
-                'v_orbit': float(v_orbit),
-                'burn_time': float(burn_time)
-            }
-            g.dummy_equations = equations
-
-        traj_data = session['dummy_trajectory']
-        equations = g.dummy_equations
-        t_climb = traj_data['t_climb']
+        mission_id, state = dummy_mission_state(data)
+        equations, t_climb = state['trajectory_data'][0], state['trajectory_data'][1]
 
         output_path = os.path.join(BASE_DIR, "data", "tle_data.txt")
-        message = generate_dummy_tle(debris_count, output_path, timestamp, target_altitude, lat, lon, equations, t_climb)
+        # Optional load-testing mix: near misses and a background population, reproducible with a seed
+        message = generate_dummy_tle(debris_count, output_path, timestamp, target_altitude, lat, lon, equations, t_climb,
+                                     near_misses=int(data.get('nearMisses', 0)), background=int(data.get('background', 0)),
+                                     seed=data.get('seed'), screening_step_s=CollisionDetector.STEP_S)
 
         session['dummy_input'] = data
 
-        return jsonify({'message': message})
+        return jsonify({'message': message, 'missionId': mission_id})
     except Exception as e:
         return jsonify({'error': f"Error: {str(e)}"}), 500
 
@@ -111,97 +512,11 @@ def generate_dummy_tles():
 def process_dummy_trajectory():
     try:
         data = request.get_json()
-        rocket_type = data['rocketType']
-        launch_site = data.get('launchSite', 'Unknown')  # Default if missing
-        coords = data['launchSiteCoordinates']
-        target_altitude = float(data['targetAltitude'])
-        orbit_type = data['orbitType']
-        timestamp = datetime.strptime(data['timestamp'], "%Y/%m/%d %H:%M:%S")
-        lat, lon, alt = map(float, coords.strip("()").split(","))
-
-        # If session data is missing, recalculate
-        if 'dummy_trajectory' not in session or not hasattr(g, 'dummy_equations'):
-            traj_calc = DummyTleTrajectory()
-            equations, t_climb, formulas, initial, v_orbit, burn_time = traj_calc.calculate(rocket_type, target_altitude, (lat, lon, alt))
-            session['dummy_trajectory'] = {
-                't_climb': float(t_climb),
-                'formulas': dict(formulas),
-                'initial': {k: float(v) for k, v in initial.items()},
-                'v_orbit': float(v_orbit),
-                'burn_time': float(burn_time)
-            }
-            g.dummy_equations = equations
-
         # Use existing or set dummy_input if missing
         if 'dummy_input' not in session:
             session['dummy_input'] = data
-
-        traj_data = session['dummy_trajectory']
-        equations = g.dummy_equations
-
-        t_climb = traj_data['t_climb']
-        formulas = traj_data['formulas']
-        initial = traj_data['initial']
-        v_orbit = traj_data['v_orbit']
-        burn_time = traj_data['burn_time']
-        trajectory_data = (equations, t_climb, formulas, initial, v_orbit, burn_time)
-
-        detector = CollisionDetector(tle_txt_path=OUTPUT_TLE, threshold_km=1.0)
-        collisions = detector.detect_collisions(equations, timestamp, t_climb)
-        collisions_with_obj = [(t, pos, "Dummy Debris") for t, pos in collisions] if collisions else []
-
-        optimized_trajectory_data = None
-        if collisions:
-            optimizer = DDQLOptimizer(equations, t_climb, timestamp, OUTPUT_TLE, threshold_km=1.0)
-            optimized_equations = optimizer.optimize(collisions)
-            optimized_trajectory_data = (optimized_equations, t_climb, formulas, initial, v_orbit, burn_time)
-            collisions = detector.detect_collisions(optimized_equations, timestamp, t_climb)
-            collisions_with_obj = [(t, pos, "Dummy Debris") for t, pos in collisions] if collisions else []
-            final_equations = optimized_equations
-            final_t_climb = t_climb
-        else:
-            final_equations = equations
-            final_t_climb = t_climb
-
-        viz = TrajectoryVisualizer(final_equations, t_max=final_t_climb, burn_time=burn_time)
-        fig = viz.plot(title=f"Dummy Trajectory to {target_altitude} km", collisions=collisions_with_obj)
-        if fig is None:
-            raise ValueError("Visualization failed to generate figure")
-        viz_path = os.path.join(STATIC_DIR, "dummy_trajectory.html")
-        fig.write_html(viz_path)
-
-        traj_calc = DummyTleTrajectory()
-        rocket_params = {
-            'thrust_N': float(traj_calc.rocket_data[traj_calc.rocket_data['Rocket_Type'] == rocket_type]['Thrust_N'].iloc[0]),
-            'mass_kg': float(traj_calc.rocket_data[traj_calc.rocket_data['Rocket_Type'] == rocket_type]['Mass_kg'].iloc[0]),
-            'burn_time_s': float(traj_calc.rocket_data[traj_calc.rocket_data['Rocket_Type'] == rocket_type]['Burn_Time_s'].iloc[0])
-        }
-        report = MissionReport()
-        report_path = report.generate(
-            rocket_type=rocket_type,
-            launch_site=launch_site,
-            orbit_type=orbit_type,
-            altitude_km=target_altitude,
-            timestamp=timestamp,
-            trajectory_data=trajectory_data,
-            collisions=collisions_with_obj,
-            rocket_params=rocket_params,
-            optimized_trajectory_data=optimized_trajectory_data
-        )
-
-        with open(report_path, 'r') as f:
-            report_content = f.read()
-
-        return jsonify({
-            'viz_url': '/static/dummy_trajectory.html',
-            'report_content': report_content,
-            'collisions': len(collisions_with_obj),
-            'steps': [
-                "Calculated initial dummy trajectory",
-                f"Detected {len(collisions_with_obj)} collisions with dummy debris",
-                "Optimized trajectory" if collisions else "No optimization needed"
-            ]
-        })
+        mission_id, _ = dummy_mission_state(data)
+        return jsonify(dict(run_mission(data, dummy=True, mission_id=mission_id), missionId=mission_id))
     except Exception as e:
         print(f"Error in process_dummy_trajectory: {str(e)}")
         return jsonify({'error': f"Error: {str(e)}"}), 500
@@ -211,29 +526,59 @@ def upload_dataset():
     raw_tle_path = os.path.join(BASE_DIR, "inputs", "tle_raw.txt")
     os.makedirs(os.path.dirname(raw_tle_path), exist_ok=True)
     file = request.files.get('file')
+    data = request.get_json(silent=True) if not file else None
+    # mode=merge merges the upload into the current catalog by NORAD id instead of replacing it
+    mode = (request.form.get('mode') if file else (data or {}).get('mode')) or 'replace'
+    if mode not in ('replace', 'merge'):
+        return jsonify({'error': f"Invalid mode: {mode}"}), 400
     if file and allowed_file(file.filename):
         file.save(raw_tle_path)
-        preprocess_and_save_tle(raw_tle_path, OUTPUT_TLE)
-        return jsonify({'message': 'TLE processed successfully'}), 200
-    data = request.get_json()
+        merge = ingest_catalog(raw_tle_path, mode)
+        return jsonify(dict(merge, message='TLE merged successfully' if merge else 'TLE processed successfully')), 200
     if data and 'text' in data:
         tle_text = data['text']
         with open(raw_tle_path, 'w') as f:
             f.write(tle_text)
-        preprocess_and_save_tle(raw_tle_path, OUTPUT_TLE)
-        return jsonify({'message': 'TLE text saved and processed successfully'}), 200
+        merge = ingest_catalog(raw_tle_path, mode)
+        return jsonify(dict(merge, message='TLE text merged successfully' if merge
+                            else 'TLE text saved and processed successfully')), 200
     return jsonify({'error': 'Invalid input'}), 400
 
 @app.route('/get_timestamps', methods=['GET'])
 def get_timestamps():
-    selector = TimestampSelector(tle_data_path=OUTPUT_TLE)
-    min_time = selector._get_tle_epoch_start()
-    max_time = min_time + timedelta(days=7)
+    with METRICS.stage('timestamp'):
+        selector = TimestampSelector(tle_data_path=OUTPUT_TLE)
     return jsonify({
-        'min': min_time.strftime("%Y/%m/%d %H:%M:%S"),
-        'max': max_time.strftime("%Y/%m/%d %H:%M:%S")
+        'min': selector.epoch_start.strftime("%Y/%m/%d %H:%M:%S"),
+        'max': selector.epoch_end.strftime("%Y/%m/%d %H:%M:%S")
     })
 
+@app.route('/catalog/objects', methods=['GET'])
+def catalog_objects():
+    """
+    Catalog objects answered from the catalog metadata index, in catalog order. Filters: ?epochFrom=&epochTo=
+    ("YYYY-MM-DD HH:MM:SS") &minAltitude=&maxAltitude= (km, perigee-apogee overlap) &minInclination=
+    &maxInclination= (deg); pages: ?limit=&offset=.
+    """
+    try:
+        limit = min(max(int(request.args.get('limit', settings.CATALOG_PAGE_SIZE)), 1), settings.CATALOG_MAX_PAGE_SIZE)
+        offset = max(int(request.args.get('offset', 0)), 0)
+        epochs = {name: datetime.strptime(request.args[name], "%Y-%m-%d %H:%M:%S")
+                  for name in ('epochFrom', 'epochTo') if name in request.args}
+        bounds = {name: float(request.args[name]) for name in
+                  ('minAltitude', 'maxAltitude', 'minInclination', 'maxInclination') if name in request.args}
+    except ValueError as e:
+        return jsonify({'error': f"Invalid catalog query: {str(e)}"}), 400
+    if not os.path.exists(OUTPUT_TLE):
+        return jsonify({'error': "No TLE catalog uploaded"}), 404
+    index = load_catalog_index(OUTPUT_TLE)
+    matches = index.select(epoch_from=epochs.get('epochFrom'), epoch_to=epochs.get('epochTo'),
+                           min_altitude_km=bounds.get('minAltitude'), max_altitude_km=bounds.get('maxAltitude'),
+                           min_inclination_deg=bounds.get('minInclination'),
+                           max_inclination_deg=bounds.get('maxInclination'))
+    return jsonify({'total': len(matches), 'objects': index.rows(matches[offset:offset + limit]),
+                    'limit': limit, 'offset': offset})
+
 @app.route('/get_rockets', methods=['POST'])
 def get_rockets():
     data = request.get_json()
@@ -250,83 +595,229 @@ def get_rockets():
     ]
     return jsonify(rockets)
 
+def profiled_mission(data, mode):
+    """
+    run_mission under a profiler, recomputing the mission so the profile covers the pipeline rather than a cache
+    hit. The call tree and flamegraph file are stored under PROFILE_DIR; the response gets the hottest functions
+    and their URLs.
+    """
+    profile = RequestProfile(mode, interval_s=settings.PROFILE_SAMPLE_INTERVAL_S, top=settings.PROFILE_TOP_FUNCTIONS)
+    with profile:
+        response = run_mission(data, refresh=True)
+    paths = profile.save(PROFILE_DIR)
+    print(f"Profile {profile.id} ({mode}) written to {paths['call_tree']} and {paths['flamegraph']}")
+    return dict(response, profile=dict(profile.summary(), call_tree_url=f"/profiles/{profile.id}/call_tree",
+                                       flamegraph_url=f"/profiles/{profile.id}/flamegraph"))
+
 @app.route('/process_trajectory', methods=['POST'])
 def process_trajectory():
     try:
         data = request.get_json()
-        rocket_type = data['rocketType']
-        launch_site = data['launchSite']
-        coords = data['launchSiteCoordinates']
-        target_altitude = float(data['targetAltitude'])
-        orbit_type = data['orbitType']
-        timestamp = datetime.strptime(data['timestamp'], "%Y/%m/%d %H:%M:%S")
-        lat, lon, alt = map(float, coords.strip("()").split(","))
-
-        traj_calc = TrajectoryCalculator()
-        equations, t_climb, formulas, initial, v_orbit, burn_time = traj_calc.calculate(rocket_type, target_altitude, (lat, lon, alt))
-        trajectory_data = (equations, t_climb, formulas, initial, v_orbit, burn_time)
-
-        detector = CollisionDetector(tle_txt_path=OUTPUT_TLE, threshold_km=1.0)
-        collisions = detector.detect_collisions(equations, timestamp, t_climb)
-        collisions_with_obj = [(t, pos, "Unknown Object") for t, pos in collisions] if collisions else []
-
-        optimized_trajectory_data = None
-        if collisions:
-            optimizer = DDQLOptimizer(equations, t_climb, timestamp, OUTPUT_TLE, threshold_km=1.0)
-            optimized_equations = optimizer.optimize(collisions)
-            optimized_trajectory_data = (optimized_equations, t_climb, formulas, initial, v_orbit, burn_time)
-            collisions = detector.detect_collisions(optimized_equations, timestamp, t_climb)
-            collisions_with_obj = [(t, pos, "Unknown Object") for t, pos in collisions] if collisions else []
-            final_equations = optimized_equations
-            final_t_climb = t_climb
-        else:
-            final_equations = equations
-            final_t_climb = t_climb
-
-        viz = TrajectoryVisualizer(final_equations, t_max=final_t_climb, burn_time=burn_time)
-        fig = viz.plot(title=f"Trajectory to {target_altitude} km", collisions=collisions_with_obj)
-        if fig is None:
-            raise ValueError("Visualization failed to generate figure")
-        viz_path = os.path.join(STATIC_DIR, "trajectory.html")
-        fig.write_html(viz_path)
-
-        rocket_params = {
-            'thrust_N': float(traj_calc.rocket_data[traj_calc.rocket_data['Rocket_Type'] == rocket_type]['Thrust_N'].iloc[0]),
-            'mass_kg': float(traj_calc.rocket_data[traj_calc.rocket_data['Rocket_Type'] == rocket_type]['Mass_kg'].iloc[0]),
-            'burn_time_s': float(traj_calc.rocket_data[traj_calc.rocket_data['Rocket_Type'] == rocket_type]['Burn_Time_s'].iloc[0])
-        }
-        report = MissionReport()
-        report_path = report.generate(
-            rocket_type=rocket_type,
-            launch_site=launch_site,
-            orbit_type=orbit_type,
-            altitude_km=target_altitude,
-            timestamp=timestamp,
-            trajectory_data=trajectory_data,
-            collisions=collisions_with_obj,
-            rocket_params=rocket_params,
-            optimized_trajectory_data=optimized_trajectory_data
-        )
-
-        with open(report_path, 'r') as f:
-            report_content = f.read()
-
-        return jsonify({
-            'viz_url': '/static/trajectory.html',
-            'report_content': report_content,
-            'collisions': len(collisions_with_obj),
-            'steps': [
-                "Calculated initial trajectory",
-                f"Detected {len(collisions_with_obj)} collisions",
-                "Optimized trajectory" if collisions else "No optimization needed"
-            ]
-        })
+        # 'profile': true (sampling) or a mode name profiles this request
+        profile = data.get('profile')
+        if profile:
+            mode = 'sampling' if profile is True else profile
+            if mode not in PROFILE_MODES:
+                return jsonify({'error': f"Invalid profile mode: {mode}"}), 400
+            return jsonify(profiled_mission(data, mode))
+        return jsonify(run_mission(data))
     except Exception as e:
         print(f"Error in process_trajectory: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/jobs', methods=['POST'])
+def submit_job():
+    """Queue a mission ('type': 'trajectory' or 'dummy_trajectory') and return its job id immediately."""
+    data = request.get_json() or {}
+    job_type = data.get('type', 'trajectory')
+    if job_type not in ('trajectory', 'dummy_trajectory'):
+        return jsonify({'error': f"Unknown job type: {job_type}"}), 400
+    try:
+        parse_mission_request(data)
+        screening_horizon(data)
+    except Exception as e:
+        return jsonify({'error': f"Invalid mission request: {str(e)}"}), 400
+
+    dummy = job_type == 'dummy_trajectory'
+    mission_id = dummy_mission_state(data)[0] if dummy else None
+    try:
+        job = JOB_QUEUE.submit(
+            job_type,
+            lambda job: run_mission(data, dummy=dummy, progress=job.update_progress, mission_id=mission_id),
+            params=data
+        )
+    except JobQueueFullError as e:
+        return jsonify({'error': str(e)}), 503
+    return jsonify({'job_id': job.id, 'status': job.status, 'status_url': f"/jobs/{job.id}"}), 202
+
+@app.route('/jobs', methods=['GET'])
+def list_jobs():
+    return jsonify({
+        'stats': JOB_QUEUE.stats(),
+        'cache': RESULT_CACHE.stats(),
+        'jobs': [job.to_dict(include_result=False) for job in JOB_QUEUE.list()]
+    })
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    job = JOB_QUEUE.get(job_id)
+    if job is None:
+        return jsonify({'error': f"Unknown job: {job_id}"}), 404
+    return jsonify(job.to_dict())
+
+@app.route('/jobs/<job_id>/events', methods=['GET'])
+def job_events(job_id):
+    """Server-Sent Events stream of a job's progress; ends with a 'succeeded' or 'failed' event."""
+    job = JOB_QUEUE.get(job_id)
+    if job is None:
+        return jsonify({'error': f"Unknown job: {job_id}"}), 404
+
+    def stream():
+        if job.status in ('succeeded', 'failed') and not PROGRESS_BUS.has_channel(job_id):
+            # Progress history already evicted: the job's terminal event alone
+            event = {'stage': job.status, 'percent': job.percent, 'message': job.error or job.message,
+                     'status': job.status, 'channel': job_id}
+            yield f"event: progress\ndata: {json.dumps(event)}\n\n"
+            return
+        subscriber = PROGRESS_BUS.subscribe(job_id)
+        try:
+            while True:
+                try:
+                    event = subscriber.get(timeout=settings.SSE_HEARTBEAT_S)
+                except queue.Empty:
+                    yield ": keep-alive\n\n"
+                    continue
+                if event is None:
+                    break
+                yield f"event: progress\ndata: {json.dumps(event)}\n\n"
+        finally:
+            PROGRESS_BUS.unsubscribe(job_id, subscriber)
+
+    return Response(stream_with_context(stream()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/missions/<mission_id>/trajectory', methods=['GET'])
+def trajectory_detail(mission_id):
+    """
+    Displayed trajectory of a mission at ?detail=coarse|medium|fine (see settings.TRAJECTORY_DETAIL_LEVELS),
+    optionally zoomed to the time window ?t0=&t1= (s), which is re-sampled at the requested detail.
+    """
+    state = STATE_STORE.get(mission_id)
+    if state is None or 'display_samples' not in state:
+        return jsonify({'error': f"Unknown or expired mission: {mission_id}"}), 404
+    detail = request.args.get('detail', 'medium')
+    if detail not in settings.TRAJECTORY_DETAIL_LEVELS:
+        return jsonify({'error': f"Unknown detail level: {detail}"}), 400
+    samples = state['display_samples']
+    try:
+        t_range = None
+        if 't0' in request.args or 't1' in request.args:
+            t_range = (float(request.args.get('t0', samples['t'][0])), float(request.args.get('t1', samples['t'][-1])))
+    except ValueError as e:
+        return jsonify({'error': f"Invalid time window: {str(e)}"}), 400
+
+    view = TrajectoryVisualizer.level_of_detail(samples, settings.TRAJECTORY_DETAIL_LEVELS[detail], t_range,
+                                                equations=state.get('display_equations'))
+    body = {
+        'missionId': mission_id,
+        'detail': detail,
+        'points': len(view['t']),
+        't': view['t'].round(3).tolist(),
+        'x': (view['x'] / 1000).round(3).tolist(),  # km, like the figure
+        'y': (view['y'] / 1000).round(3).tolist(),
+        'z': (view['z'] / 1000).round(3).tolist()
+    }
+    if 'phase' in view:
+        body['phase'] = view['phase'].tolist()  # Index into 'phases'
+        body['phases'] = list(TrajectoryVisualizer.PHASES)
+    return jsonify(body)
+
+@app.route('/missions/<mission_id>/payload.bin', methods=['GET'])
+def mission_payload(mission_id):
+    """Compact float32 trajectory, debris and collision arrays of a mission at ?detail= (default medium)."""
+    state = STATE_STORE.get(mission_id)
+    if state is None or 'display_samples' not in state:
+        return jsonify({'error': f"Unknown or expired mission: {mission_id}"}), 404
+    detail = request.args.get('detail', 'medium')
+    if detail not in settings.TRAJECTORY_DETAIL_LEVELS:
+        return jsonify({'error': f"Unknown detail level: {detail}"}), 400
+    # A mission's displayed trajectory never changes, so the browser may keep the payload while the mission lives
+    return binary_response(trajectory_payload(mission_id, state, detail), 'application/octet-stream',
+                           f"private, max-age={settings.STATE_STORE_TTL_S}")
+
+@app.route('/missions/<mission_id>/viewer')
+def mission_viewer(mission_id):
+    """Client-side 3D view rendered from the mission's binary payload and the shared Earth mesh."""
+    return render_template('trajectory_viewer.html', mission_id=mission_id)
+
+@app.route('/assets/<name>')
+def generated_asset_file(name):
+    if name not in GENERATED_ASSETS:
+        return jsonify({'error': f"Unknown asset: {name}"}), 404
+    body, gzipped = generated_asset(name)
+    return binary_response(body, GENERATED_ASSETS[name], f"public, max-age={settings.ASSET_MAX_AGE_S}", gzipped)
+
+@app.route('/reports', methods=['GET'])
+def list_reports():
+    """
+    Stored mission reports, newest first, without their text. Filters: ?rocket=&orbit=&from=&to= (launch time,
+    "YYYY-MM-DD HH:MM:SS") &minCollisions=&maxCollisions=; pages: ?limit=&offset=.
+    """
+    try:
+        limit = min(max(int(request.args.get('limit', settings.REPORT_PAGE_SIZE)), 1), settings.REPORT_MAX_PAGE_SIZE)
+        offset = max(int(request.args.get('offset', 0)), 0)
+        min_collisions = request.args.get('minCollisions')
+        max_collisions = request.args.get('maxCollisions')
+        launch_from = request.args.get('from')
+        launch_to = request.args.get('to')
+        for value in (launch_from, launch_to):
+            if value is not None:
+                datetime.strptime(value, "%Y-%m-%d %H:%M:%S")
+        result = REPORT_STORE.search(rocket_type=request.args.get('rocket'), orbit_type=request.args.get('orbit'),
+                                     launch_from=launch_from, launch_to=launch_to,
+                                     min_collisions=int(min_collisions) if min_collisions is not None else None,
+                                     max_collisions=int(max_collisions) if max_collisions is not None else None,
+                                     limit=limit, offset=offset)
+    except ValueError as e:
+        return jsonify({'error': f"Invalid report query: {str(e)}"}), 400
+    return jsonify(dict(result, limit=limit, offset=offset))
+
+@app.route('/reports/<int:report_id>', methods=['GET'])
+def get_report(report_id):
+    stored = REPORT_STORE.get(report_id)
+    if stored is None:
+        return jsonify({'error': f"Unknown report: {report_id}"}), 404
+    return jsonify(stored)
+
+@app.route('/profiles/<profile_id>/<artifact>')
+def profile_artifact(profile_id, artifact):
+    """Call tree (text) or flamegraph file (collapsed stacks, or a pstats dump) of a profiled request."""
+    extensions = {'call_tree': ('.txt',), 'flamegraph': ('.folded', '.pstats')}.get(artifact)
+    if extensions is None or not profile_id.isalnum():
+        return jsonify({'error': 'Unknown profile artifact'}), 404
+    for extension in extensions:
+        path = os.path.join(PROFILE_DIR, profile_id + extension)
+        if os.path.exists(path):
+            mimetype = 'application/octet-stream' if extension == '.pstats' else 'text/plain'
+            with open(path, 'rb') as f:
+                return Response(f.read(), mimetype=mimetype, headers={
+                    'Content-Disposition': f'inline; filename="{profile_id}{extension}"'})
+    return jsonify({'error': f"Unknown profile: {profile_id}"}), 404
+
+@app.route('/metrics')
+def metrics():
+    """Pipeline stage latencies, request and mission counters in the Prometheus text format."""
+    return Response(METRICS.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
 @app.route('/report')
 def report():
+    """Report page for ?id= (a stored report); ?report_content= is still accepted from older clients."""
+    report_id = request.args.get('id', type=int)
+    if report_id is not None:
+        stored = REPORT_STORE.get(report_id)
+        if stored is None:
+            return render_template('report.html', report_content=f"Unknown report: {report_id}"), 404
+        return render_template('report.html', report_content=stored['content'])
     report_content = request.args.get('report_content', '')
     return render_template('report.html', report_content=report_content)
 
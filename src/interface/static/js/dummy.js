@@ -1,5 +1,8 @@
 // dummy.js
 
+// Server-side mission id returned by /dummy_initial_trajectory; the next steps reuse its stored trajectory
+let dummyMissionId = null;
+
 // Step 1: Timestamp Selection
 function loadTimestamps() {
     const now = new Date();
@@ -152,6 +155,7 @@ document.getElementById('calculate-initial').addEventListener('click', () => {
                 .then(response => response.json())
                 .then(data => {
                     if (data.error) throw new Error(data.error);
+                    dummyMissionId = data.missionId;
                     document.getElementById('trajectory-confirm').classList.remove('hidden');
                     document.getElementById('step4').classList.remove('hidden');
                 })
@@ -191,7 +195,8 @@ document.getElementById('generate-btn').addEventListener('click', () => {
                 targetAltitude: parseFloat(document.getElementById('target-altitude').value),
                 orbitType: document.getElementById('orbit-type').value,
                 rocketType: rocket.Rocket_Type,
-                launchSiteCoordinates: rocket.Launch_Site_Coordinates
+                launchSiteCoordinates: rocket.Launch_Site_Coordinates,
+                missionId: dummyMissionId
             };
 
             fetch('/generate_dummy_tles', {
@@ -228,8 +233,8 @@ document.getElementById('generate-btn').addEventListener('click', () => {
                                     setTimeout(showNextStep, 1000);
                                 } else {
                                     document.getElementById('processing').classList.add('hidden');
-                                    window.open(data.viz_url, '_blank');
-                                    window.location.href = `/report?report_content=${encodeURIComponent(data.report_content)}`;
+                                    window.open(data.viewer_url || data.viz_url, '_blank');
+                                    window.location.href = data.report_url || `/report?report_content=${encodeURIComponent(data.report_content)}`;
                                 }
                             }
                             document.getElementById('processing').classList.remove('hidden');
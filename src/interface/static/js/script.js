@@ -39,12 +39,18 @@ document.getElementById('paste-btn').addEventListener('click', () => {
     document.getElementById('tle-instructions-popup').classList.add('hidden');
 });
 
+// "merge" updates the current catalog by NORAD id, "replace" swaps it out
+function uploadMode() {
+    return document.getElementById('merge-catalog').checked ? 'merge' : 'replace';
+}
+
 // Upload flow
 document.getElementById('preprocess-upload').addEventListener('click', () => {
     const file = document.getElementById('file-upload').files[0];
     if (!file) return alert('Please upload a TLE file first.');
     const formData = new FormData();
     formData.append('file', file);
+    formData.append('mode', uploadMode());
     fetch('/upload', { method: 'POST', body: formData })
         .then(response => response.json())
         .then(data => {
@@ -70,7 +76,7 @@ document.getElementById('preprocess-paste').addEventListener('click', () => {
     fetch('/upload', {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ text: tleText })
+        body: JSON.stringify({ text: tleText, mode: uploadMode() })
     })
         .then(response => response.json())
         .then(data => {
@@ -239,35 +245,22 @@ document.getElementById('calculate').addEventListener('click', () => {
         document.getElementById('processing').classList.remove('hidden');
         const processingStep = document.getElementById('processing-step');
 
-        fetch('/process_trajectory', {
+        fetch('/jobs', {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify(payload)
+            body: JSON.stringify({ type: 'trajectory', ...payload })
         })
-        .then(response => {
+        .then(response => response.json().then(data => {
             if (!response.ok) {
-                throw new Error(`HTTP error! Status: ${response.status}`);
+                throw new Error(data.error || `HTTP error! Status: ${response.status}`);
             }
-            return response.json();
-        })
+            return data;
+        }))
+        .then(job => watchJob(job.job_id, processingStep))
         .then(data => {
-            if (data.error) {
-                throw new Error(data.error);
-            }
-            let stepIndex = 0;
-            const steps = data.steps;
-            function showNextStep() {
-                if (stepIndex < steps.length) {
-                    processingStep.textContent = steps[stepIndex] + " 🚀";
-                    stepIndex++;
-                    setTimeout(showNextStep, 1000);
-                } else {
-                    document.getElementById('processing').classList.add('hidden');
-                    window.open(data.viz_url, '_blank');
-                    window.location.href = `/report?report_content=${encodeURIComponent(data.report_content)}`;
-                }
-            }
-            showNextStep();
+            document.getElementById('processing').classList.add('hidden');
+            window.open(data.viewer_url || data.viz_url, '_blank');
+            window.location.href = data.report_url || `/report?report_content=${encodeURIComponent(data.report_content)}`;
         })
         .catch(error => {
             document.getElementById('processing').classList.add('hidden');
@@ -275,4 +268,77 @@ document.getElementById('calculate').addEventListener('click', () => {
             console.error('Fetch error:', error);
         });
     });
-});
\ No newline at end of file
+});
+
+// Poll a background mission job until it finishes, showing its progress
+function pollJob(jobId, processingStep, intervalMs = 1000) {
+    return new Promise((resolve, reject) => {
+        function poll() {
+            fetch(`/jobs/${jobId}`)
+                .then(response => response.json())
+                .then(job => {
+                    if (job.error && !job.status) throw new Error(job.error);
+                    processingStep.textContent = `${job.progress.message || job.progress.stage} (${job.progress.percent}%) 🚀`;
+                    if (job.status === 'succeeded') {
+                        resolve(job.result);
+                    } else if (job.status === 'failed') {
+                        reject(new Error(job.error));
+                    } else {
+                        setTimeout(poll, intervalMs);
+                    }
+                })
+                .catch(reject);
+        }
+        poll();
+    });
+}
+
+const STAGE_LABELS = {
+    trajectory: 'Calculating trajectory',
+    tle_load: 'Loading TLE catalog',
+    screening: 'Screening for collisions',
+    collision_probability: 'Estimating collision probabilities',
+    optimization: 'Optimizing trajectory (DDQL)',
+    orbit_screening: 'Screening the target orbit',
+    visualization: 'Building visualization',
+    report: 'Writing mission report',
+    done: 'Mission complete'
+};
+
+// Follow a background mission job over Server-Sent Events, falling back to polling
+function watchJob(jobId, processingStep) {
+    if (!window.EventSource) return pollJob(jobId, processingStep);
+    const bar = document.getElementById('processing-bar');
+    const log = document.getElementById('processing-log');
+    let lastStage = null;
+
+    return new Promise((resolve, reject) => {
+        const source = new EventSource(`/jobs/${jobId}/events`);
+        source.addEventListener('progress', (e) => {
+            const event = JSON.parse(e.data);
+            if (event.status === 'succeeded' || event.status === 'failed') {
+                source.close();
+                fetch(`/jobs/${jobId}`)
+                    .then(response => response.json())
+                    .then(job => job.status === 'succeeded' ? resolve(job.result) : reject(new Error(job.error)))
+                    .catch(reject);
+                return;
+            }
+            const label = STAGE_LABELS[event.stage] || event.stage;
+            const percent = event.percent === null || event.percent === undefined ? null : Math.round(event.percent);
+            processingStep.textContent = `${label}${percent === null ? '' : ` (${percent}%)`} 🚀`;
+            if (bar && percent !== null) bar.value = percent;
+            if (log && event.message && (event.stage !== lastStage || event.percent === 100)) {
+                const item = document.createElement('li');
+                item.textContent = `${label}: ${event.message}`;
+                log.appendChild(item);
+            }
+            lastStage = event.stage;
+        });
+        source.onerror = () => {
+            // Stream dropped (proxy timeout, server restart): continue by polling
+            source.close();
+            pollJob(jobId, processingStep).then(resolve, reject);
+        };
+    });
+}
@@ -0,0 +1,146 @@
+// Client-side trajectory view built from compact binary payloads (format: src/utils/binary_payload.py)
+
+const PAYLOAD_TYPES = { float32: Float32Array, uint8: Uint8Array, int32: Int32Array };
+
+// Decode 'SDTB' | uint16 version | uint16 reserved | uint32 header length | JSON header | 4-byte aligned arrays
+function decodePayload(buffer) {
+    const view = new DataView(buffer);
+    const magic = String.fromCharCode(...new Uint8Array(buffer, 0, 4));
+    if (magic !== 'SDTB') throw new Error('Not a trajectory payload');
+    const version = view.getUint16(4, true);
+    if (version !== 1) throw new Error(`Unsupported payload version ${version}`);
+    const headerLength = view.getUint32(8, true);
+    const header = JSON.parse(new TextDecoder().decode(new Uint8Array(buffer, 12, headerLength)));
+    const dataStart = 12 + headerLength;
+    const arrays = {};
+    header.arrays.forEach(entry => {
+        const Type = PAYLOAD_TYPES[entry.dtype];
+        // Typed arrays are views on the received buffer (little-endian, like every browser platform)
+        arrays[entry.name] = {
+            data: new Type(buffer, dataStart + entry.offset, entry.nbytes / Type.BYTES_PER_ELEMENT),
+            shape: entry.shape
+        };
+    });
+    return { meta: header.meta, arrays };
+}
+
+function fetchPayload(url) {
+    return fetch(url)
+        .then(response => {
+            if (!response.ok) throw new Error(`HTTP error! Status: ${response.status}`);
+            return response.arrayBuffer();
+        })
+        .then(decodePayload);
+}
+
+// Column of an (n, 3) array, optionally only the rows where keep(i) is true
+function column(array, axis, keep) {
+    const values = [];
+    for (let i = 0; i < array.shape[0]; i++) {
+        if (!keep || keep(i)) values.push(array.data[i * 3 + axis]);
+    }
+    return values;
+}
+
+// Rows of an (n, m) array as nested arrays, as Plotly surfaces expect
+function rows(array) {
+    const [n, m] = array.shape;
+    return Array.from({ length: n }, (_, i) => Array.from(array.data.subarray(i * m, (i + 1) * m)));
+}
+
+function markers(name, array, color, symbol) {
+    return {
+        type: 'scatter3d', mode: 'markers', name,
+        x: column(array, 0), y: column(array, 1), z: column(array, 2),
+        marker: { size: symbol === 'x' ? 10 : 5, color, symbol }
+    };
+}
+
+// Nearby debris tracks as one line trace, with gaps between objects
+function debrisTracks(a) {
+    const x = [], y = [], z = [], text = [];
+    let start = 0;
+    a.track_lengths.data.forEach((length, k) => {
+        const label = `NORAD ${a.track_satnum.data[k]}: closest ${a.track_distance_km.data[k].toFixed(1)} km`;
+        for (let i = start; i < start + length; i++) {
+            x.push(a.track_xyz.data[i * 3]);
+            y.push(a.track_xyz.data[i * 3 + 1]);
+            z.push(a.track_xyz.data[i * 3 + 2]);
+            text.push(label);
+        }
+        x.push(null); y.push(null); z.push(null); text.push(null);
+        start += length;
+    });
+    return {
+        type: 'scatter3d', mode: 'lines', name: `Nearby Debris (${a.track_lengths.shape[0]})`,
+        x, y, z, text, hoverinfo: 'text', line: { color: 'yellow', width: 3 }
+    };
+}
+
+function buildTraces(earth, mission) {
+    const a = mission.arrays;
+    const xyz = a.trajectory_xyz;
+    const phases = mission.meta.phases;
+    const phaseOf = a.trajectory_phase
+        ? i => phases[a.trajectory_phase.data[i]]
+        : i => (a.trajectory_t.data[i] <= mission.meta.burnTime ? 'burn' : 'coast');
+    const styles = { burn: ['Burn', 'orange', 8], coast: ['Coast', 'green', 6], orbit: ['Orbit', 'magenta', 6] };
+    const last = xyz.shape[0] - 1;
+
+    const traces = [{
+        type: 'surface', x: rows(earth.arrays.x), y: rows(earth.arrays.y), z: rows(earth.arrays.z),
+        colorscale: 'Blues', opacity: 0.8, showscale: false, hoverinfo: 'skip'
+    }];
+    Object.keys(styles).forEach(phase => {
+        const keep = i => phaseOf(i) === phase;
+        const [name, color, width] = styles[phase];
+        const x = column(xyz, 0, keep);
+        if (x.length) {
+            traces.push({ type: 'scatter3d', mode: 'lines', name, x, y: column(xyz, 1, keep), z: column(xyz, 2, keep),
+                          line: { color, width } });
+        }
+    });
+    traces.push({
+        type: 'scatter3d', mode: 'markers+text', name: 'Launch', text: ['START'], textposition: 'top center',
+        x: [xyz.data[0]], y: [xyz.data[1]], z: [xyz.data[2]], marker: { size: 15, color: 'lime' }
+    });
+    traces.push({
+        type: 'scatter3d', mode: 'markers+text', name: 'Target', text: ['TARGET'], textposition: 'top center',
+        x: [xyz.data[last * 3]], y: [xyz.data[last * 3 + 1]], z: [xyz.data[last * 3 + 2]], marker: { size: 15, color: 'red' }
+    });
+    if (a.track_lengths && a.track_lengths.shape[0]) traces.push(debrisTracks(a));
+    if (a.debris_xyz.shape[0]) traces.push(markers('Conjunctions (initial)', a.debris_xyz, 'yellow', 'circle'));
+    if (a.collision_xyz.shape[0]) traces.push(markers('Collisions', a.collision_xyz, 'red', 'x'));
+    return traces;
+}
+
+const LAYOUT = {
+    paper_bgcolor: '#000', font: { color: '#eaeaea' }, height: 700, showlegend: true,
+    scene: {
+        xaxis: { title: 'X (km)' }, yaxis: { title: 'Y (km)' }, zaxis: { title: 'Z (km)' },
+        aspectmode: 'data', camera: { eye: { x: 2, y: 2, z: 1.5 } }
+    }
+};
+
+function renderMission(missionId, detail) {
+    const status = document.getElementById('viewer-status');
+    status.textContent = 'Loading trajectory...';
+    const started = performance.now();
+    // The Earth mesh is the same for every mission and cached by the browser after the first view
+    Promise.all([fetchPayload('/assets/earth_mesh.bin'), fetchPayload(`/missions/${missionId}/payload.bin?detail=${detail}`)])
+        .then(([earth, mission]) => {
+            Plotly.react('trajectory-plot', buildTraces(earth, mission), LAYOUT);
+            status.textContent = `${mission.arrays.trajectory_t.shape[0]} points, ` +
+                `${(performance.now() - started).toFixed(0)} ms`;
+        })
+        .catch(error => {
+            status.textContent = `Error loading trajectory: ${error.message}`;
+        });
+}
+
+document.addEventListener('DOMContentLoaded', () => {
+    const missionId = document.getElementById('viewer').dataset.missionId;
+    const detailSelect = document.getElementById('detail-select');
+    detailSelect.addEventListener('change', () => renderMission(missionId, detailSelect.value));
+    renderMission(missionId, detailSelect.value);
+});
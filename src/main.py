@@ -1,4 +1,6 @@
 # src/main.py
+import argparse
+import functools
 import os
 from datetime import datetime
 from src.utils.tle_preprocessor import preprocess_and_save_tle
@@ -7,18 +9,30 @@ from src.core.orbit_selector import OrbitSelector
 from src.core.rocket_selector import RocketSelector
 from src.core.trajectory_calculator import TrajectoryCalculator
 from src.core.collision_detector import CollisionDetector
+from src.core.conjunction_events import describe
 from src.core.ddql_optimizer import DDQLOptimizer
 from src.core.trajectory_visualizer import TrajectoryVisualizer
 from src.core.mission_report import MissionReport
+from src.core.batch_runner import BatchRunner, load_manifest
+from src.core.ephemeris import CatalogEphemeris
+from src.core.collision_probability import CollisionProbability
+from src.core.orbit_screening import OrbitScreening
+from src.config import settings
+from src.utils.metrics import MetricsRegistry
+from src.utils.profiling import RequestProfile, PROFILE_MODES
 
-def main():
-    base_dir = "/Users/thrishankkuntimaddi/Documents/Projects/SDARC-Enhanced"
+BASE_DIR = "/Users/thrishankkuntimaddi/Documents/Projects/SDARC-Enhanced"
+
+def main(horizon_revolutions=None, horizon_days=None):
+    base_dir = BASE_DIR
     input_tle_path = os.path.join(base_dir, "inputs", "tle_raw.txt")
     output_tle_path = os.path.join(base_dir, "data", "tle_data.txt")
+    metrics = MetricsRegistry()  # Stage timings, printed at the end
 
     print("Preprocessing TLE data...")
     try:
-        preprocess_and_save_tle(input_tle_path, output_tle_path)
+        with metrics.stage('preprocess'):
+            preprocess_and_save_tle(input_tle_path, output_tle_path)
     except Exception as e:
         print(f"Error preprocessing TLE data: {e}")
         return
@@ -27,7 +41,9 @@ def main():
 
     print("Selecting launch timestamp...")
     try:
-        timestamp = TimestampSelector(tle_data_path=input_tle_path).run()
+        with metrics.stage('timestamp'):  # Reading the catalog index, not the prompt
+            timestamp_selector = TimestampSelector(tle_data_path=input_tle_path)
+        timestamp = timestamp_selector.run()
         print(f"Selected timestamp: {timestamp}")
     except Exception as e:
         print(f"Error selecting timestamp: {e}")
@@ -60,9 +76,10 @@ def main():
     print("Calculating initial trajectory...")
     traj_calc = TrajectoryCalculator()
     try:
-        equations, t_climb, formulas, initial, orbit_vel, burn_time = traj_calc.calculate(
-            rocket_info['rocket_type'], altitude, rocket_info['coordinates']
-        )
+        with metrics.stage('trajectory'):
+            equations, t_climb, formulas, initial, orbit_vel, burn_time = traj_calc.calculate(
+                rocket_info['rocket_type'], altitude, rocket_info['coordinates']
+            )
         trajectory_data = (equations, t_climb, formulas, initial, orbit_vel, burn_time)
         print(f"Initial: {initial}")
         print(f"Formulas: {formulas}")
@@ -78,12 +95,11 @@ def main():
     print("Running collision detection...")
     try:
         detector = CollisionDetector(tle_txt_path=output_tle_path, threshold_km=1.0)
-        collisions = detector.detect_collisions(equations, timestamp, t_climb)
-        # Enhance collisions with object type (assuming detector returns (t, pos, obj_type) or just (t, pos))
-        collisions_with_obj = [(t, pos, "Unknown Object") for t, pos in collisions] if collisions else []
+        with metrics.stage('screening'):
+            collisions = detector.detect_collisions(equations, timestamp, t_climb)
         print(f"Collisions detected: {len(collisions)}")
-        for t, pos in collisions:
-            print(f" - Collision at t={t:.2f}s, debris position={pos}")
+        for event in collisions:
+            print(f" - {describe(event)}")
     except Exception as e:
         print(f"Error during collision detection: {e}")
         return
@@ -91,19 +107,20 @@ def main():
     print("\n")
 
     optimized_trajectory_data = None
-    if collisions:
+    if len(collisions):
         print("Optimizing trajectory...")
         try:
-            optimizer = DDQLOptimizer(equations, t_climb, timestamp, output_tle_path, threshold_km=1.0)
-            optimized_equations = optimizer.optimize(collisions)
+            with metrics.stage('optimization'):
+                optimizer = DDQLOptimizer(equations, t_climb, timestamp, output_tle_path, threshold_km=1.0)
+                optimized_equations = optimizer.optimize(collisions)
             print(f"Optimized trajectory equations generated.")
             # Recalculate optimized trajectory data
             opt_equations, opt_t_climb, opt_formulas, opt_initial, opt_orbit_vel, opt_burn_time = traj_calc.calculate(
                 rocket_info['rocket_type'], altitude, rocket_info['coordinates']
             )  # Simplified—use optimized_equations if calc supports it
             optimized_trajectory_data = (optimized_equations, opt_t_climb, opt_formulas, opt_initial, opt_orbit_vel, opt_burn_time)
-            collisions = detector.detect_collisions(optimized_equations, timestamp, opt_t_climb)
-            collisions_with_obj = [(t, pos, "Unknown Object") for t, pos in collisions] if collisions else []
+            with metrics.stage('screening'):
+                collisions = detector.detect_collisions(optimized_equations, timestamp, opt_t_climb)
             print(f"Post-optimization collisions: {len(collisions)}")
             equations = optimized_equations  # Use optimized for viz
         except Exception as e:
@@ -114,10 +131,27 @@ def main():
 
     print("\n")
 
+    orbit_screening = None
+    if horizon_revolutions is not None or horizon_days is not None:
+        print("Screening the target orbit after insertion...")
+        try:
+            with metrics.stage('orbit_screening'):
+                screening = OrbitScreening(step_s=settings.ORBIT_SCREENING_STEP_S,
+                                           margin_km=settings.ORBIT_SCREENING_MARGIN_KM).screen(
+                    detector, equations, t_climb, timestamp, revolutions=horizon_revolutions, days=horizon_days)
+            orbit_screening = OrbitScreening.summary(screening)
+            for event in screening['events']:
+                print(f" - {describe(event)}")
+        except Exception as e:
+            print(f"Error during orbit screening: {e}")
+            return
+        print("\n")
+
     print("Visualizing trajectory...")
     try:
-        viz = TrajectoryVisualizer(equations, t_max=t_climb, burn_time=burn_time)
-        viz.plot(title=f"Trajectory to {altitude} km", collisions=collisions_with_obj)
+        with metrics.stage('visualization'):
+            viz = TrajectoryVisualizer(equations, t_max=t_climb, burn_time=burn_time)
+            viz.plot(title=f"Trajectory to {altitude} km", collisions=collisions)
     except Exception as e:
         print(f"Error visualizing trajectory: {e}")
         return
@@ -133,25 +167,102 @@ def main():
             'mass_kg': float(rocket_data[rocket_data['Rocket_Type'] == rocket_info['rocket_type']]['Mass_kg'].iloc[0]),
             'burn_time_s': float(rocket_data[rocket_data['Rocket_Type'] == rocket_info['rocket_type']]['Burn_Time_s'].iloc[0])
         }
-        report = MissionReport()
-        report.generate(
-            rocket_type=rocket_info['rocket_type'],
-            launch_site=rocket_info['launch_site'],
-            orbit_type=orbit_type,
-            altitude_km=altitude,
-            timestamp=timestamp,
-            trajectory_data=trajectory_data,
-            collisions=collisions_with_obj,
-            rocket_params=rocket_params,
-            optimized_trajectory_data=optimized_trajectory_data
-        )
+        with metrics.stage('report'):
+            report = MissionReport()
+            report.generate(
+                rocket_type=rocket_info['rocket_type'],
+                launch_site=rocket_info['launch_site'],
+                orbit_type=orbit_type,
+                altitude_km=altitude,
+                timestamp=timestamp,
+                trajectory_data=trajectory_data,
+                collisions=collisions,
+                rocket_params=rocket_params,
+                optimized_trajectory_data=optimized_trajectory_data,
+                orbit_screening=orbit_screening
+            )
     except Exception as e:
         print(f"Error generating mission report: {e}")
         return
 
     print("\n")
 
+    print("Stage timings:")
+    for stage, (runs, total_s) in metrics.stage_summary().items():
+        print(f" - {stage}: {total_s:.2f}s ({runs} run{'s' if runs != 1 else ''})")
+
+    print("\n")
+
     print("Space Debris Avoidance and Trajectory Optimization System - simulation complete!")
 
+def run_batch(manifest_path, output_dir=None, max_workers=None, horizon_revolutions=None, horizon_days=None):
+    """Run every mission of a manifest against the current catalog and print the summary table."""
+    base_dir = BASE_DIR
+    output_tle_path = os.path.join(base_dir, "data", "tle_data.txt")
+    if output_dir is None:
+        output_dir = os.path.join(base_dir, "outputs", "batch", datetime.now().strftime("%Y%m%d_%H%M%S"))
+
+    missions = load_manifest(manifest_path)
+    print(f"Running {len(missions)} missions from {manifest_path}...")
+    runner = BatchRunner(output_tle_path, output_dir, max_workers=max_workers or settings.BATCH_MAX_WORKERS,
+                         ephemeris=CatalogEphemeris(max_entries=settings.BATCH_EPHEMERIS_ENTRIES),
+                         collision_probability=CollisionProbability(
+                             settings.PC_METHOD, threshold=settings.PC_THRESHOLD,
+                             hard_body_radius_m=settings.PC_HARD_BODY_RADIUS_M,
+                             debris_sigma_km=settings.PC_DEBRIS_SIGMA_KM, rocket_sigma_km=settings.PC_ROCKET_SIGMA_KM
+                         ) if settings.PC_METHOD else None,
+                         orbit_screening=OrbitScreening(step_s=settings.ORBIT_SCREENING_STEP_S,
+                                                        margin_km=settings.ORBIT_SCREENING_MARGIN_KM),
+                         horizon={'horizon_revolutions': horizon_revolutions, 'horizon_days': horizon_days},
+                         budget={
+                             'time_budget_s': settings.DDQL_TIME_BUDGET_S,
+                             'max_evaluations': settings.DDQL_MAX_EVALUATIONS,
+                             'patience': settings.DDQL_PATIENCE_EPISODES,
+                             'max_episodes': settings.DDQL_MAX_EPISODES,
+                             'max_steps': settings.DDQL_MAX_STEPS
+                         })
+    results = runner.run(missions)
+    summary_path = runner.write_summary(results)
+    print(runner.summary_table(results))
+    print(f"Results, figures and reports written to {output_dir} (summary: {summary_path})")
+    return results
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Space Debris Avoidance and Trajectory Optimization System")
+    parser.add_argument('--profile', choices=PROFILE_MODES,
+                        help="Profile the run and write a call tree and flamegraph file into settings.PROFILE_DIR "
+                             "(default outputs/profiles)")
+    parser.add_argument('--batch', metavar='MANIFEST',
+                        help="Run the missions of a CSV or JSON manifest (rocket, altitude, orbit type, timestamp) "
+                             "without prompts")
+    parser.add_argument('--workers', type=int, help="Missions run concurrently in batch mode")
+    parser.add_argument('--output', help="Output directory of batch mode (default outputs/batch/<time>)")
+    horizon_group = parser.add_mutually_exclusive_group()
+    horizon_group.add_argument('--horizon-revolutions', type=float, metavar='N',
+                               help="Also screen the target orbit for N revolutions after insertion")
+    horizon_group.add_argument('--horizon-days', type=float, metavar='DAYS',
+                               help="Also screen the target orbit for DAYS after insertion")
+    args = parser.parse_args()
+    if args.profile and args.batch:
+        # Profilers only see the calling thread: profiled batches run their missions in it, one at a time
+        if args.workers not in (None, 1):
+            parser.error("--profile runs batch missions one at a time; drop --workers or use --workers 1")
+        args.workers = 1
+        print("Profiling batch: missions run one at a time in the main thread")
+    horizon = {'horizon_revolutions': args.horizon_revolutions, 'horizon_days': args.horizon_days}
+    if args.horizon_revolutions is None and args.horizon_days is None:
+        horizon['horizon_revolutions'] = settings.ORBIT_SCREENING_REVOLUTIONS
+    run = functools.partial(run_batch, args.batch, args.output, args.workers, **horizon) if args.batch else \
+        functools.partial(main, **horizon)
+    if args.profile:
+        profile = RequestProfile(args.profile)
+        with profile:
+            run()
+        paths = profile.save(settings.PROFILE_DIR or os.path.join(BASE_DIR, "outputs", "profiles"))
+        print(f"Hot functions ({args.profile}, {profile.elapsed_s:.1f} s):")
+        for row in profile.hot_functions():
+            print(f" - {row['self_s']:8.3f}s self {row['total_s']:8.3f}s total  {row['function']}")
+        print(f"Call tree: {paths['call_tree']}")
+        print(f"Flamegraph: {paths['flamegraph']}")
+    else:
+        run()
\ No newline at end of file
@@ -0,0 +1,52 @@
+import json
+import struct
+import numpy as np
+
+MAGIC = b'SDTB'
+VERSION = 1
+DTYPES = {'float32': np.float32, 'uint8': np.uint8, 'int32': np.int32}
+
+
+def encode_arrays(arrays, meta=None):
+    """
+    Pack named arrays into one little-endian binary payload:
+        'SDTB' | uint16 version | uint16 reserved | uint32 header length | JSON header | array data
+    The header lists each array's name, dtype, shape, offset and byte length (offsets are relative to the end of the
+    header); every array starts on a 4-byte boundary so browsers can view it as a typed array without copying.
+    Floating-point arrays are sent as float32, integer arrays as given if their dtype is in DTYPES.
+    """
+    entries, chunks, offset = [], [], 0
+    for name, values in arrays.items():
+        values = np.asarray(values)
+        if values.dtype.kind == 'f':
+            values = values.astype('<f4')
+        elif values.dtype.name not in DTYPES:
+            raise ValueError(f"Unsupported dtype {values.dtype} for array {name!r}")
+        data = np.ascontiguousarray(values).astype(values.dtype.newbyteorder('<'), copy=False).tobytes()
+        padding = -len(data) % 4
+        entries.append({'name': name, 'dtype': values.dtype.name, 'shape': list(values.shape),
+                        'offset': offset, 'nbytes': len(data)})
+        chunks.append(data + b'\0' * padding)
+        offset += len(data) + padding
+
+    header = json.dumps({'meta': meta or {}, 'arrays': entries}, separators=(',', ':')).encode('utf-8')
+    header += b' ' * (-len(header) % 4)
+    return MAGIC + struct.pack('<HHI', VERSION, 0, len(header)) + header + b''.join(chunks)
+
+
+def decode_arrays(payload):
+    """Inverse of encode_arrays: returns (meta, {name: array})."""
+    if payload[:4] != MAGIC:
+        raise ValueError("Not a trajectory payload")
+    version, _, header_length = struct.unpack_from('<HHI', payload, 4)
+    if version != VERSION:
+        raise ValueError(f"Unsupported payload version {version}")
+    start = 12 + header_length
+    header = json.loads(payload[12:start].decode('utf-8'))
+    arrays = {}
+    for entry in header['arrays']:
+        dtype = np.dtype(DTYPES[entry['dtype']]).newbyteorder('<')
+        count = entry['nbytes'] // dtype.itemsize
+        arrays[entry['name']] = np.frombuffer(payload, dtype=dtype, count=count,
+                                              offset=start + entry['offset']).reshape(entry['shape'])
+    return header['meta'], arrays
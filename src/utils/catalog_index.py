@@ -0,0 +1,101 @@
+import os
+import numpy as np
+from src.core.constants import R, GM
+
+INDEX_FIELDS = ('satnum', 'epoch', 'mean_motion', 'inclination_deg', 'eccentricity', 'perigee_km', 'apogee_km')
+
+
+def catalog_index_path(catalog_path):
+    """Index file kept next to a cleaned catalog: data/tle_data.txt -> data/tle_data.index.npz."""
+    return os.path.splitext(catalog_path)[0] + ".index.npz"
+
+
+def catalog_stamp(catalog_path):
+    """(size, mtime_ns) of a catalog file; an index is current while the catalog's stamp is unchanged."""
+    stat = os.stat(catalog_path)
+    return np.array([stat.st_size, stat.st_mtime_ns], dtype=np.int64)
+
+
+class CatalogIndex:
+    """
+    Per-object metadata of a TLE catalog in load order (satellite number, epoch, mean motion, inclination,
+    eccentricity, perigee and apogee altitude), built once when the catalog is written so epoch-range,
+    altitude-band and inclination-band queries never touch the text file.
+    """
+
+    def __init__(self, satnum, epoch, mean_motion, inclination_deg, eccentricity, perigee_km, apogee_km, stamp=None):
+        self.satnum = satnum
+        self.epoch = epoch  # datetime64[us]
+        self.mean_motion = mean_motion  # rev/day
+        self.inclination_deg = inclination_deg
+        self.eccentricity = eccentricity
+        self.perigee_km = perigee_km  # Altitudes above the mean Earth radius (constants.R)
+        self.apogee_km = apogee_km
+        self.stamp = stamp  # catalog_stamp of the catalog the index was built for
+
+    @classmethod
+    def from_records(cls, records, stamp=None):
+        """Index of parsed TLE records (tle_preprocessor.TLE_DTYPE)."""
+        n = records['mean_motion'] * 2 * np.pi / 86400.0  # rad/s
+        with np.errstate(divide='ignore'):
+            a = np.cbrt(GM / n ** 2)  # Semi-major axis (m)
+        eccentricity = records['eccentricity'].astype(float)
+        return cls(records['satnum'].astype(np.int32), records['epoch'], records['mean_motion'].astype(float),
+                   records['inclination_deg'].astype(float), eccentricity,
+                   (a * (1 - eccentricity) - R) / 1000, (a * (1 + eccentricity) - R) / 1000, stamp=stamp)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(*(data[field] for field in INDEX_FIELDS), stamp=data['stamp'])
+
+    def save(self, path):
+        tmp_path = path + ".tmp.npz"
+        np.savez(tmp_path, stamp=self.stamp if self.stamp is not None else np.zeros(2, dtype=np.int64),
+                 **{field: getattr(self, field) for field in INDEX_FIELDS})
+        os.replace(tmp_path, path)
+
+    def is_current(self, catalog_path):
+        return self.stamp is not None and np.array_equal(self.stamp, catalog_stamp(catalog_path))
+
+    def __len__(self):
+        return len(self.satnum)
+
+    def epoch_range(self):
+        """(earliest, latest) epoch as datetimes, or None for an empty catalog."""
+        if not len(self):
+            return None
+        return self.epoch.min().astype(object), self.epoch.max().astype(object)
+
+    def select(self, epoch_from=None, epoch_to=None, min_altitude_km=None, max_altitude_km=None,
+               min_inclination_deg=None, max_inclination_deg=None):
+        """
+        Load-order indices of the objects matching every given bound (inclusive). Epoch bounds are datetimes;
+        an object is in an altitude band when its perigee-apogee range overlaps it.
+        """
+        mask = np.ones(len(self), dtype=bool)
+        if epoch_from is not None:
+            mask &= self.epoch >= np.datetime64(epoch_from, 'us')
+        if epoch_to is not None:
+            mask &= self.epoch <= np.datetime64(epoch_to, 'us')
+        if min_altitude_km is not None:
+            mask &= self.apogee_km >= min_altitude_km
+        if max_altitude_km is not None:
+            mask &= self.perigee_km <= max_altitude_km
+        if min_inclination_deg is not None:
+            mask &= self.inclination_deg >= min_inclination_deg
+        if max_inclination_deg is not None:
+            mask &= self.inclination_deg <= max_inclination_deg
+        return np.flatnonzero(mask)
+
+    def rows(self, indices):
+        """JSON-friendly metadata of the objects at the given indices."""
+        return [{
+            'satnum': int(self.satnum[i]),
+            'epoch': str(self.epoch[i].astype('datetime64[s]')),
+            'mean_motion': float(self.mean_motion[i]),
+            'inclination_deg': float(self.inclination_deg[i]),
+            'eccentricity': float(self.eccentricity[i]),
+            'perigee_km': float(self.perigee_km[i]),
+            'apogee_km': float(self.apogee_km[i])
+        } for i in indices]
@@ -1,69 +1,210 @@
-import random
 import os
-from datetime import datetime, timedelta
 import numpy as np
+from sgp4.api import Satrec
+from src.utils.orbit_utils import earth_rotation, ecef_to_teme
+from src.utils.tle_preprocessor import TLE_DTYPE, save_tle_catalog, save_tle_history
 
+R = 6371e3  # Earth radius (m)
+GM = 3.986e14  # Gravitational parameter (m^3/s^2)
+FIRST_SATNUM = 70000
+ALPHA5 = "ABCDEFGHJKLMNPQRSTUVWXYZ"  # Leading letter of satellite numbers 100000-339999 (I and O unused)
 
-def generate_dummy_tle(debris_count, output_path, timestamp, target_altitude, lat, lon, equations, t_climb):
+# Background population: (altitude km, altitude spread km, inclination deg, inclination spread deg, weight)
+BACKGROUND_SHELLS = (
+    (550.0, 10.0, 53.0, 0.2, 0.30),  # Broadband constellation shells
+    (570.0, 10.0, 70.0, 0.2, 0.05),
+    (780.0, 5.0, 86.4, 0.1, 0.03),
+    (1200.0, 10.0, 87.9, 0.1, 0.05),
+    (700.0, 100.0, 98.2, 0.5, 0.22),  # Sun-synchronous band
+    (450.0, 250.0, 51.6, 15.0, 0.15),  # General LEO debris
+    (900.0, 400.0, 75.0, 25.0, 0.12),
+    (20200.0, 50.0, 55.0, 1.0, 0.04),  # Navigation constellations
+    (35786.0, 20.0, 0.5, 2.0, 0.04),  # Geostationary belt
+)
+
+
+def _alpha5(satnums):
+    return [f"{ALPHA5[n // 10000 - 10]}{n % 10000:04d}" if n >= 100000 else f"{n:05d}" for n in satnums.tolist()]
+
+
+def _exponent_field(values):
+    """TLE implied-decimal exponent fields (' 12345-3' = 0.12345e-3), 8 characters each."""
+    mantissa = np.zeros(len(values), dtype=np.int64)
+    exponent = np.zeros(len(values), dtype=np.int64)
+    nonzero = values != 0
+    exponent[nonzero] = np.floor(np.log10(np.abs(values[nonzero]))).astype(np.int64) + 1
+    mantissa[nonzero] = np.rint(np.abs(values[nonzero]) / 10.0 ** exponent[nonzero] * 1e5).astype(np.int64)
+    carry = mantissa >= 100000  # 0.999995 rounds up to 1.00000
+    mantissa[carry] //= 10
+    exponent[carry] += 1
+    signs = np.where(values < 0, '-', ' ')
+    fields = [f"{s}{m:05d}{'-' if e < 0 else '+'}{abs(e)}" for s, m, e in zip(signs, mantissa.tolist(), exponent.tolist())]
+    return fields, np.where(values < 0, -1, 1) * mantissa * 1e-5 * 10.0 ** exponent
+
+
+def _with_checksums(lines):
+    """Append the modulo-10 checksum to 68-character lines."""
+    chars = np.frombuffer("".join(lines).encode('ascii'), dtype=np.uint8).reshape(len(lines), 68)
+    digits = np.where((chars >= ord('0')) & (chars <= ord('9')), chars - ord('0'), 0).sum(axis=1)
+    checksums = (digits + (chars == ord('-')).sum(axis=1)) % 10
+    return [line + str(c) for line, c in zip(lines, checksums.tolist())]
+
+
+def build_tle_records(satnums, epochs, inclination_deg, raan_deg, eccentricity, arg_perigee_deg, mean_anomaly_deg,
+                      mean_motion, bstar=None):
+    """
+    Catalog records (TLE_DTYPE) and their TLE lines from element arrays, rounded to TLE precision so the
+    records equal what parsing the lines gives. epochs: datetime64 array; angles in degrees; mean_motion rev/day.
+    """
+    count = len(satnums)
+    bstar = np.zeros(count) if bstar is None else np.asarray(bstar, dtype=float)
+    records = np.zeros(count, dtype=TLE_DTYPE)
+    records['satnum'] = satnums
+    records['classification'] = b'U'
+    records['intl_designator'] = b'24001A  '
+
+    epochs = np.asarray(epochs).astype('datetime64[us]')
+    years = epochs.astype('datetime64[Y]')
+    records['epoch_year'] = years.astype(np.int64) + 1970
+    days = (epochs - years.astype('datetime64[us]')).astype(np.int64) / 86400e6 + 1
+    records['epoch_day'] = np.round(days, 8)
+    records['epoch'] = years.astype('datetime64[us]') + \
+        np.rint((records['epoch_day'] - 1) * 86400e6).astype('timedelta64[us]')
+    bstar_fields, records['bstar'] = _exponent_field(bstar)
+    records['element_number'] = 999
+    records['inclination_deg'] = np.round(inclination_deg, 4)
+    for name, values in (('raan_deg', raan_deg), ('arg_perigee_deg', arg_perigee_deg),
+                         ('mean_anomaly_deg', mean_anomaly_deg)):
+        records[name] = np.round(np.mod(values, 360.0), 4) % 360.0
+    records['eccentricity'] = np.rint(np.clip(eccentricity, 0.0, 0.9999999) * 1e7) / 1e7
+    records['mean_motion'] = np.round(mean_motion, 8)
+    records['rev_number'] = 1
+
+    ids = _alpha5(records['satnum'])
+    line1 = [f"1 {i}U 24001A   {y % 100:02d}{d:012.8f}  .00000000  00000-0 {b} 0  999"
+             for i, y, d, b in zip(ids, records['epoch_year'].tolist(), records['epoch_day'].tolist(), bstar_fields)]
+    line2 = [f"2 {i} {inc:8.4f} {raan:8.4f} {round(e * 1e7):07d} {argp:8.4f} {ma:8.4f} {n:11.8f}    1"
+             for i, inc, raan, e, argp, ma, n in zip(
+                 ids, *(records[name].tolist() for name in ('inclination_deg', 'raan_deg', 'eccentricity',
+                                                            'arg_perigee_deg', 'mean_anomaly_deg', 'mean_motion')))]
+    records['line1'] = _with_checksums(line1)
+    records['line2'] = _with_checksums(line2)
+    return records
+
+
+def _circular_orbits_through(targets, inclination_deg, descending):
+    """RAAN, argument of latitude (deg) and mean motion (rev/day) of circular orbits passing through targets (m)."""
+    radius = np.linalg.norm(targets, axis=1)
+    unit = targets / radius[:, None]
+    inc = np.radians(inclination_deg)
+    u = np.arcsin(np.clip(unit[:, 2] / np.sin(inc), -1.0, 1.0))
+    u = np.where(descending, np.pi - u, u)
+    raan = np.arctan2(unit[:, 1], unit[:, 0]) - np.arctan2(np.cos(inc) * np.sin(u), np.cos(u))
+    mean_motion = np.sqrt(GM / radius ** 3) * 86400 / (2 * np.pi)
+    return np.degrees(raan), np.degrees(u), mean_motion
+
+
+def _orbits_through_points(satnums, epochs, targets, rng, iterations=3):
+    """
+    Records of objects on circular orbits that SGP4 places at the target positions (m) at their epochs.
+    The elements are refined a few times against SGP4 at epoch, which differs from the mean orbit by up to a few
+    km; the result stays within tens of meters (TLE text precision).
+    """
+    latitude = np.degrees(np.arcsin(targets[:, 2] / np.linalg.norm(targets, axis=1)))
+    # Any inclination between |latitude| and 180 - |latitude| reaches the point
+    inclination = np.abs(latitude) + (180 - 2 * np.abs(latitude)) * rng.uniform(0.05, 0.95, len(targets))
+    descending = rng.random(len(targets)) < 0.5
+    aim = targets.copy()
+    for _ in range(iterations):
+        raan, u, mean_motion = _circular_orbits_through(aim, inclination, descending)
+        records = build_tle_records(satnums, epochs, inclination, raan, np.zeros(len(targets)), np.zeros(len(targets)),
+                                    u, mean_motion, bstar=np.full(len(targets), 1e-4))
+        reached = np.array([Satrec.twoline2rv(l1.decode(), l2.decode()).sgp4_tsince(0.0)[1]
+                            for l1, l2 in zip(records['line1'], records['line2'])]) * 1000
+        aim -= reached - targets
+    return records
+
+
+def _background_orbits(satnums, epoch, rng):
+    """Records of objects drawn from BACKGROUND_SHELLS with random phases."""
+    count = len(satnums)
+    weights = np.array([shell[4] for shell in BACKGROUND_SHELLS])
+    shells = np.array(BACKGROUND_SHELLS)[rng.choice(len(BACKGROUND_SHELLS), size=count, p=weights / weights.sum())]
+    altitude_km = np.maximum(shells[:, 0] + shells[:, 1] * rng.standard_normal(count), 160.0)
+    inclination = np.clip(shells[:, 2] + shells[:, 3] * rng.standard_normal(count), 0.0, 180.0)
+    eccentricity = np.minimum(rng.exponential(0.001, count), 0.05)
+    semi_major_m = (R + altitude_km * 1000) / (1 - eccentricity)  # Perigee at altitude_km
+    mean_motion = np.sqrt(GM / semi_major_m ** 3) * 86400 / (2 * np.pi)
+    leo = altitude_km < 2000
+    bstar = np.where(leo, rng.uniform(1e-5, 5e-4, count), 0.0)
+    return build_tle_records(satnums, np.full(count, np.datetime64(epoch, 'us')), inclination,
+                             rng.uniform(0, 360, count), eccentricity, rng.uniform(0, 360, count),
+                             rng.uniform(0, 360, count), mean_motion, bstar=bstar)
+
+
+def _trajectory_positions(equations, t_values, sampled=None):
+    """Rocket positions (m) at t_values, from a SampledTrajectory when given."""
+    if sampled is not None:
+        return sampled.positions_at(t_values)
+    return np.array([[equations[axis](t) for axis in ('x', 'y', 'z')] for t in t_values], dtype=float).reshape(-1, 3)
+
+
+def generate_scenario(output_path, timestamp, equations, t_climb, threats=3, near_misses=0, background=0,
+                      near_miss_km=(2.0, 20.0), seed=None, sampled=None, screening_step_s=None, records_path=None):
+    """
+    Write a synthetic debris catalog for a launch: threats on the trajectory (at its position at a random time
+    in the middle of the climb), near misses offset from it by near_miss_km, and a background population of
+    realistic orbit shells. With screening_step_s, threat and near-miss times fall on the screening time grid
+    so the detector sees each at its closest point. Elements are computed as arrays; the catalog is written as cleaned TLE text with
+    its metadata index (save_tle_catalog), and the parsed records also to records_path (.npy) when given.
+    The same seed gives the same catalog. Returns a summary dict.
+    """
+    rng = np.random.default_rng(seed)
+    satnums = FIRST_SATNUM + np.arange(threats + near_misses + background)
+    if len(satnums) and satnums[-1] > 339999:
+        raise ValueError("Too many objects for 5-character satellite numbers")
+
+    close = threats + near_misses
+    t_close = np.sort(rng.uniform(t_climb * 0.2, t_climb * 0.8, close))
+    if screening_step_s:
+        t_close = np.round(t_close / screening_step_s) * screening_step_s
+    targets = _trajectory_positions(equations, t_close, sampled)
+    offsets = rng.standard_normal((close, 3))
+    offsets /= np.linalg.norm(offsets, axis=1)[:, None]
+    # Threats and near misses interleaved in time
+    miss_km = rng.permutation(np.concatenate((np.zeros(threats), rng.uniform(*near_miss_km, near_misses))))
+    targets = targets + offsets * miss_km[:, None] * 1000
+    targets = ecef_to_teme(targets, earth_rotation(timestamp, t_close))  # Trajectory is Earth-fixed, SGP4 is TEME
+    epochs = np.datetime64(timestamp, 'us') + np.rint(t_close * 1e6).astype('timedelta64[us]')
+
+    parts = []
+    if close:
+        parts.append(_orbits_through_points(satnums[:close], epochs, targets, rng))
+    if background:
+        parts.append(_background_orbits(satnums[close:], timestamp, rng))
+    records = np.concatenate(parts) if parts else np.zeros(0, dtype=TLE_DTYPE)
+
+    save_tle_catalog(records, output_path)
+    save_tle_history(records, output_path)  # Single epoch per object: drops any history of a previous catalog
+    if records_path:
+        os.makedirs(os.path.dirname(records_path) or '.', exist_ok=True)
+        np.save(records_path, records)
+    return {
+        'objects': len(records),
+        'threats': threats,
+        'near_misses': near_misses,
+        'background': background,
+        'threat_times': t_close[miss_km == 0].tolist(),
+        'seed': seed
+    }
+
+
+def generate_dummy_tle(debris_count, output_path, timestamp, target_altitude, lat, lon, equations, t_climb,
+                       near_misses=0, background=0, seed=None, sampled=None, screening_step_s=None):
     """
-    Generate TLEs that collide with the trajectory at specific points and times.
+    Generate TLEs that collide with the trajectory at specific points and times (see generate_scenario).
     """
-    line1_template = "1 {satnum:05d}U 25A   {epoch} {mean_motion_dot:12.8f} {mean_motion_ddot:12.8f} {bstar:8.6e} 0 {elem_num:4d}"
-    line2_template = "2 {satnum:05d} {inc:8.4f} {raan:8.4f} {ecc:7.7f} {argp:8.4f} {ma:8.4f} {n:11.8f} {rev_num:5d}"
-
-    R = 6371e3  # Earth radius (m)
-    GM = 3.986e14  # Gravitational parameter (m^3/s^2)
-
-    tles = []
-    collision_times = [100, 200, 300] + [random.uniform(t_climb * 0.2, t_climb * 0.8) for _ in
-                                         range(debris_count - 3)]  # Fixed + random
-
-    for i in range(min(debris_count, len(collision_times))):
-        satnum = 70000 + i
-        t_collision = collision_times[i]
-
-        # Position at collision time
-        x = equations['x'](t_collision)
-        y = equations['y'](t_collision)
-        z = equations['z'](t_collision)
-        r = np.sqrt(x ** 2 + y ** 2 + z ** 2)
-
-        # Orbital elements
-        a = r  # Circular orbit at that radius
-        n = np.sqrt(GM / a ** 3) * 86400 / (2 * np.pi)  # Mean motion (revs/day)
-        inc = np.degrees(np.arccos(z / r))
-        inc = min(max(inc, 0.1), 179.9)
-        raan = np.degrees(np.arctan2(y, x)) % 360
-
-        ecc = 0.0001  # Near-circular
-        argp = 0.0  # Perigee irrelevant
-        ma = 0.0  # At position when epoch hits
-
-        # Epoch = timestamp + t_collision
-        collision_time = timestamp + timedelta(seconds=t_collision)
-        year = str(collision_time.year)[-2:]
-        day_of_year = collision_time.timetuple().tm_yday
-        fraction = (collision_time.hour * 3600 + collision_time.minute * 60 + collision_time.second) / 86400
-        epoch = f"{year}{day_of_year:03d}.{fraction:08f}"
-
-        # TLE params
-        bstar = 0.0001  # Minimal drag
-        mean_motion_dot = 0.0
-        mean_motion_ddot = 0.0
-        elem_num = i + 1
-        rev_num = 1
-
-        line1 = line1_template.format(
-            satnum=satnum, epoch=epoch, mean_motion_dot=mean_motion_dot,
-            mean_motion_ddot=mean_motion_ddot, bstar=bstar, elem_num=elem_num
-        )
-        line2 = line2_template.format(
-            satnum=satnum, inc=inc, raan=raan, ecc=ecc, argp=argp, ma=ma, n=n, rev_num=rev_num
-        )
-        tles.append(line1)
-        tles.append(line2)
-
-    with open(output_path, 'w') as f:
-        f.write("\n".join(tles))
-
-    return f"Generated {debris_count} dummy TLEs positioned on trajectory"
\ No newline at end of file
+    generate_scenario(output_path, timestamp, equations, t_climb, threats=debris_count, near_misses=near_misses,
+                      background=background, seed=seed, sampled=sampled, screening_step_s=screening_step_s)
+    extra = f", {near_misses} near misses and {background} background objects" if near_misses or background else ""
+    return f"Generated {debris_count} dummy TLEs positioned on trajectory{extra}"
@@ -0,0 +1,127 @@
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+
+class JobQueueFullError(RuntimeError):
+    """Raised when a job is submitted while the pending queue is at capacity."""
+
+
+class Job:
+    """Status, progress and result of one background job."""
+
+    def __init__(self, kind, params=None, progress_bus=None):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.params = params or {}
+        self.status = 'queued'
+        self.stage = 'queued'
+        self.percent = 0
+        self.message = ''
+        self.result = None
+        self.error = None
+        self.created_at = datetime.now()
+        self.started_at = None
+        self.finished_at = None
+        self._progress_bus = progress_bus
+
+    def update_progress(self, stage, percent=None, message='', **fields):
+        """Record the latest stage and forward the event (with any extra fields) to the progress bus."""
+        self.stage = stage
+        if percent is not None:
+            self.percent = percent
+        self.message = message
+        if self._progress_bus is not None:
+            self._progress_bus.publish(self.id, dict(fields, stage=stage, percent=percent, message=message))
+
+    def to_dict(self, include_result=True):
+        data = {
+            'job_id': self.id,
+            'kind': self.kind,
+            'status': self.status,
+            'progress': {'stage': self.stage, 'percent': self.percent, 'message': self.message},
+            'created_at': self.created_at.strftime("%Y-%m-%d %H:%M:%S"),
+            'started_at': self.started_at.strftime("%Y-%m-%d %H:%M:%S") if self.started_at else None,
+            'finished_at': self.finished_at.strftime("%Y-%m-%d %H:%M:%S") if self.finished_at else None,
+            'error': self.error
+        }
+        if include_result:
+            data['result'] = self.result
+        return data
+
+
+class JobQueue:
+    """
+    Bounded background worker pool.
+    At most max_workers jobs run concurrently and at most max_pending wait for a worker;
+    finished jobs are kept (oldest evicted first) up to max_finished for status polling.
+    When a ProgressBus is given, job progress is published on a channel named by the job id.
+    """
+
+    def __init__(self, max_workers=2, max_pending=16, max_finished=200, progress_bus=None):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.max_finished = max_finished
+        self.progress_bus = progress_bus
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="mission-job")
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, kind, func, params=None):
+        """
+        Queue func(job) on the worker pool and return the Job immediately.
+        func reports progress through job.update_progress and returns a JSON-serializable result.
+        """
+        with self._lock:
+            pending = sum(1 for job in self._jobs.values() if job.status == 'queued')
+            if pending >= self.max_pending:
+                raise JobQueueFullError(f"Job queue is full ({pending} pending, limit {self.max_pending})")
+            job = Job(kind, params, progress_bus=self.progress_bus)
+            self._jobs[job.id] = job
+            self._evict_finished()
+        self._executor.submit(self._run, job, func)
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list(self):
+        with self._lock:
+            return list(self._jobs.values())
+
+    def stats(self):
+        with self._lock:
+            counts = {'queued': 0, 'running': 0, 'succeeded': 0, 'failed': 0}
+            for job in self._jobs.values():
+                counts[job.status] += 1
+        counts['max_workers'] = self.max_workers
+        counts['max_pending'] = self.max_pending
+        return counts
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+    def _run(self, job, func):
+        job.status = 'running'
+        job.started_at = datetime.now()
+        try:
+            job.result = func(job)
+            job.status = 'succeeded'
+        except Exception as e:
+            print(f"Job {job.id} ({job.kind}) failed: {e}")
+            job.error = str(e)
+            job.status = 'failed'
+        finally:
+            job.finished_at = datetime.now()
+            if self.progress_bus is not None:
+                self.progress_bus.publish(job.id, {'stage': job.status, 'percent': job.percent,
+                                                   'message': job.error or job.message, 'status': job.status})
+                self.progress_bus.close(job.id)
+
+    def _evict_finished(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.status in ('succeeded', 'failed')]
+        for job_id in finished[:max(0, len(finished) - self.max_finished)]:
+            del self._jobs[job_id]
@@ -0,0 +1,164 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+# Latency histogram bucket upper bounds (s), from cache hits and HTTP handlers up to full optimization runs
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for value in labels.values())
+    return '{' + ','.join(f'{name}="{value}"' for name, value in zip(labels, escaped)) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    """Monotonic count per label combination."""
+
+    kind = 'counter'
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1.0, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self):
+        """(sample name, labels dict, value) of every label combination."""
+        with self._lock:
+            values = list(self._values.items())
+        return [(self.name, dict(zip(self.labelnames, key)), value) for key, value in values]
+
+
+class Histogram:
+    """Cumulative bucket counts, sum and count of observations per label combination."""
+
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._values = {}  # labels -> [per-bucket counts (last one is +Inf), sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][index] += 1
+            state[1] += value
+
+    def samples(self):
+        with self._lock:
+            values = [(key, list(counts), total) for key, (counts, total) in self._values.items()]
+        samples = []
+        for key, counts, total in values:
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                samples.append((f"{self.name}_bucket", dict(labels, le=_format_value(bound)), cumulative))
+            samples.append((f"{self.name}_sum", labels, total))
+            samples.append((f"{self.name}_count", labels, cumulative))
+        return samples
+
+    def totals(self):
+        """labels tuple -> (count, sum) of the observations."""
+        with self._lock:
+            return {key: (sum(counts), total) for key, (counts, total) in self._values.items()}
+
+
+class MetricsRegistry:
+    """
+    Counters and latency histograms of the mission pipeline, rendered in the Prometheus text exposition format.
+    Recording is a lock and a bucket bisect per observation, so instrumentation can stay on under load. Values
+    owned by other components (cache and job queue statistics) are read at scrape time by registered collectors.
+    """
+
+    def __init__(self, prefix='sdarc'):
+        self.prefix = prefix
+        self._metrics = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+        self.stage_duration = self.histogram('stage_duration_seconds', "Wall-clock time of pipeline stages",
+                                             ('stage',))
+        self.stage_runs = self.counter('stage_runs_total', "Pipeline stage runs by outcome", ('stage', 'outcome'))
+
+    def counter(self, name, help_text, labelnames=()):
+        return self._register(Counter(f"{self.prefix}_{name}", help_text, labelnames))
+
+    def histogram(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(f"{self.prefix}_{name}", help_text, labelnames, buckets))
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+                    raise ValueError(f"Metric {metric.name} is already registered with a different type or labels")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def register_collector(self, collect):
+        """
+        Add a callable returning (name, kind, help, [(labels dict, value), ...]) tuples, evaluated on every
+        render; name is prefixed like registered metrics and kind is 'counter' or 'gauge'.
+        """
+        self._collectors.append(collect)
+
+    @contextmanager
+    def stage(self, name):
+        """Time the block as one run of a pipeline stage; runs that raise are counted with outcome=error."""
+        start = time.perf_counter()
+        outcome = 'error'
+        try:
+            yield
+            outcome = 'ok'
+        finally:
+            self.stage_duration.observe(time.perf_counter() - start, stage=name)
+            self.stage_runs.inc(stage=name, outcome=outcome)
+
+    def stage_summary(self):
+        """stage -> (runs, total seconds) recorded so far."""
+        return {key[0]: totals for key, totals in self.stage_duration.totals().items()}
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        families = [(metric.name, metric.kind, metric.help_text, metric.samples()) for metric in metrics]
+        for collect in list(self._collectors):
+            try:
+                for name, kind, help_text, values in collect():
+                    name = f"{self.prefix}_{name}"
+                    families.append((name, kind, help_text, [(name, labels, value) for labels, value in values]))
+            except Exception as e:
+                print(f"Metrics collector failed: {e}")
+
+        lines = []
+        for name, kind, help_text, samples in families:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.extend(f"{sample}{_format_labels(labels)} {_format_value(value)}"
+                         for sample, labels, value in samples)
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,53 @@
+from functools import lru_cache
+import numpy as np
+from sgp4.api import jday
+
+
+def launch_jday(launch_timestamp):
+    """(Julian day, day fraction) of a launch timestamp, whole seconds as the detector propagates from."""
+    return jday(launch_timestamp.year, launch_timestamp.month, launch_timestamp.day,
+                launch_timestamp.hour, launch_timestamp.minute, launch_timestamp.second)
+
+
+def gmst(jd, fr):
+    """Greenwich mean sidereal time (rad, IAU 1982 as used with TEME) at Julian dates jd + fr (UTC ~ UT1)."""
+    centuries = (np.asarray(jd) - 2451545.0 + np.asarray(fr)) / 36525.0
+    seconds = 67310.54841 + (876600.0 * 3600.0 + 8640184.812866) * centuries + \
+        0.093104 * centuries ** 2 - 6.2e-6 * centuries ** 3
+    return np.mod(np.radians(seconds / 240.0), 2 * np.pi)
+
+
+@lru_cache(maxsize=64)
+def _rotation_table(jd, fr, t_bytes):
+    angle = gmst(jd, fr + np.frombuffer(t_bytes) / 86400.0)
+    table = np.stack((np.cos(angle), np.sin(angle)), axis=1)
+    table.flags.writeable = False
+    return table
+
+
+def earth_rotation(launch_timestamp, t_values):
+    """
+    (cos, sin) of GMST at t_values seconds after launch, shape (len(t_values), 2). Tables are cached per launch
+    time and time grid, so repeated screenings of the same grid only look them up.
+    """
+    jd, fr = launch_jday(launch_timestamp)
+    return _rotation_table(jd, fr, np.ascontiguousarray(t_values, dtype=float).tobytes())
+
+
+def teme_to_ecef(positions, rotation):
+    """
+    Earth-fixed positions of TEME positions (..., len(rotation), 3), the second-to-last axis along the time grid
+    of rotation (earth_rotation). A rotation about z by GMST; polar motion (~10 m) is neglected.
+    """
+    cos, sin = rotation[:, 0], rotation[:, 1]
+    x, y = positions[..., 0], positions[..., 1]
+    converted = np.empty_like(positions)
+    converted[..., 0] = cos * x + sin * y
+    converted[..., 1] = cos * y - sin * x
+    converted[..., 2] = positions[..., 2]
+    return converted
+
+
+def ecef_to_teme(positions, rotation):
+    """Inverse of teme_to_ecef."""
+    return teme_to_ecef(positions, rotation * np.array([1.0, -1.0]))
@@ -0,0 +1,174 @@
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+
+PROFILE_MODES = ('sampling', 'deterministic')
+
+
+def _frame_name(code):
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """
+    Sampling profiler of one thread: a background thread records the thread's Python stack every interval_s.
+    Overhead does not depend on how many calls the profiled code makes, so it suits long pipeline stages.
+    """
+
+    def __init__(self, interval_s=0.005, thread_id=None):
+        self.interval_s = interval_s
+        self.thread_id = thread_id if thread_id is not None else threading.get_ident()
+        self.stacks = Counter()  # (outermost, ..., innermost frame name) -> samples
+        self.samples = 0
+        self.elapsed_s = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+        self._start = None
+
+    def start(self):
+        self._start = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self.elapsed_s = time.perf_counter() - self._start
+
+    def _run(self):
+        while not self._stop.wait(self.interval_s):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(_frame_name(frame.f_code))
+                frame = frame.f_back
+            self.stacks[tuple(reversed(stack))] += 1
+            self.samples += 1
+
+    def collapsed(self):
+        """Stacks in the collapsed ("folded") format read by flamegraph.pl, speedscope and inferno."""
+        return "".join(f"{';'.join(stack)} {count}\n" for stack, count in self.stacks.most_common())
+
+    def hot_functions(self, limit=15):
+        """Functions by samples on top of the stack (self) and anywhere in it (total)."""
+        own, total = Counter(), Counter()
+        for stack, count in self.stacks.items():
+            own[stack[-1]] += count
+            for name in set(stack):
+                total[name] += count
+        seconds = self.elapsed_s / self.samples if self.samples else 0.0
+        return [{
+            'function': name,
+            'self_samples': own[name],
+            'total_samples': total[name],
+            'self_s': own[name] * seconds,
+            'total_s': total[name] * seconds
+        } for name, _ in sorted(total.items(), key=lambda item: (-own[item[0]], -item[1]))[:limit]]
+
+    def call_tree(self, min_fraction=0.01):
+        """Indented call tree of sampled total time, pruned below min_fraction of all samples."""
+        tree = {}
+        for stack, count in self.stacks.items():
+            node = tree
+            for name in stack:
+                entry = node.setdefault(name, [0, {}])
+                entry[0] += count
+                node = entry[1]
+
+        lines = [f"{self.samples} samples every {self.interval_s * 1000:.1f} ms over {self.elapsed_s:.2f} s"]
+
+        def walk(node, depth):
+            for name, (count, children) in sorted(node.items(), key=lambda item: -item[1][0]):
+                if count < min_fraction * self.samples:
+                    continue
+                lines.append(f"{'  ' * depth}{100 * count / self.samples:5.1f}% {name}")
+                walk(children, depth + 1)
+
+        walk(tree, 0)
+        return "\n".join(lines) + "\n"
+
+
+class RequestProfile:
+    """
+    Profile of one request or CLI run, by sampling (StackSampler) or deterministically (cProfile). Used as a
+    context manager around the work; save() writes a call-tree summary and a flamegraph-compatible file
+    (collapsed stacks when sampling, a pstats dump for snakeviz or flameprof otherwise).
+    """
+
+    def __init__(self, mode='sampling', interval_s=0.005, top=15):
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown profiling mode: {mode} (expected one of {', '.join(PROFILE_MODES)})")
+        self.id = uuid.uuid4().hex
+        self.mode = mode
+        self.top = top
+        self.elapsed_s = 0.0
+        self._sampler = StackSampler(interval_s) if mode == 'sampling' else None
+        self._profiler = cProfile.Profile() if mode == 'deterministic' else None
+        self._start = None
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        if self._sampler is not None:
+            self._sampler.start()
+        else:
+            self._profiler.enable()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._sampler is not None:
+            self._sampler.stop()
+        else:
+            self._profiler.disable()
+        self.elapsed_s = time.perf_counter() - self._start
+        return False
+
+    def hot_functions(self):
+        if self._sampler is not None:
+            return self._sampler.hot_functions(self.top)
+        stats = pstats.Stats(self._profiler)
+        rows = sorted(stats.stats.items(), key=lambda item: -item[1][2])[:self.top]  # By internal time
+        return [{
+            'function': f"{name} ({os.path.basename(filename)}:{line})",
+            'calls': calls,
+            'self_s': internal_s,
+            'total_s': cumulative_s
+        } for (filename, line, name), (_, calls, internal_s, cumulative_s, _) in rows]
+
+    def call_tree(self):
+        if self._sampler is not None:
+            return self._sampler.call_tree()
+        out = io.StringIO()
+        stats = pstats.Stats(self._profiler, stream=out).strip_dirs().sort_stats('cumulative')
+        stats.print_stats(self.top * 2)
+        stats.print_callees(self.top)
+        return out.getvalue()
+
+    def save(self, directory):
+        """Write the call tree and flamegraph file into directory; returns {artifact name: path}."""
+        os.makedirs(directory, exist_ok=True)
+        paths = {'call_tree': os.path.join(directory, f"{self.id}.txt")}
+        with open(paths['call_tree'], 'w') as f:
+            f.write(self.call_tree())
+        if self._sampler is not None:
+            paths['flamegraph'] = os.path.join(directory, f"{self.id}.folded")
+            with open(paths['flamegraph'], 'w') as f:
+                f.write(self._sampler.collapsed())
+        else:
+            paths['flamegraph'] = os.path.join(directory, f"{self.id}.pstats")
+            self._profiler.dump_stats(paths['flamegraph'])
+        return paths
+
+    def summary(self):
+        """Response metadata: mode, elapsed time and the hottest functions."""
+        summary = {'id': self.id, 'mode': self.mode, 'elapsed_s': self.elapsed_s, 'hot_functions': self.hot_functions()}
+        if self._sampler is not None:
+            summary['samples'] = self._sampler.samples
+        return summary
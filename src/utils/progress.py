@@ -0,0 +1,75 @@
+import queue
+import threading
+import time
+from collections import OrderedDict, deque
+
+
+class ProgressBus:
+    """
+    Thread-safe publish/subscribe of progress events keyed by channel (e.g. a job id).
+    Each channel keeps its most recent events so late subscribers can replay them;
+    up to max_channels closed channels are kept (oldest evicted first), open ones until they close.
+    """
+
+    def __init__(self, history_size=100, max_channels=200):
+        self.history_size = history_size
+        self.max_channels = max_channels
+        self._channels = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _channel(self, channel):
+        state = self._channels.get(channel)
+        if state is None:
+            state = {'history': deque(maxlen=self.history_size), 'subscribers': [], 'closed': False}
+            self._channels[channel] = state
+            self._evict()
+        return state
+
+    def publish(self, channel, event):
+        """Stamp and deliver an event dict to every subscriber of the channel."""
+        event = dict(event, channel=channel, time=time.time())
+        with self._lock:
+            state = self._channel(channel)
+            state['history'].append(event)
+            subscribers = list(state['subscribers'])
+        for subscriber in subscribers:
+            subscriber.put(event)
+
+    def close(self, channel):
+        """Mark the channel finished; subscribers receive None after the last event."""
+        with self._lock:
+            state = self._channel(channel)
+            state['closed'] = True
+            subscribers = list(state['subscribers'])
+        for subscriber in subscribers:
+            subscriber.put(None)
+
+    def subscribe(self, channel):
+        """Return a queue pre-filled with the channel's history (terminated by None if already closed)."""
+        subscriber = queue.Queue()
+        with self._lock:
+            state = self._channel(channel)
+            for event in state['history']:
+                subscriber.put(event)
+            if state['closed']:
+                subscriber.put(None)
+            else:
+                state['subscribers'].append(subscriber)
+        return subscriber
+
+    def has_channel(self, channel):
+        with self._lock:
+            return channel in self._channels
+
+    def unsubscribe(self, channel, subscriber):
+        with self._lock:
+            state = self._channels.get(channel)
+            if state and subscriber in state['subscribers']:
+                state['subscribers'].remove(subscriber)
+
+    def _evict(self):
+        closed = [name for name, state in self._channels.items() if state['closed']]
+        idle = [name for name in closed if not self._channels[name]['subscribers']]
+        for name in idle[:max(0, len(closed) - self.max_channels)]:
+            del self._channels[name]
+
@@ -0,0 +1,124 @@
+import hashlib
+import re
+import sqlite3
+import threading
+import zlib
+from datetime import datetime
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS report_contents (
+    hash TEXT PRIMARY KEY,
+    body BLOB NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS reports (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at TEXT NOT NULL,
+    rocket_type TEXT NOT NULL,
+    launch_site TEXT,
+    orbit_type TEXT NOT NULL,
+    altitude_km REAL,
+    launch_timestamp TEXT NOT NULL,
+    collisions INTEGER NOT NULL,
+    optimized INTEGER NOT NULL DEFAULT 0,
+    content_hash TEXT NOT NULL REFERENCES report_contents(hash)
+);
+CREATE INDEX IF NOT EXISTS idx_reports_rocket ON reports(rocket_type);
+CREATE INDEX IF NOT EXISTS idx_reports_orbit ON reports(orbit_type);
+CREATE INDEX IF NOT EXISTS idx_reports_launch ON reports(launch_timestamp);
+CREATE INDEX IF NOT EXISTS idx_reports_collisions ON reports(collisions);
+"""
+
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+GENERATED_ON = re.compile(r"^Mission Generated On: (.*)\n", re.MULTILINE)
+COLUMNS = ('id', 'created_at', 'rocket_type', 'launch_site', 'orbit_type', 'altitude_km', 'launch_timestamp',
+           'collisions', 'optimized', 'content_hash')
+
+
+class ReportStore:
+    """
+    Mission reports in an embedded SQLite database.
+    Each report is a row indexed by rocket, orbit, launch timestamp and collision count; its text is stored once
+    per SHA-256 (zlib-compressed) no matter how many reports share it. The "Mission Generated On" line lives in
+    the row (created_at), not in the shared text, so re-running a mission does not store its text again.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._local = threading.local()  # One connection per thread (Flask request threads, job workers)
+        self._connection().executescript(SCHEMA)
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.db_path)
+            connection.row_factory = sqlite3.Row
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def add(self, content, rocket_type, launch_site, orbit_type, altitude_km, launch_timestamp, collisions,
+            optimized=False):
+        """Store a report's text and metadata; returns the new report id."""
+        match = GENERATED_ON.search(content)
+        created_at = match.group(1) if match else datetime.now().strftime(TIME_FORMAT)
+        body = GENERATED_ON.sub("", content, count=1)
+        digest = hashlib.sha256(body.encode('utf-8')).hexdigest()
+        if isinstance(launch_timestamp, datetime):
+            launch_timestamp = launch_timestamp.strftime(TIME_FORMAT)
+
+        connection = self._connection()
+        with connection:
+            connection.execute("INSERT OR IGNORE INTO report_contents (hash, body, size) VALUES (?, ?, ?)",
+                               (digest, zlib.compress(body.encode('utf-8')), len(body)))
+            cursor = connection.execute(
+                "INSERT INTO reports (created_at, rocket_type, launch_site, orbit_type, altitude_km, launch_timestamp, "
+                "collisions, optimized, content_hash) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (created_at, rocket_type, launch_site, orbit_type, altitude_km, launch_timestamp, int(collisions),
+                 int(bool(optimized)), digest))
+        return cursor.lastrowid
+
+    def get(self, report_id):
+        """Report metadata plus its full text ('content'), or None."""
+        row = self._connection().execute(
+            "SELECT reports.*, report_contents.body FROM reports "
+            "JOIN report_contents ON report_contents.hash = reports.content_hash WHERE reports.id = ?",
+            (report_id,)).fetchone()
+        if row is None:
+            return None
+        report = {column: row[column] for column in COLUMNS}
+        body = zlib.decompress(row['body']).decode('utf-8')
+        title, _, rest = body.partition("\n")
+        report['content'] = f"{title}\nMission Generated On: {report['created_at']}\n{rest}"
+        return report
+
+    def search(self, rocket_type=None, orbit_type=None, launch_from=None, launch_to=None, min_collisions=None,
+               max_collisions=None, limit=50, offset=0):
+        """
+        Metadata of matching reports, newest first: {'total': matches, 'reports': [...]}.
+        launch_from / launch_to bound the launch timestamp (datetime or "YYYY-MM-DD HH:MM:SS", inclusive).
+        """
+        clauses, params = [], []
+        for column, operator, value in (('rocket_type', '=', rocket_type), ('orbit_type', '=', orbit_type),
+                                        ('launch_timestamp', '>=', launch_from), ('launch_timestamp', '<=', launch_to),
+                                        ('collisions', '>=', min_collisions), ('collisions', '<=', max_collisions)):
+            if value is None:
+                continue
+            if isinstance(value, datetime):
+                value = value.strftime(TIME_FORMAT)
+            clauses.append(f"{column} {operator} ?")
+            params.append(value)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        connection = self._connection()
+        total = connection.execute(f"SELECT COUNT(*) FROM reports {where}", params).fetchone()[0]
+        rows = connection.execute(f"SELECT {', '.join(COLUMNS)} FROM reports {where} ORDER BY id DESC LIMIT ? OFFSET ?",
+                                  params + [int(limit), int(offset)]).fetchall()
+        return {'total': total, 'reports': [dict(row) for row in rows]}
+
+    def stats(self):
+        connection = self._connection()
+        reports = connection.execute("SELECT COUNT(*) FROM reports").fetchone()[0]
+        contents, size = connection.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM report_contents").fetchone()
+        return {'reports': reports, 'unique_contents': contents, 'content_bytes': size}
@@ -0,0 +1,170 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+_fingerprints = {}
+_fingerprints_lock = threading.Lock()
+
+
+def catalog_fingerprint(path):
+    """
+    SHA-256 of a catalog file's content.
+    Memoized on (path, mtime, size) so repeated requests against an unchanged catalog skip rehashing.
+    """
+    stat = os.stat(path)
+    memo_key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+    with _fingerprints_lock:
+        digest = _fingerprints.get(memo_key)
+    if digest is not None:
+        return digest
+
+    sha = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            sha.update(chunk)
+    digest = sha.hexdigest()
+    with _fingerprints_lock:
+        for stale in [key for key in _fingerprints if key[0] == memo_key[0]]:
+            del _fingerprints[stale]
+        _fingerprints[memo_key] = digest
+    return digest
+
+
+class _InFlight:
+    """A computation other callers with the same key can wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class MissionResultCache:
+    """
+    Content-addressed cache of mission results with single-flight deduplication.
+    Entries expire after ttl_s seconds and the least recently used entry is evicted beyond max_entries.
+    Concurrent requests for a key that is being computed wait for that computation instead of repeating it.
+    """
+
+    def __init__(self, max_entries=64, ttl_s=3600, on_evict=None):
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self.on_evict = on_evict  # Optional callable(key, result), e.g. to delete files the result refers to
+        self._entries = OrderedDict()  # key -> (stored_at, result)
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    @staticmethod
+    def make_key(**inputs):
+        """Stable hash of all mission inputs (values must be JSON-serializable or str()-able)."""
+        payload = json.dumps(inputs, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get_or_compute(self, key, compute):
+        """
+        Return (result, status) where status is 'hit', 'miss' (computed here) or 'coalesced'
+        (waited for an identical in-flight computation). Failed computations are not cached.
+        """
+        with self._lock:
+            result = self._lookup(key)
+            if result is not None:
+                self.hits += 1
+                return result, 'hit'
+            inflight = self._inflight.get(key)
+            leader = inflight is None
+            if leader:
+                inflight = _InFlight()
+                self._inflight[key] = inflight
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            inflight.done.wait()
+            if inflight.error is not None:
+                raise inflight.error
+            return inflight.result, 'coalesced'
+
+        try:
+            inflight.result = compute()
+        except Exception as e:
+            inflight.error = e
+            raise
+        else:
+            self._store(key, inflight.result)
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            inflight.done.set()
+        return inflight.result, 'miss'
+
+    def invalidate(self, key=None):
+        """Drop one entry, or every entry when key is None."""
+        with self._lock:
+            keys = [key] if key is not None else list(self._entries)
+            evicted = [(k, self._entries.pop(k)[1]) for k in keys if k in self._entries]
+        self._notify(evicted)
+
+    def rekey(self, old_key, new_key):
+        """
+        Move a live entry to a new key, keeping its age (e.g. when an input changed in a way that cannot affect
+        the result). Returns False when old_key has no live entry.
+        """
+        with self._lock:
+            if self._lookup(old_key) is None:
+                return False
+            self._entries[new_key] = self._entries.pop(old_key)
+            return True
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'in_flight': len(self._inflight),
+                'hits': self.hits,
+                'misses': self.misses,
+                'coalesced': self.coalesced,
+                'max_entries': self.max_entries,
+                'ttl_s': self.ttl_s
+            }
+
+    def _lookup(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        stored_at, result = entry
+        if self.ttl_s is not None and time.time() - stored_at > self.ttl_s:
+            return None  # Expired entries are removed by the next _store
+        self._entries.move_to_end(key)
+        return result
+
+    def _store(self, key, result):
+        now = time.time()
+        with self._lock:
+            self._entries[key] = (now, result)
+            self._entries.move_to_end(key)
+            evicted = []
+            if self.ttl_s is not None:
+                for k, (stored_at, value) in list(self._entries.items()):
+                    if now - stored_at > self.ttl_s:
+                        evicted.append((k, value))
+                        del self._entries[k]
+            while len(self._entries) > self.max_entries:
+                k, (_, value) = self._entries.popitem(last=False)
+                evicted.append((k, value))
+        self._notify(evicted)
+
+    def _notify(self, evicted):
+        if self.on_evict is None:
+            return
+        for key, result in evicted:
+            try:
+                self.on_evict(key, result)
+            except Exception as e:
+                print(f"Cache eviction hook failed for {key[:12]}: {e}")
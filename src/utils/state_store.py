@@ -0,0 +1,138 @@
+import os
+import pickle
+import threading
+import time
+import uuid
+
+
+class MissionStateStore:
+    """
+    Server-side mission state (compiled trajectory, sampled arrays, screening results) keyed by mission id.
+    Entries live in process memory for ttl_s seconds since they were last read or updated. With disk_dir set, every
+    picklable field is also written to <disk_dir>/<mission_id>.pkl so state survives restarts and is shared
+    between worker processes; fields that cannot be pickled (trajectory closures) stay in memory only and
+    must be rebuilt by the caller when an entry is loaded from disk.
+    """
+
+    def __init__(self, ttl_s=1800, disk_dir=None):
+        self.ttl_s = ttl_s
+        self.disk_dir = disk_dir
+        self._entries = {}  # mission_id -> (last accessed, state)
+        self._lock = threading.Lock()
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    def create(self, **state):
+        mission_id = uuid.uuid4().hex
+        self._put(mission_id, dict(state))
+        return mission_id
+
+    def restore(self, mission_id, **state):
+        """Store state under a known id, e.g. one an expired entry had and a cached response still refers to."""
+        self._put(mission_id, dict(state))
+
+    def get(self, mission_id):
+        """Return the mission's state dict, or None if unknown or expired."""
+        if not mission_id:
+            return None
+        self._sweep()
+        with self._lock:
+            entry = self._entries.get(mission_id)
+            if entry is not None:
+                self._entries[mission_id] = (time.time(), entry[1])  # Expiry counts from the last access
+        if entry is not None:
+            self._touch(mission_id)
+            return entry[1]
+        state = self._load(mission_id)
+        if state is not None:
+            with self._lock:
+                self._entries[mission_id] = (time.time(), state)
+            self._touch(mission_id)
+        return state
+
+    def update(self, mission_id, **fields):
+        state = self.get(mission_id)
+        if state is None:
+            raise KeyError(f"Unknown or expired mission: {mission_id}")
+        state.update(fields)
+        self._put(mission_id, state)
+        return state
+
+    def delete(self, mission_id):
+        with self._lock:
+            self._entries.pop(mission_id, None)
+        path = self._path(mission_id)
+        if path and os.path.exists(path):
+            os.remove(path)
+
+    def items(self):
+        """(mission_id, state) pairs of the live in-memory entries (entries only on disk are not loaded)."""
+        self._sweep()
+        with self._lock:
+            return [(mission_id, state) for mission_id, (_, state) in self._entries.items()]
+
+    def __len__(self):
+        self._sweep()
+        with self._lock:
+            return len(self._entries)
+
+    def _put(self, mission_id, state):
+        now = time.time()
+        with self._lock:
+            self._entries[mission_id] = (now, state)
+        if self.disk_dir:
+            persistable = {}
+            for key, value in state.items():
+                try:
+                    pickle.dumps(value)
+                except Exception:
+                    continue  # e.g. compiled trajectory equations (closures)
+                persistable[key] = value
+            tmp_path = self._path(mission_id) + ".tmp"
+            with open(tmp_path, 'wb') as f:
+                pickle.dump({'updated_at': now, 'state': persistable}, f)
+            os.replace(tmp_path, self._path(mission_id))
+
+    def _load(self, mission_id):
+        path = self._path(mission_id)
+        if not path or not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'rb') as f:
+                record = pickle.load(f)
+        except Exception as e:
+            print(f"Discarding unreadable mission state {mission_id}: {e}")
+            os.remove(path)
+            return None
+        # The file's modification time is its last access (see _touch), possibly by another process
+        last_access = max(record['updated_at'], os.path.getmtime(path))
+        if self.ttl_s is not None and time.time() - last_access > self.ttl_s:
+            os.remove(path)
+            return None
+        return record['state']
+
+    def _touch(self, mission_id):
+        path = self._path(mission_id)
+        if path and os.path.exists(path):
+            try:
+                os.utime(path)
+            except OSError:
+                pass  # Removed meanwhile
+
+    def _path(self, mission_id):
+        if not self.disk_dir or not all(c in '0123456789abcdef' for c in mission_id):
+            return None
+        return os.path.join(self.disk_dir, f"{mission_id}.pkl")
+
+    def _sweep(self):
+        if self.ttl_s is None:
+            return
+        cutoff = time.time() - self.ttl_s
+        with self._lock:
+            expired = [mission_id for mission_id, (updated_at, _) in self._entries.items() if updated_at < cutoff]
+            for mission_id in expired:
+                del self._entries[mission_id]
+        for mission_id in expired:
+            path = self._path(mission_id)
+            if path and os.path.exists(path):
+                os.remove(path)
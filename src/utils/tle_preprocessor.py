@@ -1,56 +1,537 @@
-import re
 import os
-from typing import List, Tuple, Generator
+import threading
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple, Union
+import numpy as np
+from src.utils.catalog_index import CatalogIndex, catalog_index_path, catalog_stamp
 
+TLE_LINE_LENGTH = 69
+BLOCK_BYTES = 1 << 22  # Input read per block (4 MiB, about 28k element sets)
+HISTORY_MAX_EPOCHS = 8  # Element sets kept per object in a catalog's history file
 
-def clean_and_validate_tle_lines(lines: List[str]) -> Generator[Tuple[str, str], None, None]:
+# One parsed element set per row; line1 / line2 keep the original text for SGP4 (Satrec.twoline2rv)
+TLE_DTYPE = np.dtype([
+    ('satnum', 'i4'),
+    ('name', 'U24'),
+    ('classification', 'S1'),
+    ('intl_designator', 'S8'),
+    ('epoch', 'datetime64[us]'),
+    ('epoch_year', 'i2'),
+    ('epoch_day', 'f8'),
+    ('ndot', 'f8'),  # First derivative of mean motion / 2 (rev/day^2)
+    ('nddot', 'f8'),  # Second derivative of mean motion / 6 (rev/day^3)
+    ('bstar', 'f8'),
+    ('element_number', 'i2'),
+    ('inclination_deg', 'f8'),
+    ('raan_deg', 'f8'),
+    ('eccentricity', 'f8'),
+    ('arg_perigee_deg', 'f8'),
+    ('mean_anomaly_deg', 'f8'),
+    ('mean_motion', 'f8'),  # rev/day
+    ('rev_number', 'i4'),
+    ('line1', 'S69'),
+    ('line2', 'S69'),
+])
+
+# Fixed-width numeric fields: (name, start column, decimal point column or None, end column), 0-based, end
+# exclusive. Implied-decimal fields ('±MMMMM±E') are split into mantissa and exponent, each with its sign column.
+LINE1_FIELDS = (
+    ('satnum', 3, None, 7),  # Column 2 holds the leading digit or alpha-5 letter
+    ('epoch_year', 18, None, 20),
+    ('epoch_day', 20, 23, 32),
+    ('ndot', 33, 34, 43),
+    ('nddot_mantissa', 44, None, 50),
+    ('nddot_exponent', 50, None, 52),
+    ('bstar_mantissa', 53, None, 59),
+    ('bstar_exponent', 59, None, 61),
+    ('element_number', 64, None, 68),
+)
+LINE2_FIELDS = (
+    ('inclination_deg', 8, 11, 16),
+    ('raan_deg', 17, 20, 25),
+    ('eccentricity', 26, None, 33),  # Implied leading decimal point
+    ('arg_perigee_deg', 34, 37, 42),
+    ('mean_anomaly_deg', 43, 46, 51),
+    ('mean_motion', 52, 54, 63),
+    ('rev_number', 63, None, 68),
+)
+
+# Lookup tables indexed by ASCII code
+_DIGIT = np.zeros(256, dtype=np.float64)
+_DIGIT[ord('0'):ord('9') + 1] = np.arange(10)
+_NUMERIC, _POINT = 1, 2
+_CLASS = np.zeros(256, dtype=np.uint8)
+_CLASS[ord('0'):ord('9') + 1] = _NUMERIC
+_CLASS[[ord(' '), ord('-'), ord('+')]] = _NUMERIC
+_CLASS[ord('.')] = _POINT
+_SPACE = np.zeros(256, dtype=bool)
+_SPACE[[ord(' '), ord('\t'), ord('\r'), ord('\n'), ord('\f'), ord('\v')]] = True
+# Alpha-5 satellite numbers: a leading letter stands for 10..33 (I and O are not used)
+_ALPHA5 = _DIGIT.astype(np.int32)
+for _value, _letter in enumerate("ABCDEFGHJKLMNPQRSTUVWXYZ", start=10):
+    _ALPHA5[ord(_letter)] = _value
+
+
+def _field_tables(fields):
     """
-    Clean TLE text lines and yield valid Line 1 and Line 2 pairs.
-    Args:
-        lines: List of raw TLE text lines.
-    Yields:
-        Tuple[str, str]: (Line 1, Line 2) pairs.
-    """
-    lines = [line.strip() for line in lines if line.strip() and not line.startswith('#')]
-    i = 0
-    while i < len(lines) - 1:
-        line1, line2 = lines[i], lines[i + 1]
-        if (re.match(r'^1 ', line1) and re.match(r'^2 ', line2) and
-                len(line1) == 69 and len(line2) == 69):
-            yield line1, line2
+    Per-line tables for reading every field at once: place-value weights (69, fields + 1) so that digit values
+    @ weights gives each field's digits as one integer (the last column sums the 68 digits covered by the
+    checksum), and the character class each column must have for that fast path (0 where anything goes).
+    """
+    weights = np.zeros((TLE_LINE_LENGTH, len(fields) + 1))
+    weights[:68, -1] = 1
+    layout = np.zeros(TLE_LINE_LENGTH, dtype=np.uint8)
+    for k, (_, start, point, end) in enumerate(fields):
+        columns = [column for column in range(start, end) if column != point]
+        weights[columns, k] = 10.0 ** np.arange(len(columns) - 1, -1, -1)
+        layout[columns] = _NUMERIC
+        if point is not None:
+            layout[point] = _POINT
+    return weights, layout
+
+
+_LINE1_TABLES = _field_tables(LINE1_FIELDS)
+_LINE2_TABLES = _field_tables(LINE2_FIELDS)
+
+_BLANK, _NAME, _LINE1, _LINE2, _MALFORMED = 0, 1, 2, 3, 4
+
+
+def tle_checksum(line: str) -> int:
+    """Mod-10 checksum of a TLE line: sum of its first 68 digits, with each '-' counting as 1."""
+    return sum(int(c) if c.isdigit() else c == '-' for c in line[:68]) % 10
+
+
+def _strip_bounds(buf: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Move each line's [start, end) bounds past leading and trailing whitespace (usually zero or one step)."""
+    starts, ends = starts.copy(), ends.copy()
+    active = np.flatnonzero(starts < ends)
+    while len(active):
+        active = active[_SPACE[buf[starts[active]]] & (starts[active] < ends[active])]
+        starts[active] += 1
+    active = np.flatnonzero(starts < ends)
+    while len(active):
+        active = active[_SPACE[buf[ends[active] - 1]] & (starts[active] < ends[active])]
+        ends[active] -= 1
+    return starts, ends
+
+
+def _rows(buf: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    """(n, 69) ASCII code matrix of the element lines starting at starts."""
+    return buf[starts[:, None] + np.arange(TLE_LINE_LENGTH)]
+
+
+def _split_block(block: bytes, first_number: int, final: bool, skipped: Optional[List[Tuple[int, str]]]):
+    """
+    Element sets of a block of whole lines: (line numbers of line 1, names, line 1 rows, line 2 rows, consumed),
+    where consumed is the number of bytes used; unless final, a trailing name or line 1 is left for the next block.
+    """
+    buf = np.frombuffer(block, dtype=np.uint8)
+    ends = np.flatnonzero(buf == 10)
+    line_starts = np.insert(ends[:-1] + 1, 0, 0)
+    starts, stops = _strip_bounds(buf, line_starts, ends)
+    lengths = stops - starts
+    # A blank last line starts at the block's final '\n': clip so its (unused) second character stays in bounds
+    first, second = buf[starts], buf[np.minimum(starts + 1, len(buf) - 1)]
+
+    kinds = np.full(len(starts), _NAME, dtype=np.int8)
+    element = ((first == ord('1')) | (first == ord('2'))) & (second == ord(' '))
+    kinds[element] = _MALFORMED
+    complete = element & (lengths == TLE_LINE_LENGTH)
+    kinds[complete & (first == ord('1'))] = _LINE1
+    kinds[complete & (first == ord('2'))] = _LINE2
+    kinds[(lengths <= 0) | (first == ord('#'))] = _BLANK
+    numbers = first_number + np.arange(len(starts))
+
+    keep = np.flatnonzero(kinds != _BLANK)
+    cut = len(keep)
+    if not final and cut:
+        # A trailing name or line 1 may belong to a set continuing in the next block
+        if kinds[keep[-1]] == _NAME:
+            cut -= 1
+        elif kinds[keep[-1]] == _LINE1:
+            cut -= 2 if cut >= 2 and kinds[keep[-2]] == _NAME else 1
+    consumed = int(line_starts[keep[cut]]) if cut < len(keep) else len(block)
+    keep = keep[:cut]
+    kinds, starts, stops, numbers = kinds[keep], starts[keep], stops[keep], numbers[keep]
+
+    next_kinds = np.append(kinds[1:], _BLANK)
+    previous_kinds = np.insert(kinds[:-1], 0, _BLANK)
+    pairs = np.flatnonzero((kinds == _LINE1) & (next_kinds == _LINE2))
+    rows1, rows2 = _rows(buf, starts[pairs]), _rows(buf, starts[pairs + 1])
+    matched = (rows1[:, 2:7] == rows2[:, 2:7]).all(axis=1)
+
+    if skipped is not None:
+        for i in np.flatnonzero((kinds == _LINE1) & (next_kinds != _LINE2)):
+            skipped.append((int(numbers[i]), "line 1 without line 2"))
+        for i in np.flatnonzero((kinds == _LINE2) & (previous_kinds != _LINE1)):
+            skipped.append((int(numbers[i]), "line 2 without line 1"))
+        for i in np.flatnonzero(kinds == _MALFORMED):
+            skipped.append((int(numbers[i]), f"element line of length {lengths[keep[i]]} (expected {TLE_LINE_LENGTH})"))
+        for k in np.flatnonzero(~matched):
+            skipped.append((int(numbers[pairs[k] + 1]), f"satellite number {rows2[k, 2:7].tobytes().decode()} does "
+                                                        f"not match line 1 ({rows1[k, 2:7].tobytes().decode()})"))
+
+    pairs, rows1, rows2 = pairs[matched], rows1[matched], rows2[matched]
+    names = [None] * len(pairs)
+    named = np.flatnonzero(previous_kinds[pairs] == _NAME)
+    for k, start, stop in zip(named.tolist(), starts[pairs[named] - 1].tolist(), stops[pairs[named] - 1].tolist()):
+        name = block[start:stop].decode('utf-8', 'replace')
+        names[k] = name[2:].strip() if name.startswith('0 ') else name
+    return numbers[pairs], names, rows1, rows2, consumed
+
+
+def iter_tle_blocks(source: Union[BinaryIO, bytes], block_bytes: int = BLOCK_BYTES,
+                    skipped: Optional[List[Tuple[int, str]]] = None
+                    ) -> Iterator[Tuple[np.ndarray, List[Optional[str]], np.ndarray, np.ndarray]]:
+    """
+    Stream element sets from TLE text in 2-line or 3-line (name) format, read block_bytes at a time from a
+    binary file object (or given as bytes), so a catalog is never loaded whole. Yields per block
+    (line numbers of line 1, names or None, (n, 69) line 1 codes, (n, 69) line 2 codes).
+    Lines are split and classified with array operations. A stray or malformed line only drops the element set
+    it belongs to: the next line 1 followed by a line 2 of the same satellite starts a new set. Problems are
+    appended to skipped as (line number, reason). Checksums are verified by parse_tle_records.
+    """
+    if isinstance(source, (bytes, bytearray)):
+        data, source = bytes(source), None
+    carry, first_number = b'', 1
+    while True:
+        data = source.read(block_bytes) if source is not None else data
+        final = source is None or len(data) == 0
+        buffer = carry + data
+        end = len(buffer) if final else buffer.rfind(b'\n') + 1
+        block = buffer[:end]
+        if final and block and not block.endswith(b'\n'):
+            block += b'\n'
+        if block:
+            numbers, names, rows1, rows2, consumed = _split_block(block, first_number, final, skipped)
+            first_number += block.count(b'\n', 0, consumed)
+            if len(numbers):
+                yield numbers, names, rows1, rows2
         else:
-            print(f"Warning: Skipping invalid pair at index {i}: {line1[:20]}... {line2[:20]}...")
-        i += 2
-    if i < len(lines):
-        print(f"Warning: Incomplete pair at end: {lines[i][:20]}...")
+            consumed = 0
+        if final:
+            return
+        carry = buffer[consumed:]
 
 
-def preprocess_and_save_tle(input_txt_path: str, output_txt_path: str):
+def _read_fields(chars: np.ndarray, fields, tables) -> Tuple[Dict[str, np.ndarray], np.ndarray]:
+    """
+    Numeric fields of an (n, 69) ASCII code matrix as {name: values} and the mask of rows whose checksum matches
+    and whose fields parsed. Each field's digits are read as one integer (exact in float64) and divided by a power
+    of ten, which is what float() returns; a field is negative when its first column holds '-'. Rows laid out
+    differently fall back to float().
+    """
+    weights, layout = tables
+    digits = _DIGIT[chars]
+    integers = digits @ weights
+    minus_count = np.count_nonzero(chars[:, :68] == ord('-'), axis=1)
+    valid = (integers[:, -1] + minus_count) % 10 == digits[:, 68]
+
+    values = {}
+    for k, (name, start, point, end) in enumerate(fields):
+        scale = 10.0 ** (end - point - 1) if point is not None else 1.0
+        values[name] = np.where(chars[:, start] == ord('-'), -integers[:, k], integers[:, k]) / scale
+
+    classes = _CLASS[chars]
+    for i in np.flatnonzero(((classes != layout) & (layout != 0)).any(axis=1)):
+        for name, start, point, end in fields:
+            text = chars[i, start:end].tobytes()
+            try:
+                values[name][i] = float(text) if point is not None or text.strip() else 0.0
+            except ValueError:
+                valid[i] = False
+    return values, valid
+
+
+def _parse_block(names: List[Optional[str]], chars1: np.ndarray, chars2: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Structured array of a block of element sets and the boolean mask of sets that passed the checks."""
+    fields1, valid1 = _read_fields(chars1, LINE1_FIELDS, _LINE1_TABLES)
+    fields2, valid2 = _read_fields(chars2, LINE2_FIELDS, _LINE2_TABLES)
+
+    records = np.zeros(len(chars1), dtype=TLE_DTYPE)
+    records['satnum'] = _ALPHA5[chars1[:, 2]] * 10000 + fields1['satnum']
+    records['name'] = [name or '' for name in names]
+    records['classification'] = chars1[:, 7].view('S1')
+    records['intl_designator'] = np.ascontiguousarray(chars1[:, 9:17]).view('S8').ravel()
+    year = fields1['epoch_year']
+    records['epoch_year'] = np.where(year < 57, 2000 + year, 1900 + year)
+    records['epoch_day'] = fields1['epoch_day']
+    records['ndot'] = fields1['ndot']
+    records['nddot'] = fields1['nddot_mantissa'] * 1e-5 * 10.0 ** fields1['nddot_exponent']
+    records['bstar'] = fields1['bstar_mantissa'] * 1e-5 * 10.0 ** fields1['bstar_exponent']
+    records['element_number'] = fields1['element_number']
+    for name, _, _, _ in LINE2_FIELDS:
+        records[name] = fields2[name]
+    records['eccentricity'] = fields2['eccentricity'] / 1e7
+    records['line1'] = np.ascontiguousarray(chars1).view('S69').ravel()
+    records['line2'] = np.ascontiguousarray(chars2).view('S69').ravel()
+
+    years = (records['epoch_year'] - 1970).astype('datetime64[Y]')
+    offsets = np.rint((records['epoch_day'] - 1) * 86400e6).astype('timedelta64[us]')
+    records['epoch'] = years.astype('datetime64[us]') + offsets
+    return records, valid1 & valid2
+
+
+def parse_tle_records(source: Union[BinaryIO, bytes], block_bytes: int = BLOCK_BYTES
+                      ) -> Tuple[np.ndarray, List[Tuple[int, str]]]:
+    """
+    Parse TLE text (a binary file object or bytes) into a TLE_DTYPE structured array.
+    Input is read block_bytes at a time and each block's fixed-width fields are converted column-wise.
+    Returns (records in input order, skipped) where skipped lists (line number, reason) of dropped input,
+    including element sets whose mod-10 checksum does not match.
+    """
+    skipped = []
+    blocks = []
+    for numbers, names, chars1, chars2 in iter_tle_blocks(source, block_bytes, skipped):
+        records, valid = _parse_block(names, chars1, chars2)
+        for i in np.flatnonzero(~valid):
+            satnum = chars1[i, 2:7].tobytes().decode('ascii', 'replace').strip()
+            skipped.append((int(numbers[i]), f"checksum or field error in element set {satnum}"))
+        blocks.append(records[valid])
+    skipped.sort()
+    records = np.concatenate(blocks) if blocks else np.zeros(0, dtype=TLE_DTYPE)
+    return records, skipped
+
+
+def load_tle_catalog(path: str, max_warnings: int = 10) -> np.ndarray:
+    """Parse a TLE file into a TLE_DTYPE structured array, printing a summary of skipped input."""
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"TLE file not found at {path}")
+    with open(path, 'rb') as f:
+        records, skipped = parse_tle_records(f)
+    for line_number, reason in skipped[:max_warnings]:
+        print(f"Warning: Skipping TLE input at line {line_number}: {reason}")
+    if len(skipped) > max_warnings:
+        print(f"Warning: {len(skipped) - max_warnings} more TLE problems not shown")
+    return records
+
+
+def catalog_history_path(catalog_txt_path: str) -> str:
+    """Multi-epoch history kept next to a cleaned catalog: data/tle_data.txt -> data/tle_data.history.txt."""
+    return os.path.splitext(catalog_txt_path)[0] + ".history.txt"
+
+
+def _write_tle_pairs(records: np.ndarray, output_txt_path: str):
+    """Write element sets as a 2-line TLE file, replacing the file atomically so readers never see a partial one."""
+    os.makedirs(os.path.dirname(output_txt_path), exist_ok=True)
+    pairs = np.empty(2 * len(records), dtype='S69')
+    pairs[0::2], pairs[1::2] = records['line1'], records['line2']
+    tmp_path = output_txt_path + ".tmp"
+    with open(tmp_path, 'wb') as outfile:
+        outfile.write(b"".join(line + b"\n" for line in pairs.tolist()))
+    os.replace(tmp_path, output_txt_path)
+
+
+def newest_element_sets(records: np.ndarray) -> np.ndarray:
+    """The newest element set of each satellite (the later one in the input on equal epochs), in input order."""
+    if len(records) == 0:
+        return records
+    order = np.lexsort((np.arange(len(records)), records['epoch'], records['satnum']))
+    satnums = records['satnum'][order]
+    return records[np.sort(order[np.append(satnums[1:] != satnums[:-1], True)])]
+
+
+def element_history(records: np.ndarray, max_epochs: int = HISTORY_MAX_EPOCHS) -> np.ndarray:
+    """
+    Element sets sorted by satellite number, then epoch: one per satellite and epoch (the later one in the
+    input wins) and at most the newest max_epochs per satellite.
+    """
+    if len(records) == 0:
+        return records
+    order = np.lexsort((np.arange(len(records)), records['epoch'], records['satnum']))
+    ordered = records[order]
+    satnums, epochs = ordered['satnum'], ordered['epoch']
+    ordered = ordered[np.append((satnums[1:] != satnums[:-1]) | (epochs[1:] != epochs[:-1]), True)]
+
+    satnums = ordered['satnum']
+    ends = np.flatnonzero(np.append(satnums[1:] != satnums[:-1], True))
+    group = np.cumsum(np.insert(satnums[1:] != satnums[:-1], 0, True)) - 1
+    return ordered[ends[group] - np.arange(len(ordered)) < max_epochs]
+
+
+def save_tle_history(records: np.ndarray, catalog_txt_path: str, max_epochs: int = HISTORY_MAX_EPOCHS) -> np.ndarray:
+    """
+    Write the multi-epoch history of a catalog (see element_history) next to it and return it. When it would
+    only repeat the catalog (max_epochs below 2, or a single epoch per object) any history file is removed.
+    """
+    history_path = catalog_history_path(catalog_txt_path)
+    history = element_history(records, max(max_epochs, 1))
+    if max_epochs < 2 or len(history) == len(np.unique(history['satnum'])):
+        if os.path.exists(history_path):
+            os.remove(history_path)
+        return records[:0]
+    _write_tle_pairs(history, history_path)
+    return history
+
+
+def save_tle_catalog(records: np.ndarray, output_txt_path: str):
+    """Write element sets as a 2-line TLE file (see _write_tle_pairs) and its metadata index next to it."""
+    _write_tle_pairs(records, output_txt_path)
+    index = CatalogIndex.from_records(records, stamp=catalog_stamp(output_txt_path))
+    index.save(catalog_index_path(output_txt_path))
+    with _indexes_lock:
+        _indexes[os.path.abspath(output_txt_path)] = index
+
+
+_indexes = {}  # Catalog path -> CatalogIndex last loaded or written in this process
+_indexes_lock = threading.Lock()
+
+
+def load_catalog_index(catalog_txt_path: str) -> CatalogIndex:
+    """
+    Metadata index of a cleaned catalog file: kept in memory, else read from the index file written with the
+    catalog, else (index missing, or the catalog changed since) rebuilt by parsing the catalog once.
+    """
+    if not os.path.exists(catalog_txt_path):
+        raise FileNotFoundError(f"TLE data file not found at {catalog_txt_path}")
+    key = os.path.abspath(catalog_txt_path)
+    with _indexes_lock:
+        index = _indexes.get(key)
+    if index is not None and index.is_current(catalog_txt_path):
+        return index
+
+    index_path = catalog_index_path(catalog_txt_path)
+    index = None
+    if os.path.exists(index_path):
+        try:
+            index = CatalogIndex.load(index_path)
+        except Exception as e:
+            print(f"Rebuilding unreadable catalog index {index_path}: {e}")
+    if index is None or not index.is_current(catalog_txt_path):
+        stamp = catalog_stamp(catalog_txt_path)
+        index = CatalogIndex.from_records(load_tle_catalog(catalog_txt_path), stamp=stamp)
+        index.save(index_path)
+        print(f"Catalog index rebuilt for {catalog_txt_path} ({len(index)} objects)")
+    with _indexes_lock:
+        _indexes[key] = index
+    return index
+
+
+def preprocess_and_save_tle(input_txt_path: str, output_txt_path: str, history_max_epochs: int = HISTORY_MAX_EPOCHS):
     """
     Preprocess TLE text file and save cleaned pairs to output text file.
     Args:
-        input_txt_path: Path to raw TLE input file.
-        output_txt_path: Path to cleaned TLE output file.
+        input_txt_path: Path to raw TLE input file (2-line or 3-line format).
+        output_txt_path: Path to cleaned TLE output file (2-line format), holding the newest element set
+            per object; older epochs in the input go to its history file (see save_tle_history).
+        history_max_epochs: element sets kept per object in the history.
     """
     if not os.path.exists(input_txt_path):
         raise FileNotFoundError(f"Input file not found at {input_txt_path}")
 
-    with open(input_txt_path, 'r') as infile:
-        lines = infile.readlines()
+    records = load_tle_catalog(input_txt_path)
+    if not len(records):
+        raise ValueError("No valid TLE pairs found in input file.")
+
+    catalog = newest_element_sets(records)
+    save_tle_catalog(catalog, output_txt_path)
+    history = save_tle_history(records, output_txt_path, history_max_epochs)
+    print(f"Cleaned TLE data saved to {output_txt_path} ({len(catalog)} pairs, "
+          f"{len(history)} element sets in history)")
+
+
+class CatalogChangeSet:
+    """
+    Outcome of merging element sets into a catalog keyed by NORAD satellite number.
+    added / updated: satellite numbers whose element set is new in the catalog (updated objects keep their
+    position, added ones are appended); stale: incoming sets older than the catalog's, ignored by the catalog;
+    unchanged: number of incoming sets identical to the catalog's; historical: satellite numbers, not added or
+    updated, whose history gained an older element set.
+    """
+
+    def __init__(self, added, updated, stale, unchanged, historical=()):
+        self.added = np.asarray(added, dtype=np.int32)
+        self.updated = np.asarray(updated, dtype=np.int32)
+        self.stale = np.asarray(stale, dtype=np.int32)
+        self.unchanged = int(unchanged)
+        self.historical = np.asarray(historical, dtype=np.int32)
 
-    valid_pairs = list(clean_and_validate_tle_lines(lines))
-    if not valid_pairs:
+    @property
+    def catalog_changed(self):
+        return len(self.added) + len(self.updated) > 0
+
+    @property
+    def changed(self):
+        """Satellite numbers whose objects must be re-propagated."""
+        return np.concatenate((self.updated, self.added, self.historical))
+
+    def __bool__(self):
+        return self.catalog_changed or len(self.historical) > 0
+
+    def to_dict(self):
+        return {
+            'added': len(self.added),
+            'updated': len(self.updated),
+            'stale': len(self.stale),
+            'historical': len(self.historical),
+            'unchanged': self.unchanged,
+            'changed_satnums': self.changed.tolist()
+        }
+
+
+def merge_catalog(catalog: np.ndarray, incoming: np.ndarray) -> Tuple[np.ndarray, CatalogChangeSet]:
+    """
+    Merge incoming element sets into a catalog (both TLE_DTYPE arrays) by satellite number, keeping the newest
+    epoch. An incoming set replaces the catalog's when its epoch is later, or equal with different elements
+    (a reissued set); objects not in the catalog are appended in input order and objects absent from the
+    input are kept. Returns (merged catalog, change set).
+    """
+    newest = newest_element_sets(incoming)
+
+    by_satnum = np.argsort(catalog['satnum'], kind='stable')
+    sorted_satnums = catalog['satnum'][by_satnum]
+    slots = np.minimum(np.searchsorted(sorted_satnums, newest['satnum']), max(len(catalog) - 1, 0))
+    found = (np.take(sorted_satnums, slots, mode='clip') == newest['satnum']) if len(catalog) else \
+        np.zeros(len(newest), dtype=bool)
+    rows = by_satnum[slots[found]] if len(catalog) else np.zeros(0, dtype=np.int64)
+
+    current, candidate = catalog[rows], newest[found]
+    same_epoch = candidate['epoch'] == current['epoch']
+    identical = same_epoch & (candidate['line1'] == current['line1']) & (candidate['line2'] == current['line2'])
+    replace = (candidate['epoch'] > current['epoch']) | (same_epoch & ~identical)
+
+    merged = np.concatenate((catalog, newest[~found]))
+    merged[rows[replace]] = candidate[replace]
+    changes = CatalogChangeSet(added=newest['satnum'][~found], updated=candidate['satnum'][replace],
+                               stale=candidate['satnum'][candidate['epoch'] < current['epoch']],
+                               unchanged=identical.sum())
+    return merged, changes
+
+
+def merge_tle_file(input_txt_path: str, catalog_txt_path: str,
+                   history_max_epochs: int = HISTORY_MAX_EPOCHS) -> CatalogChangeSet:
+    """
+    Incremental ingestion: merge the element sets of a raw TLE file into the cleaned catalog file by satellite
+    number (see merge_catalog), and every incoming epoch into the catalog's history. Files are rewritten only
+    when something changed. Returns the change set.
+    """
+    if not os.path.exists(input_txt_path):
+        raise FileNotFoundError(f"Input file not found at {input_txt_path}")
+    incoming = load_tle_catalog(input_txt_path)
+    if not len(incoming):
         raise ValueError("No valid TLE pairs found in input file.")
+    catalog = load_tle_catalog(catalog_txt_path) if os.path.exists(catalog_txt_path) else np.zeros(0, TLE_DTYPE)
 
-    os.makedirs(os.path.dirname(output_txt_path), exist_ok=True)
-    with open(output_txt_path, 'w') as outfile:
-        for line1, line2 in valid_pairs:
-            outfile.write(f"{line1}\n{line2}\n")
+    merged, changes = merge_catalog(catalog, incoming)
+    if changes.catalog_changed:
+        save_tle_catalog(merged, catalog_txt_path)
 
-    print(f"Cleaned TLE data saved to {output_txt_path} ({len(valid_pairs)} pairs)")
+    history_path = catalog_history_path(catalog_txt_path)
+    if history_max_epochs >= 2:
+        previous = load_tle_catalog(history_path) if os.path.exists(history_path) else catalog
+        history = element_history(np.concatenate((previous, incoming)), history_max_epochs)
+        # Incoming sets new to the history; older epochs among them change propagations far from the newest
+        keys = [np.char.add(records['line1'], records['line2']) for records in (incoming, history, previous)]
+        entered = incoming[np.isin(keys[0], keys[1]) & ~np.isin(keys[0], keys[2])]
+        changes.historical = np.setdiff1d(entered['satnum'], changes.changed).astype(np.int32)
+        if len(entered):
+            _write_tle_pairs(history, history_path)
+    print(f"Merged TLE data into {catalog_txt_path}: {len(changes.added)} added, {len(changes.updated)} updated, "
+          f"{len(changes.stale)} stale, {changes.unchanged} unchanged, {len(changes.historical)} with older epochs "
+          f"({len(merged)} objects)")
+    return changes
 
 
 if __name__ == "__main__":
     input_path = "/Users/thrishankkuntimaddi/Documents/Projects/SDARC-Enhanced/inputs/tle_raw.txt"
     output_path = "/Users/thrishankkuntimaddi/Documents/Projects/SDARC-Enhanced/data/tle_data.txt"
-    preprocess_and_save_tle(input_path, output_path)
\ No newline at end of file
+    preprocess_and_save_tle(input_path, output_path)
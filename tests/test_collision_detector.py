@@ -0,0 +1,45 @@
+from datetime import datetime
+import numpy as np
+from src.core.collision_detector import CollisionDetector
+from src.core.conjunction_events import merge_hits
+from src.core.ephemeris import CatalogEphemeris
+from src.utils.dummy_tle_generator import generate_scenario
+
+LAUNCH = datetime(2024, 6, 6, 5, 11, 42)
+TRAJECTORY = {
+    'x': lambda t: 5.0e6,
+    'y': lambda t: 0.0,
+    'z': lambda t: 6371e3 + 7800 * t
+}
+
+
+def test_merge_hits_encounters():
+    # Object 7 at steps 3-5, then again at 8-9 after a gap; object 2 at steps 4-6, interleaved with it
+    objects = [7, 2, 7, 2, 7, 2, 7, 7]
+    steps = [3, 4, 4, 5, 5, 6, 9, 8]
+    distances = [0.9, 0.8, 0.2, 0.1, 0.5, 0.7, 0.3, 0.6]
+    closest, first, last, count = merge_hits(objects, steps, distances)
+    assert closest.tolist() == [2, 3, 6]  # Closest hit of each encounter, in order of its time
+    assert first.tolist() == [3, 4, 8]
+    assert last.tolist() == [5, 6, 9]
+    assert count.tolist() == [3, 3, 2]
+    # Encounters closest at the same step are ordered by object
+    closest, first, _, _ = merge_hits([5, 1], [2, 2], [0.5, 0.5])
+    assert closest.tolist() == [1, 0] and first.tolist() == [2, 2]
+    assert all(len(column) == 0 for column in merge_hits([], [], []))
+
+
+def test_detect_collisions_paths_agree(tmp_path):
+    catalog_path = str(tmp_path / "tle_data.txt")
+    generate_scenario(catalog_path, LAUNCH, TRAJECTORY, 500.0, threats=3, near_misses=2, background=20,
+                      near_miss_km=(0.3, 0.8), seed=4, screening_step_s=CollisionDetector.STEP_S)
+    detector = CollisionDetector(catalog_path)
+    looped = detector.detect_collisions(TRAJECTORY, LAUNCH, 500.0)
+    looped_closest = detector.closest_approach
+    shared = detector.detect_collisions(TRAJECTORY, LAUNCH, 500.0, ephemeris=CatalogEphemeris())
+    assert len(looped) == 5  # Threats and near misses, one event each
+    assert looped.dtype == shared.dtype and len(looped) == len(shared)
+    for field in looped.dtype.names:
+        assert np.array_equal(looped[field], shared[field]), field
+    for field in ('satnum', 'distance_km', 't'):
+        assert np.array_equal(looped_closest[field], detector.closest_approach[field], equal_nan=True)
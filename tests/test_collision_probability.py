@@ -0,0 +1,50 @@
+import numpy as np
+from src.core.collision_probability import encounter_plane, pc_analytic, pc_monte_carlo
+
+
+def test_zero_miss_isotropic_closed_form():
+    sigma = np.array([0.01, 0.05, 0.2])
+    radius = 0.02
+    covariance = np.eye(2) * sigma[:, None, None] ** 2
+    pc = pc_analytic(np.zeros((3, 2)), covariance, radius)
+    assert np.allclose(pc, 1 - np.exp(-radius ** 2 / (2 * sigma ** 2)), rtol=1e-10, atol=1e-15)
+
+
+def test_analytic_matches_monte_carlo():
+    # Off-centre misses, correlated covariances, hard body well inside the errors (where Chan's series holds)
+    miss = np.array([[0.04, -0.06], [0.1, 0.05]])
+    covariance = np.array([[[2.5e-3, 1.2e-3], [1.2e-3, 1.5e-2]],
+                           [[1e-2, -4e-3], [-4e-3, 4e-3]]])
+    radius = 0.02
+    analytic = pc_analytic(miss, covariance, radius)
+    estimate, samples = pc_monte_carlo(miss, covariance, radius, rel_tol=0.01, rng=np.random.default_rng(1))
+    assert (analytic > 1e-3).all()
+    # The series' few-percent approximation error plus four standard errors of the estimate
+    tolerance = 0.05 * analytic + 4 * np.sqrt(analytic * (1 - analytic) / samples)
+    assert (np.abs(estimate - analytic) < tolerance).all()
+
+
+def test_monte_carlo_stops_once_interval_clears_threshold():
+    miss = np.array([[1.0, 0.0], [0.0, 0.0]])  # Far below and well above the threshold
+    covariance = np.tile(np.eye(2) * 1e-4, (2, 1, 1))
+    pc, samples = pc_monte_carlo(miss, covariance, 0.02, threshold=1e-2, batch=4096, max_samples=200_000,
+                                 rng=np.random.default_rng(2))
+    assert samples.tolist() == [4096, 4096]
+    assert pc[0] == 0.0 and pc[1] > 1e-2
+    # Without a threshold a zero count never converges and runs to max_samples
+    _, samples = pc_monte_carlo(miss[:1], covariance[:1], 0.02, batch=4096, max_samples=200_000,
+                                rng=np.random.default_rng(2))
+    assert samples[0] >= 200_000
+
+
+def test_miss_vector_in_plane_perpendicular_to_relative_velocity():
+    rng = np.random.default_rng(3)
+    position = rng.normal(size=(20, 3))
+    velocity = rng.normal(size=(20, 3)) * 7
+    velocity[0] = [0.0, 0.0, 10.0]  # Along the helper axis
+    miss, basis = encounter_plane(position, velocity)
+    assert np.allclose(basis @ basis.transpose(0, 2, 1), np.eye(2))
+    assert np.allclose(np.einsum('nij,nj->ni', basis, velocity), 0.0)
+    along = velocity / np.linalg.norm(velocity, axis=1, keepdims=True)
+    closest = position - np.sum(position * along, axis=1, keepdims=True) * along
+    assert np.allclose(np.einsum('nij,ni->nj', basis, miss), closest)
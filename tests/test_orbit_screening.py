@@ -0,0 +1,58 @@
+from datetime import datetime
+import numpy as np
+from src.core.collision_detector import CollisionDetector
+from src.core.orbit_screening import OrbitScreening, TargetOrbit
+from src.utils.dummy_tle_generator import build_tle_records, generate_scenario
+from src.utils.tle_preprocessor import save_tle_catalog
+
+LAUNCH = datetime(2024, 6, 6, 5, 11, 42)
+T_CLIMB = 600.0
+# Horizontal at 500 km altitude at insertion
+TRAJECTORY = {
+    'x': lambda t: 6871e3,
+    'y': lambda t: 7600.0 * (t - T_CLIMB),
+    'z': lambda t: 0.0
+}
+
+
+class OrbitSamples:
+    """Target orbit positions in the place of a SampledTrajectory, so generated threats sit on the orbit."""
+
+    def __init__(self, orbit):
+        self.orbit = orbit
+
+    def positions_at(self, t_values):
+        return self.orbit.positions(np.atleast_1d(t_values))
+
+
+def screening_catalog(tmp_path, orbit):
+    """Two objects meeting the target orbit between 1200 and 4800 s after launch, and one geostationary object."""
+    catalog_path = str(tmp_path / "tle_data.txt")
+    records_path = str(tmp_path / "records.npy")
+    scenario = generate_scenario(catalog_path, LAUNCH, TRAJECTORY, 6000.0, threats=2, seed=7,
+                                 sampled=OrbitSamples(orbit), screening_step_s=10.0, records_path=records_path)
+    geostationary = build_tle_records(np.array([79999]), np.array([np.datetime64(LAUNCH, 'us')]), [0.1], [40.0],
+                                      [0.0001], [0.0], [120.0], [1.00273791])
+    save_tle_catalog(np.concatenate((np.load(records_path), geostationary)), catalog_path)
+    return catalog_path, scenario['threat_times']
+
+
+def test_coarse_filter_keeps_objects_on_the_orbit(tmp_path):
+    orbit = TargetOrbit(TRAJECTORY, T_CLIMB, LAUNCH)
+    catalog_path, _ = screening_catalog(tmp_path, orbit)
+    detector = CollisionDetector(catalog_path)
+    for t in (T_CLIMB, T_CLIMB + orbit.period_s / 2):
+        assert OrbitScreening().coarse_filter(detector, orbit, t).tolist() == [True, True, False]
+
+
+def test_screen_finds_conjunctions_at_the_expected_time(tmp_path):
+    orbit = TargetOrbit(TRAJECTORY, T_CLIMB, LAUNCH)
+    catalog_path, threat_times = screening_catalog(tmp_path, orbit)
+    result = OrbitScreening().screen(CollisionDetector(catalog_path), TRAJECTORY, T_CLIMB, LAUNCH, revolutions=1)
+    assert result['objects'] == 3 and result['candidates'] == 2  # The geostationary object is never propagated
+    events = result['events']
+    for satnum, t in zip((70000, 70001), threat_times):
+        tca = events['tca'][events['satnum'] == satnum]
+        assert np.abs(tca - t).min() < 1.0
+    assert (events['miss_km'] < 0.1).all()
+    assert 79999 not in events['satnum']
@@ -0,0 +1,48 @@
+from datetime import datetime
+import numpy as np
+from sgp4.propagation import gstime
+from src.utils.orbit_utils import earth_rotation, ecef_to_teme, gmst, launch_jday, teme_to_ecef
+
+LAUNCH = datetime(2024, 6, 6, 5, 11, 42)
+
+
+def angle_difference(a, b):
+    return np.abs(np.angle(np.exp(1j * (np.asarray(a) - np.asarray(b)))))
+
+
+def test_gmst_matches_sgp4():
+    dates = 2451545.0 + np.linspace(-9000.0, 12000.0, 97)
+    # Same formula: only rounding of the unreduced angle (~1e5 rad) differs
+    assert angle_difference(gmst(dates, 0.0), [gstime(date) for date in dates]).max() < 5e-11
+    # Split dates keep the fraction's precision; the sum passed to gstime is only good to ~1e-9 rad
+    jd, fr = launch_jday(LAUNCH)
+    fractions = fr + np.linspace(0.0, 0.5, 11)
+    assert angle_difference(gmst(jd, fractions), [gstime(jd + f) for f in fractions]).max() < 1e-8
+
+
+def test_teme_ecef_round_trip_on_blocks():
+    t_values = np.arange(0.0, 600.0, 10.0)
+    rotation = earth_rotation(LAUNCH, t_values)
+    positions = np.random.default_rng(5).normal(size=(7, len(t_values), 3)) * 7e6  # (objects, times, 3)
+    converted = teme_to_ecef(positions, rotation)
+    assert converted.shape == positions.shape
+    assert np.allclose(np.linalg.norm(converted, axis=2), np.linalg.norm(positions, axis=2))
+    assert np.allclose(ecef_to_teme(converted, rotation), positions, rtol=0, atol=1e-6)
+
+
+def test_time_axis_broadcasting():
+    t_values = np.array([0.0, 900.0, 3600.0, 21600.0])
+    rotation = earth_rotation(LAUNCH, t_values)
+    positions = np.random.default_rng(6).normal(size=(5, len(t_values), 3)) * 7e6
+    converted = teme_to_ecef(positions, rotation)
+    jd, fr = launch_jday(LAUNCH)
+    for k, t in enumerate(t_values):
+        # Each time slice is that slice converted alone, a rotation about z by GMST at its own time
+        assert np.array_equal(converted[:, k], teme_to_ecef(positions[:, k:k + 1], rotation[k:k + 1])[:, 0])
+        angle = gmst(jd, fr + t / 86400.0)
+        matrix = np.array([[np.cos(angle), np.sin(angle), 0.0], [-np.sin(angle), np.cos(angle), 0.0], [0, 0, 1]])
+        assert np.allclose(converted[:, k], positions[:, k] @ matrix.T, rtol=0, atol=1e-6)
+    # A single time row applies to every object
+    single = teme_to_ecef(positions[:, :1], rotation[:1])
+    assert np.allclose(single[:, 0], positions[:, 0] @ np.array(
+        [[rotation[0, 0], rotation[0, 1], 0], [-rotation[0, 1], rotation[0, 0], 0], [0, 0, 1]]).T)
@@ -0,0 +1,75 @@
+import threading
+import time
+from src.utils.result_cache import MissionResultCache
+
+
+def test_concurrent_requests_compute_once():
+    cache = MissionResultCache()
+    calls = []
+    started = threading.Event()
+
+    def compute():
+        calls.append(1)
+        started.set()
+        time.sleep(0.2)
+        return {'value': 1}
+
+    statuses = []
+    leader = threading.Thread(target=lambda: statuses.append(cache.get_or_compute('key', compute)[1]))
+    leader.start()
+    started.wait()
+    follower = threading.Thread(target=lambda: statuses.append(cache.get_or_compute('key', compute)[1]))
+    follower.start()
+    leader.join()
+    follower.join()
+    assert len(calls) == 1
+    assert sorted(statuses) == ['coalesced', 'miss']
+    assert cache.get_or_compute('key', compute) == ({'value': 1}, 'hit')
+
+
+def test_failed_compute_is_not_cached():
+    cache = MissionResultCache()
+
+    def fail():
+        raise RuntimeError("screening failed")
+
+    try:
+        cache.get_or_compute('key', fail)
+    except RuntimeError:
+        pass
+    else:
+        raise AssertionError("the error was not raised")
+    assert cache.get_or_compute('key', lambda: 2) == (2, 'miss')
+
+
+def test_eviction_calls_on_evict():
+    evicted = []
+    cache = MissionResultCache(max_entries=2, on_evict=lambda key, result: evicted.append((key, result)))
+    for key in ('a', 'b', 'c'):
+        cache.get_or_compute(key, lambda key=key: key.upper())
+    assert evicted == [('a', 'A')]  # Least recently used beyond max_entries
+
+    cache.invalidate('b')
+    assert evicted[-1] == ('b', 'B')
+
+    expiring = MissionResultCache(ttl_s=0.05, on_evict=lambda key, result: evicted.append((key, result)))
+    expiring.get_or_compute('old', lambda: 1)
+    time.sleep(0.1)
+    expiring.get_or_compute('fresh', lambda: 2)  # Expired entries go when the next one is stored
+    assert evicted[-1] == ('old', 1)
+    assert expiring.get_or_compute('old', lambda: 3) == (3, 'miss')
+
+
+def test_rekey_moves_live_entries_only():
+    cache = MissionResultCache()
+    cache.get_or_compute('old', lambda: 1)
+    assert cache.rekey('old', 'new')
+    assert cache.get_or_compute('new', lambda: 2) == (1, 'hit')
+    assert cache.get_or_compute('old', lambda: 3) == (3, 'miss')
+    assert not cache.rekey('missing', 'other')
+    assert cache.get_or_compute('other', lambda: 4) == (4, 'miss')
+
+    expiring = MissionResultCache(ttl_s=0.05)
+    expiring.get_or_compute('old', lambda: 1)
+    time.sleep(0.1)
+    assert not expiring.rekey('old', 'new')  # Expired entries are not carried over
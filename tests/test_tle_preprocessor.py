@@ -0,0 +1,153 @@
+import io
+import os
+from src.utils.tle_preprocessor import (catalog_history_path, merge_catalog, merge_tle_file, newest_element_sets,
+                                        parse_tle_records, preprocess_and_save_tle, tle_checksum)
+
+ISS_LINE1 = "1 25544U 98067A   08264.51782528 -.00002182  00000-0 -11606-4 0  2927"
+ISS_LINE2 = "2 25544  51.6416 247.4627 0006703 130.5360 325.0288 15.72125391563537"
+
+
+def element_set(satnum=25544, epoch_day="08264.51782528", inclination=" 51.6416"):
+    """Two checksummed lines derived from the ISS element set with another satellite number, epoch or inclination."""
+    line1 = f"1 {satnum:05d}{ISS_LINE1[7:18]}{epoch_day}{ISS_LINE1[32:68]}"
+    line2 = f"2 {satnum:05d}{ISS_LINE2[7:8]}{inclination}{ISS_LINE2[16:68]}"
+    return [line + str(tle_checksum(line)) for line in (line1, line2)]
+
+
+def catalog_text(*sets, name=None):
+    lines = []
+    for index, lines_of_set in enumerate(sets):
+        if name is not None:
+            lines.append(f"{name} {index}")
+        lines.extend(lines_of_set)
+    return "\n".join(lines) + "\n"
+
+
+def test_parse_fields():
+    records, skipped = parse_tle_records(catalog_text([ISS_LINE1, ISS_LINE2]).encode())
+    assert skipped == []
+    assert len(records) == 1
+    record = records[0]
+    assert record['satnum'] == 25544
+    assert record['epoch_year'] == 2008
+    assert abs(record['epoch_day'] - 264.51782528) < 1e-9
+    assert abs(record['ndot'] + 0.00002182) < 1e-12
+    assert abs(record['bstar'] + 0.11606e-4) < 1e-12
+    assert abs(record['inclination_deg'] - 51.6416) < 1e-9
+    assert abs(record['eccentricity'] - 0.0006703) < 1e-12
+    assert abs(record['mean_motion'] - 15.72125391) < 1e-9
+    assert record['rev_number'] == 56353
+    assert record['line1'].decode() == ISS_LINE1
+
+
+def test_three_line_format_and_checksum():
+    corrupted = element_set(10001)
+    corrupted[1] = corrupted[1][:68] + str((int(corrupted[1][68]) + 1) % 10)
+    text = catalog_text(element_set(10000), corrupted, element_set(10002), name="OBJECT")
+    records, skipped = parse_tle_records(text.encode())
+    assert records['satnum'].tolist() == [10000, 10002]
+    assert records['name'].tolist() == ["OBJECT 0", "OBJECT 2"]
+    assert len(skipped) == 1 and "checksum" in skipped[0][1]
+
+
+def test_resynchronises_after_stray_line():
+    lines = element_set(10000) + [element_set(10001)[0]] + element_set(10002)
+    records, skipped = parse_tle_records(("\n".join(lines) + "\n").encode())
+    assert records['satnum'].tolist() == [10000, 10002]
+    assert skipped == [(3, "line 1 without line 2")]
+
+
+def test_trailing_blank_lines_and_crlf():
+    text = catalog_text(element_set(10000), element_set(10001))
+    expected = parse_tle_records(text.encode())[0]
+    for variant in (text + "\n", text + "  \n\n", text.replace("\n", "\r\n") + "\r\n", text.rstrip("\n")):
+        records, skipped = parse_tle_records(variant.encode())
+        assert (records == expected).all() and skipped == []
+    assert len(parse_tle_records(b"\n")[0]) == 0
+    assert len(parse_tle_records(b"")[0]) == 0
+
+
+def test_block_boundaries():
+    text = catalog_text(*[element_set(10000 + k) for k in range(5)], name="OBJECT")
+    expected = parse_tle_records(text.encode())[0]
+    # Blank lines between sets put block boundaries on blank lines for some block sizes
+    for variant in (text, text.replace("\n", "\n\n"), text.replace("\n", "\r\n \r\n")):
+        for block_bytes in range(1, 400, 7):
+            records, skipped = parse_tle_records(io.BytesIO(variant.encode()), block_bytes=block_bytes)
+            assert (records == expected).all() and skipped == []
+
+
+def write_text(path, text):
+    path.write_text(text)
+    return str(path)
+
+
+def catalog_sets(path):
+    return {(int(record['satnum']), record['line1'].decode()[18:32], record['inclination_deg'])
+            for record in parse_tle_records(open(path, 'rb').read())[0]}
+
+
+def test_merge_catalog_change_set():
+    catalog = parse_tle_records(catalog_text(element_set(10000, "08264.00000000"), element_set(10001, "08264.00000000"),
+                                             element_set(10002, "08264.00000000")).encode())[0]
+    incoming = parse_tle_records(catalog_text(
+        element_set(10000, "08265.00000000"),  # Newer epoch
+        element_set(10001, "08263.00000000"),  # Stale
+        element_set(10002, "08264.00000000"),  # Identical
+        element_set(10003, "08264.00000000")   # New object
+    ).encode())[0]
+    merged, changes = merge_catalog(catalog, incoming)
+    assert merged['satnum'].tolist() == [10000, 10001, 10002, 10003]
+    assert changes.updated.tolist() == [10000]
+    assert changes.added.tolist() == [10003]
+    assert changes.stale.tolist() == [10001]
+    assert changes.unchanged == 1
+    assert merged['epoch_day'].tolist() == [265.0, 264.0, 264.0, 264.0]
+
+
+def test_merge_equal_epoch_reissue_replaces():
+    catalog = parse_tle_records(catalog_text(element_set(10000, "08264.00000000")).encode())[0]
+    reissued = parse_tle_records(catalog_text(element_set(10000, "08264.00000000", inclination=" 51.7000")).encode())[0]
+    merged, changes = merge_catalog(catalog, reissued)
+    assert changes.updated.tolist() == [10000] and changes.unchanged == 0
+    assert abs(merged['inclination_deg'][0] - 51.7) < 1e-9
+    # Within one input the later of two sets with the same epoch wins
+    both = parse_tle_records(catalog_text(element_set(10000, "08264.00000000"),
+                                          element_set(10000, "08264.00000000", inclination=" 51.7000")).encode())[0]
+    assert abs(newest_element_sets(both)['inclination_deg'][0] - 51.7) < 1e-9
+
+
+def test_merge_file_history_and_repeated_merges(tmp_path):
+    catalog_path = str(tmp_path / "tle_data.txt")
+    preprocess_and_save_tle(write_text(tmp_path / "raw.txt", catalog_text(element_set(10000, "08264.00000000"),
+                                                                          element_set(10001, "08264.00000000"))),
+                            catalog_path)
+    assert not os.path.exists(catalog_history_path(catalog_path))
+
+    update = write_text(tmp_path / "update.txt", catalog_text(
+        element_set(10000, "08265.00000000"), element_set(10001, "08262.00000000"), element_set(10002)))
+    changes = merge_tle_file(update, catalog_path)
+    assert changes.updated.tolist() == [10000] and changes.added.tolist() == [10002]
+    assert changes.stale.tolist() == [10001]
+    assert changes.historical.tolist() == [10001]  # The stale set still enters the history
+    assert {satnum for satnum, _, _ in catalog_sets(catalog_path)} == {10000, 10001, 10002}
+    history = catalog_sets(catalog_history_path(catalog_path))
+    assert {(satnum, epoch) for satnum, epoch, _ in history} == {
+        (10000, "08264.00000000"), (10000, "08265.00000000"), (10001, "08262.00000000"),
+        (10001, "08264.00000000"), (10002, "08264.51782528")}
+
+    # Merging the same file again changes nothing and leaves the files alone
+    stamps = [os.stat(path).st_mtime_ns for path in (catalog_path, catalog_history_path(catalog_path))]
+    changes = merge_tle_file(update, catalog_path)
+    assert not changes and changes.unchanged == 2 and changes.stale.tolist() == [10001]
+    assert [os.stat(path).st_mtime_ns for path in (catalog_path, catalog_history_path(catalog_path))] == stamps
+
+
+def test_history_keeps_newest_epochs(tmp_path):
+    catalog_path = str(tmp_path / "tle_data.txt")
+    epochs = [f"08{day}.00000000" for day in range(260, 266)]
+    preprocess_and_save_tle(write_text(tmp_path / "raw.txt", catalog_text(*[element_set(10000, epoch)
+                                                                           for epoch in epochs])),
+                            catalog_path, history_max_epochs=3)
+    assert [epoch for _, epoch, _ in sorted(catalog_sets(catalog_history_path(catalog_path)))] == epochs[-3:]
+    assert [epoch for _, epoch, _ in catalog_sets(catalog_path)] == epochs[-1:]